@@ -1,8 +1,25 @@
 import datetime
+from decimal import Decimal, localcontext
+from typing import Iterable, Union
 
+import pandas as pd
+from senkalib.caaj_journal import CaajJournal
 from senkalib.chain.transaction import Transaction
 from senkalib.token_original_id_table import TokenOriginalIdTable
-from senkalib.caaj_journal import CaajJournal
+
+from bitbank_plugin.token_resolver import TokenResolver
+from bitbank_plugin.trade_history import (
+    APPLICATION,
+    DECIMAL_PRECISION,
+    FEE_ACCOUNT,
+    SELF,
+    SIDE,
+    SIDES,
+    TIMESTAMP_FORMAT,
+    convert_trade_history,
+    format_decimal,
+    get_trade_uuid,
+)
 
 
 class BitbankPlugin:
@@ -16,39 +33,80 @@ class BitbankPlugin:
 
     @classmethod
     def get_caajs(
-        cls, transaction: Transaction, token_table: TokenOriginalIdTable
+        cls,
+        transaction: Transaction,
+        token_table: Union[TokenOriginalIdTable, TokenResolver],
     ) -> list:
         caaj = []
+        token_table = TokenResolver.of(token_table)
+        # the side is not among the BitbankTransaction accessors, so it is read
+        # from the trade row.
+        side = transaction.get_transaction()[SIDE]
+        if side not in SIDES:
+            raise ValueError(f"side of trade is not supported. side: {side}")
 
         datetime_jst = datetime.datetime.strptime(
-            transaction.get_timestamp(), "%Y/%m/%d %H:%M:%S"
+            transaction.get_timestamp(), TIMESTAMP_FORMAT
         )
         datetime_utc = (datetime_jst - datetime.timedelta(hours=9)).strftime(
-            "%Y/%m/%d %H:%M:%S%z"
-        )
-        amount_get = transaction.get_amount()
-        amount_lose = transaction.get_amount() ** transaction.get_price()
-        token_pair = transaction.get_token_pair().split("_")
-        token_symbol_get = token_pair[0]
-        token_symbol_lose = token_pair[1]
-
-        caaj_journal_from = CaajJournal(
-            datetime_utc,
-            cls.chain,
-            cls.platform,
-            "exchange",
-            transaction.get_transaction_id(),
-            transaction.get_trade_uuid(),
-            "lose",
-            amount_lose,
-            token_symbol_lose,
-            token_original_id_from,
-            token_original_uuid_from,
-            "self",
-            "bitbank",
-            "",
+            TIMESTAMP_FORMAT
         )
+        token_base, token_quote = transaction.get_token_pair().split("_", 1)
+        with localcontext() as context:
+            context.prec = DECIMAL_PRECISION
+            amount = Decimal(str(transaction.get_amount()))
+            total = amount * Decimal(str(transaction.get_price()))
+            fee = Decimal(str(transaction.get_transaction_fee()))
+            if side == "buy":
+                amount_get, token_get = amount, token_base
+                amount_lose, token_lose = total, token_quote
+            else:
+                amount_get, token_get = total, token_quote
+                amount_lose, token_lose = amount, token_base
 
-        caaj.append(caaj_journal_from)
+            journals = [
+                ("get", amount_get, token_get, cls.platform, SELF),
+                ("lose", amount_lose, token_lose, SELF, cls.platform),
+            ]
+            # fees are lost to the fee account; negative fees are maker rebates.
+            if fee > 0:
+                journals.append(("lose", fee, token_quote, SELF, FEE_ACCOUNT))
+            elif fee < 0:
+                journals.append(("get", -fee, token_quote, FEE_ACCOUNT, SELF))
+
+        trade_id = str(transaction.get_transaction_id())
+        # derived from the trade id as in get_caajs_bulk, whose rows have no
+        # BitbankTransaction, so both give a trade the same uuid.
+        trade_uuid = get_trade_uuid(trade_id)
+        for journal_type, amount, token, caaj_from, caaj_to in journals:
+            symbol, symbol_uuid = token_table.resolve(cls.chain, token)
+            caaj.append(
+                CaajJournal(
+                    datetime_utc,
+                    cls.chain,
+                    cls.platform,
+                    APPLICATION,
+                    trade_id,
+                    trade_uuid,
+                    journal_type,
+                    format_decimal(amount),
+                    symbol or token,
+                    token,
+                    symbol_uuid,
+                    caaj_from,
+                    caaj_to,
+                    "",
+                )
+            )
 
         return caaj
+
+    @classmethod
+    def get_caajs_bulk(
+        cls,
+        trades: Union[pd.DataFrame, Iterable[dict]],
+        token_table: Union[TokenOriginalIdTable, TokenResolver],
+    ) -> pd.DataFrame:
+        # converts a whole trade history export at once, with the journals of
+        # get_caajs as the rows of a DataFrame.
+        return convert_trade_history(trades, TokenResolver.of(token_table))
@@ -0,0 +1,118 @@
+import argparse
+import codecs
+import csv
+import io
+import json
+import os
+import sys
+from contextlib import contextmanager
+from itertools import islice
+from typing import BinaryIO, Iterable, Iterator, Optional, TextIO, Union, cast
+
+import pandas as pd
+
+DATA_TYPE = "bitbank_exchange"
+# bytes read ahead to detect the encoding; the header row alone decides it.
+SAMPLE_SIZE = 64 * 1024
+DEFAULT_BATCH_SIZE = 100_000
+FALLBACK_ENCODING = "cp932"
+
+Source = Union[str, os.PathLike, BinaryIO]
+
+
+def detect_encoding(sample: bytes) -> str:
+    if sample.startswith(codecs.BOM_UTF8):
+        return "utf-8-sig"
+    try:
+        # a multibyte character cut at the end of the sample is not an error.
+        codecs.getincrementaldecoder("utf-8")().decode(sample, final=False)
+    except UnicodeDecodeError:
+        return FALLBACK_ENCODING
+    return "utf-8"
+
+
+def read_trades(source: Source, encoding: Optional[str] = None) -> Iterator[dict]:
+    # rows are decoded as they are read, so memory does not grow with the export.
+    with _open_text(source, encoding) as text:
+        reader = csv.reader(text)
+        header = next(reader, None)
+        if header is None:
+            return
+        fields = [field.strip() for field in header]
+        for row in reader:
+            if row:
+                yield dict(zip(fields, row))
+
+
+def read_trade_batches(
+    source: Source,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    encoding: Optional[str] = None,
+) -> Iterator[pd.DataFrame]:
+    # DataFrames of at most batch_size trades, for BitbankPlugin.get_caajs_bulk.
+    trades = read_trades(source, encoding)
+    while True:
+        batch = list(islice(trades, batch_size))
+        if not batch:
+            return
+        yield pd.DataFrame(batch, dtype=str)
+
+
+def read_transactions(source: Source, encoding: Optional[str] = None) -> Iterator:
+    from senkalib.chain.bitbank.bitbank_transaction import BitbankTransaction
+
+    for trade in read_trades(source, encoding):
+        trade["data_type"] = DATA_TYPE
+        yield BitbankTransaction(trade)
+
+
+def write_ndjson(trades: Iterable[dict], stream: TextIO) -> int:
+    count = 0
+    for trade in trades:
+        stream.write(json.dumps(trade, ensure_ascii=False))
+        stream.write("\n")
+        count += 1
+    return count
+
+
+@contextmanager
+def _open_text(source: Source, encoding: Optional[str]) -> Iterator[TextIO]:
+    owned = isinstance(source, (str, os.PathLike))
+    if owned:
+        binary = open(source, "rb", buffering=SAMPLE_SIZE)
+    elif isinstance(source, io.BufferedReader):
+        binary = source
+    else:
+        binary = io.BufferedReader(cast(io.RawIOBase, source), SAMPLE_SIZE)
+    if encoding is None:
+        encoding = detect_encoding(binary.peek(SAMPLE_SIZE)[:SAMPLE_SIZE])
+    text = io.TextIOWrapper(binary, encoding=encoding, newline="")
+    try:
+        yield text
+    finally:
+        # streams passed in are left open for the caller.
+        if owned:
+            text.close()
+        else:
+            text.detach()
+            if binary is not source:
+                binary.detach()
+
+
+def parse_args(argv: list) -> argparse.Namespace:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("csv", help="bitbank trade history export")
+    parser.add_argument(
+        "--encoding", default=None, help="detected from the file if omitted"
+    )
+    parser.add_argument("--output", default=None, help="ndjson file, stdout if omitted")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args(sys.argv[1:])
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as output_file:
+            write_ndjson(read_trades(args.csv, args.encoding), output_file)
+    else:
+        write_ndjson(read_trades(args.csv, args.encoding), sys.stdout)
@@ -0,0 +1,43 @@
+from typing import Dict, Optional, Tuple, Union
+
+from senkalib.token_original_id_table import TokenOriginalIdTable
+
+
+class TokenResolver:
+    def __init__(self, token_table: TokenOriginalIdTable):
+        self.token_table = token_table
+        self.misses = 0
+        # bitbank lists few tokens, so every lookup is kept.
+        self.cache: Dict[Tuple[str, str], Tuple[Optional[str], Optional[str]]] = {}
+
+    @classmethod
+    def of(
+        cls, token_table: Union[TokenOriginalIdTable, "TokenResolver"]
+    ) -> "TokenResolver":
+        if isinstance(token_table, TokenResolver):
+            return token_table
+        return cls(token_table)
+
+    def resolve(
+        self, chain: str, token_original_id: str
+    ) -> Tuple[Optional[str], Optional[str]]:
+        key = (chain, token_original_id)
+        resolved = self.cache.get(key)
+        if resolved is not None:
+            return resolved
+
+        self.misses += 1
+        if isinstance(self.token_table, TokenOriginalIdTable):
+            meta_data = self.token_table.get_all_meta_data(chain, token_original_id)
+            if meta_data is None:
+                resolved = (None, None)
+            else:
+                resolved = (meta_data["symbol"], meta_data["symbol_uuid"])
+        else:
+            resolved = (
+                self.token_table.get_symbol(chain, token_original_id),
+                self.token_table.get_symbol_uuid(chain, token_original_id),
+            )
+
+        self.cache[key] = resolved
+        return resolved
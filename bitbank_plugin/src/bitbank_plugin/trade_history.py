@@ -0,0 +1,167 @@
+import dataclasses
+import hashlib
+import uuid
+from decimal import Decimal, localcontext
+from typing import Iterable, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+from senkalib.caaj_journal import CaajJournal
+
+from bitbank_plugin.token_resolver import TokenResolver
+
+CHAIN = "bitbank"
+PLATFORM = "bitbank"
+APPLICATION = "exchange"
+SELF = "self"
+FEE_ACCOUNT = "fee"
+
+# columns of the trade history export.
+ORDER_ID = "注文ID"
+TRADE_ID = "取引ID"
+PAIR = "通貨ペア"
+SIDE = "売/買"
+AMOUNT = "数量"
+PRICE = "価格"
+FEE = "手数料"
+EXECUTED_AT = "取引日時"
+
+TIMESTAMP_FORMAT = "%Y/%m/%d %H:%M:%S"
+JST_OFFSET = pd.Timedelta(hours=9)
+# enough digits that amount * price is never rounded.
+DECIMAL_PRECISION = 50
+TRADE_UUID_NAMESPACE = uuid.UUID("5b0f5a3e-7c1d-4f63-9a51-2d1f0e8c4b77")
+TRADE_UUID_PREFIX = TRADE_UUID_NAMESPACE.bytes + f"{CHAIN}:".encode()
+CAAJ_FIELDS = [field.name for field in dataclasses.fields(CaajJournal)]
+SIDES = frozenset(["buy", "sell"])
+
+
+def get_trade_uuid(trade_id: str) -> str:
+    # uuid5 without building a UUID object, which dominates bulk conversion.
+    digest = bytearray(
+        hashlib.sha1(TRADE_UUID_PREFIX + trade_id.encode()).digest()[:16]
+    )
+    digest[6] = (digest[6] & 0x0F) | 0x50
+    digest[8] = (digest[8] & 0x3F) | 0x80
+    hexdigest = digest.hex()
+    return (
+        f"{hexdigest[:8]}-{hexdigest[8:12]}-{hexdigest[12:16]}"
+        f"-{hexdigest[16:20]}-{hexdigest[20:]}"
+    )
+
+
+def format_decimal(value: Decimal) -> str:
+    # fixed-point, so exports never contain exponents such as 1E-7.
+    return format(value, "f")
+
+
+def convert_trade_history(
+    trades: Union[pd.DataFrame, Iterable[dict]], token_resolver: TokenResolver
+) -> pd.DataFrame:
+    # every trade becomes a get and a lose journal, plus a fee journal in the
+    # quote currency unless the fee is zero. the journals of a trade are laid
+    # out as a row of 3 slots, get, lose and fee, and flattened in trade order.
+    frame = trades if isinstance(trades, pd.DataFrame) else pd.DataFrame(trades)
+    if frame.empty:
+        return pd.DataFrame(columns=CAAJ_FIELDS)
+    unknown_sides = set(frame[SIDE].unique()) - SIDES
+    if unknown_sides:
+        raise ValueError(f"side of trade is not supported. side: {unknown_sides}")
+
+    # fills share timestamps and pairs, so only distinct values are converted.
+    codes, timestamps = pd.factorize(frame[EXECUTED_AT])
+    executed_at = _to_objects(
+        (pd.to_datetime(timestamps, format=TIMESTAMP_FORMAT) - JST_OFFSET).strftime(
+            TIMESTAMP_FORMAT
+        )
+    )[codes]
+    codes, pairs = pd.factorize(frame[PAIR])
+    split_pairs = [pair.split("_", 1) for pair in pairs]
+    base = _to_objects([pair[0] for pair in split_pairs])[codes]
+    quote = _to_objects([pair[1] for pair in split_pairs])[codes]
+    with localcontext() as context:
+        context.prec = DECIMAL_PRECISION
+        amount = _to_decimals(frame[AMOUNT])
+        total = amount * _to_decimals(frame[PRICE])
+        fee = _to_decimals(frame[FEE])
+        # negated here, so rebates are not rounded to the default precision.
+        rebate = (fee < 0).astype(bool)
+        fee_amount = np.where(rebate, -fee, fee)
+
+    buy = (frame[SIDE] == "buy").to_numpy()
+    trade_ids = [str(trade_id) for trade_id in frame[TRADE_ID].tolist()]
+    # fees are lost to the fee account; negative fees are maker rebates.
+    slots = {
+        "type": ("get", "lose", np.where(rebate, "get", "lose")),
+        "amount": (
+            np.where(buy, amount, total),
+            np.where(buy, total, amount),
+            fee_amount,
+        ),
+        "token_original_id": (
+            np.where(buy, base, quote),
+            np.where(buy, quote, base),
+            quote,
+        ),
+        "caaj_from": (PLATFORM, SELF, np.where(rebate, FEE_ACCOUNT, SELF)),
+        "caaj_to": (SELF, PLATFORM, np.where(rebate, SELF, FEE_ACCOUNT)),
+    }
+    kept = np.column_stack(
+        [np.ones(len(fee), bool), np.ones(len(fee), bool), (fee != 0).astype(bool)]
+    )
+    kept = kept.ravel()
+
+    columns = {name: _interleave(values, kept) for name, values in slots.items()}
+    trade_index = np.repeat(np.arange(len(trade_ids)), 3)[kept]
+    columns["executed_at"] = executed_at[trade_index]
+    columns["transaction_id"] = _to_objects(trade_ids)[trade_index]
+    columns["trade_uuid"] = _to_objects(
+        [get_trade_uuid(trade_id) for trade_id in trade_ids]
+    )[trade_index]
+    columns["amount"] = [format_decimal(value) for value in columns["amount"]]
+    codes, tokens = pd.factorize(columns["token_original_id"])
+    resolved = [_resolve_token(token, token_resolver) for token in tokens]
+    columns["token_symbol"] = _to_objects([symbol for symbol, _ in resolved])[codes]
+    columns["token_symbol_uuid"] = _to_objects(
+        [symbol_uuid for _, symbol_uuid in resolved]
+    )[codes]
+    size = len(trade_index)
+    for name, value in [
+        ("chain", CHAIN),
+        ("platform", PLATFORM),
+        ("application", APPLICATION),
+        ("comment", ""),
+    ]:
+        columns[name] = np.full(size, value, dtype=object)
+    return pd.DataFrame(columns, columns=CAAJ_FIELDS)
+
+
+def to_caajs(frame: pd.DataFrame) -> list:
+    return [CaajJournal(*row) for row in frame[CAAJ_FIELDS].itertuples(index=False)]
+
+
+def _to_objects(values) -> np.ndarray:
+    return np.asarray(list(values), dtype=object)
+
+
+def _to_decimals(values: pd.Series) -> np.ndarray:
+    # through str, so floats of pd.read_csv columns keep the digits of the export
+    # rather than their binary expansion.
+    return np.fromiter(
+        map(Decimal, map(str, values.tolist())), dtype=object, count=len(values)
+    )
+
+
+def _interleave(slots: tuple, kept: np.ndarray) -> np.ndarray:
+    columns = np.empty((len(kept) // 3, 3), dtype=object)
+    for index, value in enumerate(slots):
+        columns[:, index] = value
+    return columns.ravel()[kept]
+
+
+def _resolve_token(
+    token: str, token_resolver: TokenResolver
+) -> Tuple[str, Optional[str]]:
+    # the symbol falls back to the one in the pair.
+    symbol, symbol_uuid = token_resolver.resolve(CHAIN, token)
+    return symbol or token, symbol_uuid
@@ -1,32 +1,30 @@
 import json
-import csv
+import textwrap
+from typing import Iterable
+
+from bitbank_plugin.csv_ingestion import read_trades
 
 csvFilePath = "src/data/bitbank_sample.csv"
 jsonFilePath = "src/data/bitbank_sample.json"
 
 
 def read_csv(file, json_file):
-    csv_rows = []
-    with open(file, encoding="utf8") as csvfile:
-        reader = csv.DictReader(csvfile)
-        field = reader.fieldnames
-        for row in reader:
-            csv_rows.extend([{field[i]: row[field[i]] for i in range(len(field))}])
-            convert_write_json(csv_rows, json_file)
+    return convert_write_json(read_trades(file), json_file)
 
 
-def convert_write_json(data, json_file):
+def convert_write_json(data: Iterable[dict], json_file) -> int:
+    # rows are written as they are read, one json array element at a time.
+    count = 0
     with open(json_file, "w", encoding="utf-8") as f:
-        f.write(
-            json.dumps(
-                data,
-                sort_keys=False,
-                indent=4,
-                ensure_ascii=False,
-                separators=(",", ": "),
+        f.write("[")
+        for row in data:
+            f.write(",\n" if count else "\n")
+            f.write(
+                textwrap.indent(json.dumps(row, indent=4, ensure_ascii=False), " " * 4)
             )
-        )
-        f.write(json.dumps(data))
+            count += 1
+        f.write("\n]\n" if count else "]\n")
+    return count
 
 
 if __name__ == "__main__":
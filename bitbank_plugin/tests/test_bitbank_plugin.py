@@ -1,8 +1,11 @@
 import json
+from unittest.mock import MagicMock
 
+from senkalib.caaj_journal import CaajJournal
 from senkalib.chain.bitbank.bitbank_transaction import BitbankTransaction
 
 from bitbank_plugin.bitbank_plugin import BitbankPlugin
+from bitbank_plugin.trade_history import get_trade_uuid, to_caajs
 
 
 class TestBitbankPlugin:
@@ -14,6 +17,87 @@ class TestBitbankPlugin:
         chain_type = BitbankPlugin.can_handle(transaction)
         assert chain_type
 
+    def test_get_caajs_buy(self):
+        test_data = TestBitbankPlugin._get_test_data(
+            "tests/data/bitbank_sample_with_data_type.json"
+        )
+        transaction = BitbankTransaction(test_data)
+        caajs = BitbankPlugin.get_caajs(
+            transaction, TestBitbankPlugin.get_token_table_mock()
+        )
+        common = [
+            "2022/03/14 11:55:24",
+            "bitbank",
+            "bitbank",
+            "exchange",
+            "1215140489",
+            get_trade_uuid("1215140489"),
+        ]
+        assert caajs == [
+            CaajJournal(
+                *common,
+                "get",
+                "537.8006",
+                "mona",
+                "mona",
+                "uuid-mona",
+                "bitbank",
+                "self",
+                "",
+            ),
+            CaajJournal(
+                *common,
+                "lose",
+                "59577.0126674",
+                "jpy",
+                "jpy",
+                "uuid-jpy",
+                "self",
+                "bitbank",
+                "",
+            ),
+            CaajJournal(
+                *common,
+                "lose",
+                "71.4924",
+                "jpy",
+                "jpy",
+                "uuid-jpy",
+                "self",
+                "fee",
+                "",
+            ),
+        ]
+
+    def test_get_caajs_bulk(self):
+        test_data = json.load(
+            open("tests/data/bitbank_sample_with_data_type.json", encoding="utf-8")
+        )
+        test_data[1] = dict(test_data[1], **{"売/買": "sell", "手数料": "-0.0001"})
+        test_data[2] = dict(test_data[2], **{"手数料": "0.0000"})
+        token_table = TestBitbankPlugin.get_token_table_mock()
+
+        expected = []
+        for trade in test_data:
+            expected += BitbankPlugin.get_caajs(BitbankTransaction(trade), token_table)
+        caajs = to_caajs(BitbankPlugin.get_caajs_bulk(test_data, token_table))
+        assert caajs == expected
+        assert len(caajs) == 3 * len(test_data) - 1
+        assert [caaj.type for caaj in caajs[3:6]] == ["get", "lose", "get"]
+        assert caajs[3].amount == "236.1160362"
+        assert (caajs[5].caaj_from, caajs[5].caaj_to) == ("fee", "self")
+
+    @classmethod
+    def get_token_table_mock(cls):
+        mock = MagicMock()
+        mock.get_symbol.side_effect = lambda chain, token_original_id: (
+            token_original_id
+        )
+        mock.get_symbol_uuid.side_effect = lambda chain, token_original_id: (
+            f"uuid-{token_original_id}"
+        )
+        return mock
+
     @staticmethod
     def _get_test_data(filename: str):
         json_load = json.load(open(filename))
@@ -0,0 +1,81 @@
+import csv
+import io
+import json
+
+import pytest
+
+from bitbank_plugin import csv_ingestion
+from bitbank_plugin.csv_ingestion import (
+    detect_encoding,
+    read_trade_batches,
+    read_trades,
+    write_ndjson,
+)
+from tests.data.csv_to_json import read_csv
+
+
+class TestCsvIngestion:
+    @pytest.mark.parametrize("encoding", ["utf-8", "utf-8-sig", "cp932"])
+    def test_read_trades(self, tmp_path, encoding):
+        trades = TestCsvIngestion._get_test_data()
+        path = tmp_path / "export.csv"
+        path.write_bytes(TestCsvIngestion._to_csv(trades).encode(encoding))
+        assert list(read_trades(str(path))) == trades
+
+    def test_read_trades_stream(self):
+        trades = TestCsvIngestion._get_test_data()
+        stream = io.BytesIO(TestCsvIngestion._to_csv(trades).encode("cp932"))
+        assert list(read_trades(stream)) == trades
+        assert not stream.closed
+
+    def test_read_trades_empty(self):
+        assert list(read_trades(io.BytesIO(b""))) == []
+
+    def test_detect_encoding(self, monkeypatch):
+        header = "注文ID,取引ID\r\n"
+        assert detect_encoding(header.encode("utf-8-sig")) == "utf-8-sig"
+        assert detect_encoding(header.encode("utf-8")) == "utf-8"
+        assert detect_encoding(header.encode("cp932")) == "cp932"
+        # a character cut at the end of the sample does not make utf-8 fail.
+        assert detect_encoding(header.encode("utf-8")[:4]) == "utf-8"
+
+        monkeypatch.setattr(csv_ingestion, "SAMPLE_SIZE", 4)
+        trades = TestCsvIngestion._get_test_data()
+        stream = io.BytesIO(TestCsvIngestion._to_csv(trades).encode("utf-8"))
+        assert list(read_trades(stream)) == trades
+
+    def test_read_trade_batches(self):
+        trades = TestCsvIngestion._get_test_data()
+        stream = io.BytesIO(TestCsvIngestion._to_csv(trades).encode("utf-8"))
+        batches = list(read_trade_batches(stream, batch_size=2))
+        assert [len(batch) for batch in batches] == [2, 2, 1]
+        assert batches[2].iloc[0].to_dict() == trades[4]
+
+    def test_write_ndjson(self):
+        trades = TestCsvIngestion._get_test_data()
+        output = io.StringIO()
+        assert write_ndjson(iter(trades), output) == len(trades)
+        lines = output.getvalue().splitlines()
+        assert [json.loads(line) for line in lines] == trades
+        assert "注文ID" in lines[0]
+
+    def test_csv_to_json(self, tmp_path):
+        trades = TestCsvIngestion._get_test_data()
+        path = tmp_path / "export.csv"
+        path.write_bytes(TestCsvIngestion._to_csv(trades).encode("utf-8-sig"))
+        assert read_csv(str(path), str(tmp_path / "export.json")) == len(trades)
+        with open(tmp_path / "export.json", encoding="utf-8") as jsonfile:
+            assert json.load(jsonfile) == trades
+
+    @classmethod
+    def _to_csv(cls, trades: list) -> str:
+        output = io.StringIO()
+        writer = csv.DictWriter(output, fieldnames=list(trades[0]))
+        writer.writeheader()
+        writer.writerows(trades)
+        return output.getvalue()
+
+    @classmethod
+    def _get_test_data(cls) -> list:
+        with open("tests/data/bitbank_sample.json", encoding="utf-8") as jsonfile:
+            return json.load(jsonfile)
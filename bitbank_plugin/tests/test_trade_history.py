@@ -0,0 +1,121 @@
+import json
+import random
+import uuid
+from decimal import Decimal
+from unittest.mock import MagicMock
+
+import pandas as pd
+import pytest
+
+from bitbank_plugin.token_resolver import TokenResolver
+from bitbank_plugin.trade_history import (
+    CAAJ_FIELDS,
+    TRADE_UUID_NAMESPACE,
+    convert_trade_history,
+    get_trade_uuid,
+)
+
+
+class TestTradeHistory:
+    def test_get_trade_uuid(self):
+        for trade_id in ["1215140489", "1", "取引"]:
+            assert get_trade_uuid(trade_id) == str(
+                uuid.uuid5(TRADE_UUID_NAMESPACE, f"bitbank:{trade_id}")
+            )
+
+    def test_convert_trade_history_exact(self):
+        generator = random.Random(0)
+        trades = []
+        for trade_id in range(200):
+            trades.append(
+                {
+                    "取引ID": str(trade_id),
+                    "通貨ペア": "btc_jpy",
+                    "売/買": generator.choice(["buy", "sell"]),
+                    "数量": f"{generator.randint(1, 10**8)}E-8",
+                    "価格": str(generator.randint(1, 10**7)),
+                    "手数料": "0",
+                    "取引日時": "2022/01/01 08:59:59",
+                }
+            )
+        journals = convert_trade_history(trades, TestTradeHistory._get_resolver())
+        assert list(journals.columns) == CAAJ_FIELDS
+        assert len(journals) == 2 * len(trades)
+        assert set(journals["executed_at"]) == {"2021/12/31 23:59:59"}
+        for index, trade in enumerate(trades):
+            total = Decimal(trade["数量"]) * Decimal(trade["価格"])
+            amounts = journals["amount"].iloc[2 * index : 2 * index + 2].tolist()
+            assert "E" not in "".join(amounts)
+            if trade["売/買"] == "buy":
+                assert amounts == [
+                    format(Decimal(trade["数量"]), "f"),
+                    format(total, "f"),
+                ]
+            else:
+                assert amounts == [
+                    format(total, "f"),
+                    format(Decimal(trade["数量"]), "f"),
+                ]
+
+    def test_convert_trade_history_sample(self):
+        with open("tests/data/bitbank_sample.json", encoding="utf-8") as jsonfile:
+            trades = json.load(jsonfile)
+        resolver = TestTradeHistory._get_resolver()
+        journals = convert_trade_history(trades, resolver)
+        assert len(journals) == 3 * len(trades)
+        assert journals["trade_uuid"].nunique() == len(trades)
+        assert journals["token_symbol_uuid"].tolist()[:3] == [
+            "uuid-mona",
+            "uuid-jpy",
+            "uuid-jpy",
+        ]
+        # one lookup per token.
+        assert resolver.misses == 2
+
+    def test_convert_trade_history_rebate_precision(self):
+        with open("tests/data/bitbank_sample.json", encoding="utf-8") as jsonfile:
+            trades = json.load(jsonfile)[:1]
+        # more significant digits than the default decimal context keeps.
+        rebate = "0.12345678901234567890123456789012345"
+        trades[0]["手数料"] = f"-{rebate}"
+        journals = convert_trade_history(trades, TestTradeHistory._get_resolver())
+        assert journals["type"].tolist() == ["get", "lose", "get"]
+        assert journals["amount"].iloc[2] == rebate
+
+    def test_convert_trade_history_read_csv(self, tmp_path):
+        with open("tests/data/bitbank_sample.json", encoding="utf-8") as jsonfile:
+            trades = json.load(jsonfile)
+        path = tmp_path / "export.csv"
+        pd.DataFrame(trades).to_csv(path, index=False)
+        frame = pd.read_csv(path)
+        assert frame["数量"].dtype == float
+        journals = convert_trade_history(frame, TestTradeHistory._get_resolver())
+        assert journals["amount"].tolist()[:3] == [
+            "537.8006",
+            "59577.0126674",
+            "71.4924",
+        ]
+        assert journals["transaction_id"].tolist()[:3] == ["1215140489"] * 3
+
+    def test_convert_trade_history_invalid_side(self):
+        with open("tests/data/bitbank_sample.json", encoding="utf-8") as jsonfile:
+            trades = json.load(jsonfile)
+        trades[0]["売/買"] = "borrow"
+        with pytest.raises(ValueError):
+            convert_trade_history(trades, TestTradeHistory._get_resolver())
+
+    def test_convert_trade_history_empty(self):
+        journals = convert_trade_history([], TestTradeHistory._get_resolver())
+        assert list(journals.columns) == CAAJ_FIELDS
+        assert len(journals) == 0
+
+    @classmethod
+    def _get_resolver(cls) -> TokenResolver:
+        mock = MagicMock()
+        mock.get_symbol.side_effect = lambda chain, token_original_id: (
+            token_original_id
+        )
+        mock.get_symbol_uuid.side_effect = lambda chain, token_original_id: (
+            f"uuid-{token_original_id}"
+        )
+        return TokenResolver(mock)
@@ -0,0 +1,324 @@
+import argparse
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from itertools import cycle, islice
+from typing import Dict, List, Optional
+
+from senkalib.chain.osmosis.osmosis_transaction import OsmosisTransaction
+
+from osmosis_plugin.caaj_writer import write_caajs_csv
+from osmosis_plugin.osmosis_plugin import OsmosisPlugin
+from osmosis_plugin.synthetic import SyntheticTransactionGenerator, load_templates
+from osmosis_plugin.token_resolver import TokenResolver
+from osmosis_plugin.token_table_snapshot import SnapshotTokenOriginalIdTable
+
+ADDRESS = "osmo14ls9rcxxd5gqwshj85dae74tcp3umypp786h3m"
+DATA_DIRECTORY = os.path.join(os.path.dirname(__file__), "..", "tests", "data")
+SRC_DIRECTORY = os.path.join(os.path.dirname(__file__), "..", "src")
+FIXTURES = [
+    "swap",
+    "swap2",
+    "join_pool",
+    "exit_pool",
+    "lock_tokens",
+    "delegate",
+    "ibc_transfer",
+    "ibc_received_effect0",
+    "ibc_received_effect1",
+]
+# metrics where a larger value is better; the others are costs.
+HIGHER_IS_BETTER = {"transactions_per_second", "journals_per_second"}
+
+
+def parse_args(argv: list) -> argparse.Namespace:
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=5,
+        help="timed rounds per message type; the fastest round is reported",
+    )
+    parser.add_argument(
+        "--min-transactions",
+        type=int,
+        default=2000,
+        help="transactions converted in each round of a message type",
+    )
+    parser.add_argument(
+        "--mixed-size",
+        type=int,
+        default=20000,
+        help="transactions in the mixed workload",
+    )
+    parser.add_argument(
+        "--synthetic-seed",
+        type=int,
+        default=None,
+        help="build the mixed workload with the synthetic generator and this seed",
+    )
+    parser.add_argument("--output", default=None, help="json file for the results")
+    parser.add_argument(
+        "--compare", default=None, help="json file of an earlier run to compare with"
+    )
+    return parser.parse_args(argv)
+
+
+def load_fixtures() -> Dict[str, List[OsmosisTransaction]]:
+    fixtures: Dict[str, List[OsmosisTransaction]] = {}
+    for name in FIXTURES:
+        with open(
+            os.path.join(DATA_DIRECTORY, f"{name}.json"), encoding="utf-8"
+        ) as jsonfile_local:
+            transaction = OsmosisTransaction(json.load(jsonfile_local))
+        fixtures.setdefault(get_message_type(transaction), []).append(transaction)
+    return fixtures
+
+
+def get_message_type(transaction: OsmosisTransaction) -> str:
+    message_types = []
+    for message in transaction.get_transaction()["data"]["tx"]["body"]["messages"]:
+        message_type = message["@type"].split(".")[-1]
+        if message_type not in message_types:
+            message_types.append(message_type)
+    return "+".join(message_types)
+
+
+def measure_throughput(
+    transactions: List[OsmosisTransaction], repeat: int, min_transactions: int
+) -> dict:
+    resolver = TokenResolver(SnapshotTokenOriginalIdTable([]))
+    rounds = max(1, min_transactions // len(transactions))
+    workload = transactions * rounds
+    for transaction in transactions:
+        OsmosisPlugin.get_caajs(ADDRESS, transaction, resolver)
+
+    best = None
+    journals = 0
+    for _ in range(repeat):
+        journals = 0
+        started_at = time.perf_counter()
+        for transaction in workload:
+            journals += len(OsmosisPlugin.get_caajs(ADDRESS, transaction, resolver))
+        seconds = time.perf_counter() - started_at
+        best = seconds if best is None else min(best, seconds)
+
+    assert best is not None
+    result = {
+        "transactions": len(workload),
+        "journals": journals,
+        "seconds": best,
+        "transactions_per_second": len(workload) / best,
+        "journals_per_second": journals / best,
+    }
+    result.update(measure_allocations(transactions))
+    return result
+
+
+def measure_allocations(transactions: List[OsmosisTransaction]) -> dict:
+    resolver = TokenResolver(SnapshotTokenOriginalIdTable([]))
+    for transaction in transactions:
+        OsmosisPlugin.get_caajs(ADDRESS, transaction, resolver)
+
+    peak_bytes = 0
+    retained_bytes = 0
+    tracemalloc.start()
+    try:
+        for transaction in transactions:
+            before, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            caajs = OsmosisPlugin.get_caajs(ADDRESS, transaction, resolver)
+            after, peak = tracemalloc.get_traced_memory()
+            peak_bytes += peak - before
+            retained_bytes += after - before
+            del caajs
+    finally:
+        tracemalloc.stop()
+    return {
+        "peak_bytes_per_transaction": peak_bytes / len(transactions),
+        "journal_bytes_per_transaction": retained_bytes / len(transactions),
+    }
+
+
+def get_mixed_workload(
+    fixtures: Dict[str, List[OsmosisTransaction]],
+    size: int,
+    synthetic_seed: Optional[int],
+) -> List[OsmosisTransaction]:
+    if synthetic_seed is not None:
+        generator = SyntheticTransactionGenerator(
+            load_templates(DATA_DIRECTORY, FIXTURES), seed=synthetic_seed
+        )
+        return [OsmosisTransaction(raw) for raw in generator.generate(size)]
+
+    transactions = [
+        transaction
+        for message_transactions in fixtures.values()
+        for transaction in message_transactions
+    ]
+    return list(islice(cycle(transactions), size))
+
+
+def measure_mixed(workload: List[OsmosisTransaction], repeat: int) -> dict:
+
+    best = None
+    journals = 0
+    for _ in range(repeat):
+        output = io.StringIO()
+        started_at = time.perf_counter()
+        caajs = OsmosisPlugin.get_caajs_batch(
+            ADDRESS, workload, SnapshotTokenOriginalIdTable([])
+        )
+        journals = write_caajs_csv(caajs, output)
+        seconds = time.perf_counter() - started_at
+        best = seconds if best is None else min(best, seconds)
+
+    assert best is not None
+    tracemalloc.start()
+    try:
+        write_caajs_csv(
+            OsmosisPlugin.get_caajs_batch(
+                ADDRESS, workload, SnapshotTokenOriginalIdTable([])
+            ),
+            io.StringIO(),
+        )
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "transactions": len(workload),
+        "journals": journals,
+        "seconds": best,
+        "transactions_per_second": len(workload) / best,
+        "journals_per_second": journals / best,
+        "peak_bytes": peak,
+    }
+
+
+def measure_startup(repeat: int) -> dict:
+    # importing main.py in a fresh interpreter, as every run of the command does.
+    code = (
+        "import time\n"
+        "started_at = time.perf_counter()\n"
+        "import main\n"
+        "print(time.perf_counter() - started_at)\n"
+    )
+    env = dict(os.environ, PYTHONPATH=SRC_DIRECTORY)
+    best = None
+    for _ in range(repeat):
+        output = subprocess.run(
+            [sys.executable, "-c", code],
+            capture_output=True,
+            check=True,
+            env=env,
+            text=True,
+        ).stdout
+        seconds = float(output)
+        best = seconds if best is None else min(best, seconds)
+    return {"import_seconds": best}
+
+
+def get_metadata(args: argparse.Namespace) -> dict:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            check=True,
+            text=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "commit": commit,
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "machine": platform.machine(),
+        "repeat": args.repeat,
+        "min_transactions": args.min_transactions,
+        "mixed_size": args.mixed_size,
+        "synthetic_seed": args.synthetic_seed,
+    }
+
+
+def run(args: argparse.Namespace) -> dict:
+    fixtures = load_fixtures()
+    message_types = {
+        message_type: measure_throughput(
+            transactions, args.repeat, args.min_transactions
+        )
+        for message_type, transactions in fixtures.items()
+    }
+    return {
+        "metadata": get_metadata(args),
+        "message_types": message_types,
+        "mixed": measure_mixed(
+            get_mixed_workload(fixtures, args.mixed_size, args.synthetic_seed),
+            args.repeat,
+        ),
+        "startup": measure_startup(args.repeat),
+    }
+
+
+def compare(results: dict, baseline: dict) -> List[str]:
+    lines = []
+    workloads = dict(
+        results["message_types"], mixed=results["mixed"], startup=results["startup"]
+    )
+    baseline_workloads = dict(
+        baseline["message_types"],
+        mixed=baseline["mixed"],
+        startup=baseline.get("startup", {}),
+    )
+    for name, metrics in workloads.items():
+        baseline_metrics = baseline_workloads.get(name)
+        if baseline_metrics is None:
+            continue
+        for metric, value in metrics.items():
+            previous = baseline_metrics.get(metric)
+            if metric in ("transactions", "journals", "seconds") or not previous:
+                continue
+            change = (value - previous) / previous * 100
+            regressed = change < 0 if metric in HIGHER_IS_BETTER else change > 0
+            mark = " (worse)" if regressed else ""
+            lines.append(
+                f"{name} {metric}: {previous:.1f} -> {value:.1f} {change:+.1f}%{mark}"
+            )
+    return lines
+
+
+def print_results(results: dict) -> None:
+    workloads = dict(results["message_types"], mixed=results["mixed"])
+    for name, metrics in workloads.items():
+        print(
+            f"{name}: {metrics['transactions_per_second']:.0f} tx/s, "
+            f"{metrics['journals_per_second']:.0f} journals/s",
+            file=sys.stderr,
+        )
+    print(
+        f"startup: {results['startup']['import_seconds']:.3f} s to import main",
+        file=sys.stderr,
+    )
+
+
+if __name__ == "__main__":
+    args = parse_args(sys.argv[1:])
+    results = run(args)
+    print_results(results)
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as baseline_file:
+            for line in compare(results, json.load(baseline_file)):
+                print(line, file=sys.stderr)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as output_file:
+            json.dump(results, output_file, indent=2)
+    else:
+        print(json.dumps(results, indent=2))
@@ -1,33 +1,363 @@
+import argparse
 import sys
+from typing import Iterable, Iterator, Union
 
-import pandas as pd
+from senkalib.caaj_journal import CaajJournal
 from senkalib.chain.osmosis.osmosis_transaction_generator import (
     OsmosisTransactionGenerator,
 )
+from senkalib.chain.transaction import Transaction
 from senkalib.senka_setting import SenkaSetting
-from senkalib.token_original_id_table import TokenOriginalIdTable
 
+from osmosis_plugin.caaj_writer import write_caajs_csv
+from osmosis_plugin.checkpoint import (
+    DEFAULT_CHECKPOINT_INTERVAL,
+    get_caajs_checkpointed,
+    has_checkpoint,
+)
+from osmosis_plugin.dataset_writer import DEFAULT_ROW_GROUP_SIZE, FORMATS, write_dataset
+from osmosis_plugin.decoder import DecodedTransaction, decode_transaction_bytes
+from osmosis_plugin.external_sort import DEFAULT_BUFFER_SIZE
+from osmosis_plugin.fetcher import OsmosisTransactionFetcher
+from osmosis_plugin.journal_builder import JournalBuilder
+from osmosis_plugin.multi_address import MultiAddressConverter
 from osmosis_plugin.osmosis_plugin import OsmosisPlugin
+from osmosis_plugin.parallel import DEFAULT_CHUNK_SIZE, get_caajs_parallel
+from osmosis_plugin.pipeline import DEFAULT_PREFETCH, get_caajs_pipelined
+from osmosis_plugin.profiler import DEFAULT_INTERVAL, RunProfiler
+from osmosis_plugin.token_table_snapshot import (
+    DEFAULT_MAX_AGE,
+    get_default_directory,
+    load_token_table,
+)
+from osmosis_plugin.transaction_cache import TransactionCache
+from osmosis_plugin.watch import (
+    DEFAULT_POLL_INTERVAL,
+    CsvDirectorySink,
+    MetricsServer,
+    Watcher,
+)
 
 TOKEN_ORIGINAL_IDS_URL = "https://raw.githubusercontent.com/ca3-caaip/token_original_id/master/token_original_id.csv"
 
+
+def parse_args(argv: list) -> argparse.Namespace:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("address", nargs="?")
+    parser.add_argument(
+        "--addresses-file",
+        default=None,
+        help="file with one address per line, converted in one process; not with "
+        "--workers, --pipeline, --stream, --checkpoint or --resume",
+    )
+    parser.add_argument(
+        "--output-dir",
+        default=".",
+        help="directory receiving the csv of each address with --addresses-file, "
+        "or the dataset written by --format",
+    )
+    parser.add_argument(
+        "--format",
+        choices=FORMATS,
+        default="csv",
+        help="csv goes to stdout; the other formats are written under --output-dir, "
+        "partitioned by address and year",
+    )
+    parser.add_argument(
+        "--row-group-size",
+        type=int,
+        default=DEFAULT_ROW_GROUP_SIZE,
+        help="journals per parquet row group or arrow record batch",
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="write csv rows as they are produced instead of building a DataFrame",
+    )
+    parser.add_argument(
+        "--no-sort",
+        action="store_true",
+        help="keep the order in which journals are produced",
+    )
+    parser.add_argument(
+        "--buffer-rows",
+        type=int,
+        default=DEFAULT_BUFFER_SIZE,
+        help="with --stream, journals kept in memory before sorted runs spill to disk",
+    )
+    parser.add_argument("--tmp-dir", default=None)
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="convert transactions in a pool of this many processes; not with "
+        "--checkpoint",
+    )
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument(
+        "--pipeline",
+        action="store_true",
+        help="fetch pages in a background thread while converting earlier ones; "
+        "not with --cache, --checkpoint or --workers",
+    )
+    parser.add_argument(
+        "--prefetch",
+        type=int,
+        default=DEFAULT_PREFETCH,
+        help="with --pipeline, pages fetched ahead of conversion",
+    )
+    parser.add_argument(
+        "--cache",
+        default=None,
+        help="sqlite file caching transactions; re-runs only fetch newer ones",
+    )
+    parser.add_argument(
+        "--checkpoint",
+        default=None,
+        help="directory where converted journals and the cursor are checkpointed",
+    )
+    parser.add_argument(
+        "--checkpoint-interval", type=int, default=DEFAULT_CHECKPOINT_INTERVAL
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="with --checkpoint and --cache, continue from the last checkpoint",
+    )
+    parser.add_argument(
+        "--token-table-dir",
+        default=get_default_directory(),
+        help="directory holding the token_original_id snapshot and its index",
+    )
+    parser.add_argument(
+        "--token-table-max-age",
+        type=float,
+        default=DEFAULT_MAX_AGE,
+        help="seconds a snapshot is used before it is revalidated",
+    )
+    parser.add_argument(
+        "--offline",
+        action="store_true",
+        help="use the local token_original_id snapshot without any network access",
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="keep polling for new transactions and append their journals to "
+        "<address>.csv under --output-dir; needs --cache",
+    )
+    parser.add_argument(
+        "--poll-interval",
+        type=float,
+        default=DEFAULT_POLL_INTERVAL,
+        help="with --watch, seconds between polls",
+    )
+    parser.add_argument(
+        "--metrics-port",
+        type=int,
+        default=None,
+        help="with --watch, serve prometheus metrics on 127.0.0.1:PORT/metrics",
+    )
+    parser.add_argument(
+        "--profile",
+        default=None,
+        metavar="DIR",
+        help="write profile.pstats and flamegraph stacks.collapsed of the run to DIR; "
+        "cProfile only sees the main thread, so --pipeline needs "
+        "--profile-sampling-only, and --workers processes are not profiled at all",
+    )
+    parser.add_argument(
+        "--profile-interval",
+        type=float,
+        default=DEFAULT_INTERVAL,
+        help="seconds between stack samples with --profile",
+    )
+    parser.add_argument(
+        "--profile-sampling-only",
+        action="store_true",
+        help="with --profile, skip cProfile and only sample stacks",
+    )
+    parser.add_argument(
+        "--stats",
+        action="store_true",
+        help="print message counts, handler latencies, token resolver hit rates "
+        "and parse/convert time to stderr",
+    )
+    args = parser.parse_args(argv)
+    if (args.address is None) == (args.addresses_file is None):
+        parser.error("give either an address or --addresses-file")
+    if args.watch and not args.cache:
+        parser.error("--watch needs --cache to keep its cursors")
+    if args.workers > 1 and args.checkpoint:
+        parser.error("--checkpoint converts in order and cannot use --workers")
+    if args.pipeline and (args.cache or args.checkpoint or args.workers > 1):
+        parser.error(
+            "--pipeline fetches from the api itself and cannot be combined with "
+            "--cache, --checkpoint or --workers"
+        )
+    if args.resume and not args.cache:
+        # the api pages newest first, so transactions that arrived since the
+        # interruption would shift every position of the checkpoint cursor.
+        parser.error("--resume needs --cache to see the same history again")
+    if args.addresses_file:
+        for flag, given in [
+            ("--workers", args.workers > 1),
+            ("--pipeline", args.pipeline),
+            ("--stream", args.stream),
+            ("--checkpoint", args.checkpoint),
+            ("--resume", args.resume),
+        ]:
+            if given:
+                parser.error(f"{flag} is not supported with --addresses-file")
+    if args.profile and args.workers > 1:
+        parser.error("--profile cannot see the processes of --workers")
+    if args.profile and args.pipeline and not args.profile_sampling_only:
+        # the stack sampler sees every thread, cProfile only the main one.
+        parser.error("--profile with --pipeline needs --profile-sampling-only")
+    return args
+
+
+def read_addresses(path: str) -> list:
+    with open(path, encoding="utf-8") as addresses_file:
+        return [line.strip() for line in addresses_file if line.strip()]
+
+
+def watch(args: argparse.Namespace, token_original_ids) -> None:
+    addresses = (
+        read_addresses(args.addresses_file) if args.addresses_file else [args.address]
+    )
+    watcher = Watcher(
+        addresses,
+        TransactionCache(args.cache),
+        token_original_ids,
+        OsmosisTransactionFetcher(),
+        CsvDirectorySink(args.output_dir),
+        args.poll_interval,
+    )
+    watcher.install_signal_handlers()
+    if args.metrics_port is None:
+        watcher.run()
+    else:
+        with MetricsServer(watcher.metrics, args.metrics_port):
+            watcher.run()
+    watcher.cache.close()
+
+
+def get_cached_bodies(args: argparse.Namespace) -> Iterator[str]:
+    cache = TransactionCache(args.cache)
+    # a resumed run must see the same history as the interrupted one.
+    if not (args.resume and args.checkpoint and has_checkpoint(args.checkpoint)):
+        cache.update(args.address, OsmosisTransactionFetcher())
+    return (body for _, body in cache.get_raw_transactions(args.address))
+
+
+def get_transactions(
+    args: argparse.Namespace,
+) -> Iterable[Union[Transaction, DecodedTransaction]]:
+    if args.cache:
+        decode = OsmosisPlugin.get_decoder(decode_transaction_bytes)
+        return (decode(body) for body in get_cached_bodies(args))
+    return OsmosisTransactionGenerator.get_transactions(
+        SenkaSetting({}), args.address, None, {}
+    )
+
+
+def run(args: argparse.Namespace) -> None:
+    address = args.address
+    stats = OsmosisPlugin.enable_stats() if args.stats else None
+    token_original_ids = load_token_table(
+        TOKEN_ORIGINAL_IDS_URL,
+        args.token_table_dir,
+        offline=args.offline,
+        max_age=args.token_table_max_age,
+    )
+    if args.watch:
+        watch(args, token_original_ids)
+        if stats is not None:
+            sys.stderr.write(stats.format_summary())
+        return
+
+    if args.addresses_file:
+        converter = MultiAddressConverter(
+            read_addresses(args.addresses_file),
+            TransactionCache(args.cache or ":memory:"),
+            token_original_ids,
+        )
+        converter.update(OsmosisTransactionFetcher())
+        if args.format == "csv":
+            converter.write_csv(args.output_dir, not args.no_sort, args.buffer_rows)
+        else:
+            converter.write_dataset(args.output_dir, args.format, args.row_group_size)
+        if stats is not None:
+            sys.stderr.write(stats.format_summary())
+        return
+
+    caajs: Union[Iterable[CaajJournal], JournalBuilder]
+    if args.pipeline:
+        caajs = get_caajs_pipelined(
+            address,
+            OsmosisTransactionFetcher(),
+            token_original_ids,
+            prefetch=args.prefetch,
+        )
+    elif args.workers > 1:
+        # the workers decode the cached bodies themselves.
+        caajs = get_caajs_parallel(
+            address,
+            get_cached_bodies(args) if args.cache else get_transactions(args),
+            token_original_ids,
+            args.workers,
+            args.chunk_size,
+        )
+    elif args.checkpoint:
+        caajs = get_caajs_checkpointed(
+            address,
+            get_transactions(args),
+            token_original_ids,
+            args.checkpoint,
+            args.checkpoint_interval,
+            args.resume,
+        )
+    elif args.stream and args.format == "csv":
+        caajs = OsmosisPlugin.get_caajs_batch(
+            address, get_transactions(args), token_original_ids
+        )
+    else:
+        caajs = OsmosisPlugin.get_caajs_columns(
+            address, get_transactions(args), token_original_ids
+        )
+
+    if args.format != "csv":
+        if not isinstance(caajs, JournalBuilder):
+            caajs = JournalBuilder.from_caajs(caajs)
+        write_dataset(caajs, args.output_dir, address, args.format, args.row_group_size)
+    elif args.stream:
+        write_caajs_csv(
+            caajs.to_caajs() if isinstance(caajs, JournalBuilder) else caajs,
+            sys.stdout,
+            sort=not args.no_sort,
+            buffer_size=args.buffer_rows,
+            directory=args.tmp_dir,
+        )
+    else:
+        if not isinstance(caajs, JournalBuilder):
+            caajs = JournalBuilder.from_caajs(caajs)
+        if not args.no_sort:
+            caajs.sort()
+        caajs.write_csv(sys.stdout)
+
+    if stats is not None:
+        sys.stderr.write(stats.format_summary())
+
+
 if __name__ == "__main__":
-    args = sys.argv
-    address = args[1]
-    caaj = []
-    settings = SenkaSetting({})
-    token_original_ids = TokenOriginalIdTable(TOKEN_ORIGINAL_IDS_URL)
-    transactions = OsmosisTransactionGenerator.get_transactions(
-        settings, address, None, {}
-    )
-    for transaction in transactions:
-        if OsmosisPlugin.can_handle(transaction):
-            caaj_peace = OsmosisPlugin.get_caajs(
-                address, transaction, token_original_ids
-            )
-            caaj.extend(caaj_peace)
-
-    df = pd.DataFrame(caaj)
-    df = df.sort_values("executed_at")
-    caaj_csv = df.to_csv(None, index=False)
-    print(caaj_csv)
+    args = parse_args(sys.argv[1:])
+    if args.profile:
+        with RunProfiler(
+            args.profile,
+            args.profile_interval,
+            deterministic=not args.profile_sampling_only,
+        ):
+            run(args)
+    else:
+        run(args)
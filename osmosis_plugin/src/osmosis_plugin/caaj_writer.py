@@ -0,0 +1,39 @@
+import csv
+import dataclasses
+from operator import attrgetter
+from typing import Iterable, Optional, TextIO
+
+from senkalib.caaj_journal import CaajJournal
+
+from osmosis_plugin.external_sort import DEFAULT_BUFFER_SIZE, external_sort
+
+CAAJ_FIELDS = [field.name for field in dataclasses.fields(CaajJournal)]
+
+
+class CaajCsvWriter:
+    def __init__(self, stream: TextIO):
+        self.stream = stream
+        self.writer = csv.writer(stream, lineterminator="\n")
+        self.writer.writerow(CAAJ_FIELDS)
+
+    def write(self, caaj: CaajJournal) -> None:
+        self.writer.writerow([getattr(caaj, name) for name in CAAJ_FIELDS])
+
+    def write_all(self, caajs: Iterable[CaajJournal]) -> int:
+        count = 0
+        for caaj in caajs:
+            self.write(caaj)
+            count += 1
+        return count
+
+
+def write_caajs_csv(
+    caajs: Iterable[CaajJournal],
+    stream: TextIO,
+    sort: bool = True,
+    buffer_size: int = DEFAULT_BUFFER_SIZE,
+    directory: Optional[str] = None,
+) -> int:
+    if sort:
+        caajs = external_sort(caajs, attrgetter("executed_at"), buffer_size, directory)
+    return CaajCsvWriter(stream).write_all(caajs)
@@ -0,0 +1,123 @@
+import json
+import os
+import pickle
+from typing import Iterable, Iterator, Optional, Union
+
+from senkalib.caaj_journal import CaajJournal
+from senkalib.chain.transaction import Transaction
+from senkalib.token_original_id_table import TokenOriginalIdTable
+
+from osmosis_plugin.decoder import DecodedTransaction
+from osmosis_plugin.osmosis_plugin import OsmosisPlugin
+from osmosis_plugin.token_resolver import TokenResolver
+
+DEFAULT_CHECKPOINT_INTERVAL = 1000
+STATE_FILE = "state.json"
+JOURNALS_FILE = "journals.pickle"
+
+
+def get_caajs_checkpointed(
+    address: str,
+    transactions: Iterable[Union[Transaction, DecodedTransaction]],
+    token_table: Union[TokenOriginalIdTable, TokenResolver],
+    directory: str,
+    interval: int = DEFAULT_CHECKPOINT_INTERVAL,
+    resume: bool = False,
+) -> Iterator[CaajJournal]:
+    # journals are appended to a pickle stream; every interval transactions the
+    # stream is synced and state.json records the cursor and the stream length.
+    # Resuming truncates anything written after the last checkpoint, replays the
+    # stored journals and continues after the cursor.
+    os.makedirs(directory, exist_ok=True)
+    state_path = os.path.join(directory, STATE_FILE)
+    journals_path = os.path.join(directory, JOURNALS_FILE)
+    token_table = TokenResolver.of(token_table)
+
+    state = _load_state(state_path) if resume else None
+    if state is not None and state["address"] != address:
+        raise ValueError(
+            f"checkpoint belongs to another address. address: {state['address']}"
+        )
+
+    processed = 0
+    last_transaction_id = None
+    if state is not None:
+        processed = state["processed"]
+        last_transaction_id = state["last_transaction_id"]
+        with open(journals_path, "r+b") as journals_file:
+            journals_file.truncate(state["journals_size"])
+        yield from _read_journals(journals_path)
+
+    with open(journals_path, "ab" if state is not None else "wb") as journals_file:
+        position = -1
+        for position, transaction in enumerate(transactions):
+            if position < processed:
+                if (
+                    position == processed - 1
+                    and transaction.get_transaction_id() != last_transaction_id
+                ):
+                    raise ValueError(
+                        f"transactions differ from the checkpoint. transaction_id: {transaction.get_transaction_id()}"
+                    )
+                continue
+
+            caajs = list(
+                OsmosisPlugin.get_caajs_batch(address, [transaction], token_table)
+            )
+            for caaj in caajs:
+                pickle.dump(caaj, journals_file, pickle.HIGHEST_PROTOCOL)
+            processed = position + 1
+            last_transaction_id = transaction.get_transaction_id()
+            yield from caajs
+
+            if processed % interval == 0:
+                _save_checkpoint(
+                    state_path, journals_file, address, processed, last_transaction_id
+                )
+
+        if position + 1 < processed:
+            raise ValueError("transactions are fewer than the checkpoint.")
+        _save_checkpoint(
+            state_path, journals_file, address, processed, last_transaction_id
+        )
+
+
+def has_checkpoint(directory: str) -> bool:
+    return os.path.exists(os.path.join(directory, STATE_FILE))
+
+
+def _save_checkpoint(
+    state_path: str,
+    journals_file,
+    address: str,
+    processed: int,
+    last_transaction_id: Optional[str],
+) -> None:
+    journals_file.flush()
+    os.fsync(journals_file.fileno())
+    state = {
+        "address": address,
+        "processed": processed,
+        "last_transaction_id": last_transaction_id,
+        "journals_size": journals_file.tell(),
+    }
+    temporary_path = f"{state_path}.tmp"
+    with open(temporary_path, "w", encoding="utf-8") as state_file:
+        json.dump(state, state_file)
+    os.replace(temporary_path, state_path)
+
+
+def _load_state(state_path: str) -> Optional[dict]:
+    if not os.path.exists(state_path):
+        return None
+    with open(state_path, encoding="utf-8") as state_file:
+        return json.load(state_file)
+
+
+def _read_journals(journals_path: str) -> Iterator[CaajJournal]:
+    with open(journals_path, "rb") as journals_file:
+        while True:
+            try:
+                yield pickle.load(journals_file)
+            except EOFError:
+                return
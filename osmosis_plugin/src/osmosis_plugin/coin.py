@@ -0,0 +1,74 @@
+import re
+from functools import lru_cache
+from typing import Dict, NamedTuple, Optional, Tuple
+
+COIN_CACHE_SIZE = 4096
+COIN_PATTERN = re.compile(r"(\d+)(.*)")
+NATIVE_DENOMS = frozenset(["uosmo", "uion", ""])
+DEFAULT_DECIMALS = 6
+POOL_DENOM_PREFIX = "gamm/pool/"
+POOL_DECIMALS = 18
+DENOM_DECIMALS: Dict[str, int] = {
+    "uosmo": 6,
+    "uion": 6,
+    # aevmos
+    "ibc/6AE98883D4D5D5FF9E50D7130F1305DA2FFA0C652D1DD9C123657C6B4EB2DF8A": 18,
+    # inj
+    "ibc/64BA6E31FE887D66C6F8F31C7B1A80C7CA179239677B4088BB55F5EA07DBE273": 18,
+}
+
+
+class Coin(NamedTuple):
+    amount: str
+    denom: str
+    decimals: int
+
+    @property
+    def token_original_id(self) -> Optional[str]:
+        return None if self.denom in NATIVE_DENOMS else self.denom
+
+
+@lru_cache(maxsize=COIN_CACHE_SIZE)
+def parse_coin(value: str) -> Coin:
+    matched = COIN_PATTERN.search(value)
+    if matched is None:
+        raise ValueError(f"coin amount is not found. value: {value}")
+
+    amount, denom = matched.groups()
+    decimals = get_decimals(denom)
+    return Coin(format_amount(amount, decimals), denom, decimals)
+
+
+@lru_cache(maxsize=COIN_CACHE_SIZE)
+def parse_coins(value: str) -> Tuple[Coin, ...]:
+    return tuple(parse_coin(coin) for coin in value.split(","))
+
+
+def get_decimals(denom: str) -> int:
+    decimals = DENOM_DECIMALS.get(denom)
+    if decimals is not None:
+        return decimals
+    return POOL_DECIMALS if denom.startswith(POOL_DENOM_PREFIX) else DEFAULT_DECIMALS
+
+
+def format_amount(amount: str, decimals: int) -> str:
+    # formats amount / 10**decimals exactly as str() of the Decimal quotient,
+    # which drops trailing zeros only after the decimal point and switches to
+    # scientific notation below 1E-6.
+    digits = amount.lstrip("0")
+    if not digits:
+        return "0"
+    if decimals == 0:
+        return digits
+
+    point = len(digits) - decimals
+    if point > 0:
+        fraction = digits[point:].rstrip("0")
+        return digits[:point] + "." + fraction if fraction else digits[:point]
+
+    significant = digits.rstrip("0")
+    if point < -5:
+        if len(significant) == 1:
+            return significant + "E" + str(point - 1)
+        return significant[0] + "." + significant[1:] + "E" + str(point - 1)
+    return "0." + "0" * -point + significant
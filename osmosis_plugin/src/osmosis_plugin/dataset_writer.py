@@ -0,0 +1,75 @@
+import gzip
+import os
+from typing import Dict
+
+from osmosis_plugin.journal_builder import JournalBuilder
+
+FORMATS = ["csv", "csv.gz", "parquet", "arrow"]
+ARROW_FORMATS = frozenset(["parquet", "arrow"])
+DEFAULT_ROW_GROUP_SIZE = 64 * 1024
+PARQUET_COMPRESSION = "zstd"
+
+
+def write_dataset(
+    builder: JournalBuilder,
+    directory: str,
+    address: str,
+    output_format: str,
+    row_group_size: int = DEFAULT_ROW_GROUP_SIZE,
+) -> Dict[str, int]:
+    # hive-style address=/year= directories let dataset readers skip whole
+    # partitions, and rows sorted by executed_at keep the row group statistics
+    # of executed_at narrow.
+    if output_format not in FORMATS:
+        raise ValueError(f"output format is not supported. format: {output_format}")
+    if output_format in ARROW_FORMATS:
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError as error:
+            raise ImportError(
+                f"pyarrow is required for {output_format}. install the arrow extra."
+            ) from error
+
+    counts = {}
+    partitions = builder.partition("executed_at", _get_year)
+    for year, indices in sorted(partitions.items()):
+        partition = builder.select(indices)
+        partition.sort()
+        partition_directory = os.path.join(
+            directory, f"address={address}", f"year={year}"
+        )
+        os.makedirs(partition_directory, exist_ok=True)
+        path = os.path.join(partition_directory, f"part-0.{output_format}")
+        _write_partition(partition, path + ".tmp", output_format, row_group_size)
+        os.replace(path + ".tmp", path)
+        counts[path] = len(partition)
+    return counts
+
+
+def _get_year(executed_at: str) -> str:
+    return executed_at[:4]
+
+
+def _write_partition(
+    builder: JournalBuilder, path: str, output_format: str, row_group_size: int
+) -> None:
+    if output_format == "csv":
+        with open(path, "w", encoding="utf-8", newline="") as output:
+            builder.write_csv(output)
+    elif output_format == "csv.gz":
+        with gzip.open(path, "wt", encoding="utf-8", newline="") as output:
+            builder.write_csv(output)
+    elif output_format == "parquet":
+        builder.write_parquet(
+            path,
+            row_group_size=row_group_size,
+            compression=PARQUET_COMPRESSION,
+            write_statistics=True,
+        )
+    else:
+        import pyarrow as pa
+
+        table = builder.to_arrow()
+        with pa.OSFile(path, "wb") as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table, max_chunksize=row_group_size)
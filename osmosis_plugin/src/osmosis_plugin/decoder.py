@@ -0,0 +1,82 @@
+import json
+import re
+from datetime import datetime
+from decimal import Decimal
+from typing import List, NamedTuple, Optional, Union
+
+from senkalib.chain.transaction import Transaction
+
+from osmosis_plugin.event_index import EventIndex
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+TIMESTAMP_FORMAT = "%Y-%m-%dT%H:%M:%SZ"
+TIMESTAMP_PATTERN = re.compile(r"\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}Z")
+
+
+class Fee(NamedTuple):
+    amount: str
+    denom: str
+
+
+class DecodedTransaction(NamedTuple):
+    transaction_id: str
+    chain_id: str
+    code: int
+    timestamp: str
+    messages: List[dict]
+    events: EventIndex
+    fee: Optional[Fee]
+
+    @classmethod
+    def of(
+        cls, transaction: Union["DecodedTransaction", Transaction]
+    ) -> "DecodedTransaction":
+        if isinstance(transaction, DecodedTransaction):
+            return transaction
+        return decode_transaction(transaction.get_transaction())
+
+    def get_transaction_id(self) -> str:
+        return self.transaction_id
+
+    def get_timestamp(self) -> str:
+        return self.timestamp
+
+    def get_transaction_fee(self) -> Decimal:
+        return Decimal("0") if self.fee is None else Decimal(self.fee.amount)
+
+
+def decode_transaction(raw_transaction: dict) -> DecodedTransaction:
+    # keeps only what the handlers read; raw_log, signatures and the rest of
+    # the payload are dropped with the dict.
+    header = raw_transaction["header"]
+    data = raw_transaction["data"]
+    fee_amounts = data["tx"]["auth_info"]["fee"]["amount"]
+    fee = None
+    if fee_amounts:
+        fee = Fee(fee_amounts[0]["amount"], fee_amounts[0]["denom"])
+    return DecodedTransaction(
+        data["txhash"],
+        header["chain_id"],
+        data["code"],
+        format_timestamp(header["timestamp"]),
+        data["tx"]["body"]["messages"],
+        EventIndex(data.get("logs") or []),
+        fee,
+    )
+
+
+def format_timestamp(timestamp: str) -> str:
+    # same as str(datetime.strptime(...)) without its cost for well-formed values.
+    if TIMESTAMP_PATTERN.fullmatch(timestamp) is None:
+        return str(datetime.strptime(timestamp, TIMESTAMP_FORMAT))
+    return f"{timestamp[:10]} {timestamp[11:19]}"
+
+
+def decode_transaction_bytes(body: Union[bytes, str]) -> DecodedTransaction:
+    if orjson is not None:
+        return decode_transaction(orjson.loads(body))
+    return decode_transaction(json.loads(body))
@@ -0,0 +1,58 @@
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+
+@dataclass
+class Event:
+    msg_index: int
+    position: int
+    type: str
+    attributes: List[Tuple[str, str]]
+    values: Dict[str, List[str]] = field(default_factory=dict)
+
+    def get(self, key: str) -> List[str]:
+        return self.values.get(key, [])
+
+    def first(self, key: str) -> Optional[str]:
+        values = self.values.get(key)
+        return values[0] if values else None
+
+
+class EventIndex:
+    def __init__(self, logs: list):
+        # logs are indexed on the first lookup, so skipped transactions never are.
+        self.logs: Optional[list] = logs
+        self.events: Dict[str, List[Event]] = {}
+        self.events_by_msg: Dict[int, Dict[str, List[Event]]] = {}
+
+    @classmethod
+    def from_transaction(cls, transaction) -> "EventIndex":
+        return cls(transaction.get_transaction()["data"].get("logs", []))
+
+    def get_events(self, event_type: str, msg_index: Optional[int] = None) -> list:
+        if self.logs is not None:
+            logs, self.logs = self.logs, None
+            self._index(logs)
+        if msg_index is None:
+            return self.events.get(event_type, [])
+        return self.events_by_msg.get(msg_index, {}).get(event_type, [])
+
+    def _index(self, logs: list) -> None:
+        for log_index, log in enumerate(logs):
+            # msg_index is omitted for the first message by some API versions.
+            msg_index = int(log.get("msg_index", log_index))
+            events_of_msg = self.events_by_msg.setdefault(msg_index, {})
+            for position, raw_event in enumerate(log.get("events", [])):
+                attributes = []
+                values: Dict[str, List[str]] = {}
+                for attribute in raw_event.get("attributes", []):
+                    key = attribute["key"]
+                    value = attribute.get("value")
+                    attributes.append((key, value))
+                    values.setdefault(key, []).append(value)
+
+                event = Event(
+                    msg_index, position, raw_event["type"], attributes, values
+                )
+                self.events.setdefault(event.type, []).append(event)
+                events_of_msg.setdefault(event.type, []).append(event)
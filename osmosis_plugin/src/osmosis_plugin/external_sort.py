@@ -0,0 +1,52 @@
+import heapq
+import os
+import pickle
+import tempfile
+from typing import Any, Callable, Iterable, Iterator, List, Optional
+
+DEFAULT_BUFFER_SIZE = 100000
+
+
+def external_sort(
+    records: Iterable,
+    key: Callable[[Any], Any],
+    buffer_size: int = DEFAULT_BUFFER_SIZE,
+    directory: Optional[str] = None,
+) -> Iterator:
+    # keeps at most buffer_size records in memory and spills sorted runs to disk.
+    # heapq.merge prefers earlier runs on ties, so equal keys keep input order.
+    with tempfile.TemporaryDirectory(dir=directory) as run_directory:
+        run_paths: List[str] = []
+        buffer = []
+        for record in records:
+            buffer.append(record)
+            if len(buffer) >= buffer_size:
+                buffer.sort(key=key)
+                run_paths.append(_write_run(buffer, run_directory, len(run_paths)))
+                buffer = []
+
+        buffer.sort(key=key)
+        if not run_paths:
+            yield from buffer
+            return
+
+        runs = [_read_run(path) for path in run_paths]
+        runs.append(iter(buffer))
+        yield from heapq.merge(*runs, key=key)
+
+
+def _write_run(records: list, directory: str, number: int) -> str:
+    path = os.path.join(directory, f"run_{number}.pickle")
+    with open(path, "wb") as run_file:
+        for record in records:
+            pickle.dump(record, run_file, pickle.HIGHEST_PROTOCOL)
+    return path
+
+
+def _read_run(path: str) -> Iterator:
+    with open(path, "rb") as run_file:
+        while True:
+            try:
+                yield pickle.load(run_file)
+            except EOFError:
+                return
@@ -0,0 +1,40 @@
+from typing import Iterator, List, Optional
+
+import requests
+
+COSMOSTATION_TXS_URL = "https://api-osmosis.cosmostation.io/v1/account/new_txs"
+PAGE_SIZE = 50
+
+
+class OsmosisTransactionFetcher:
+    def __init__(
+        self,
+        base_url: str = COSMOSTATION_TXS_URL,
+        page_size: int = PAGE_SIZE,
+        timeout: float = 30,
+        session: Optional[requests.Session] = None,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.page_size = page_size
+        self.timeout = timeout
+        self.session = session if session is not None else requests.Session()
+
+    def get_page(self, address: str, id_from: int) -> List[dict]:
+        response = self.session.get(
+            f"{self.base_url}/{address}",
+            params={"from": id_from, "limit": self.page_size},
+            timeout=self.timeout,
+        )
+        response.raise_for_status()
+        return response.json()
+
+    def get_pages(self, address: str, id_from: int = 0) -> Iterator[List[dict]]:
+        # pages come newest first; the cursor is the header id of the last tx seen.
+        id_cursor = id_from
+        while True:
+            page = self.get_page(address, id_cursor)
+            if page:
+                yield page
+                id_cursor = int(page[-1]["header"]["id"])
+            if len(page) < self.page_size:
+                return
@@ -0,0 +1,189 @@
+import csv
+from array import array
+from operator import attrgetter
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    TextIO,
+    Tuple,
+    cast,
+)
+
+from senkalib.caaj_journal import CaajJournal
+
+from osmosis_plugin.caaj_writer import CAAJ_FIELDS
+
+# values repeated by few journals are kept as plain lists; the others are
+# dictionary-encoded.
+PLAIN_FIELDS = frozenset(["transaction_id", "trade_uuid", "amount"])
+CODE_TYPE = "i"
+
+
+class DictionaryColumn:
+    def __init__(self):
+        # -1 is the code of None.
+        self.codes = array(CODE_TYPE)
+        self.values: List[str] = []
+        self.lookup: dict = {}
+
+    def append(self, value: Optional[str]) -> None:
+        if value is None:
+            self.codes.append(-1)
+            return
+        code = self.lookup.get(value)
+        if code is None:
+            code = len(self.values)
+            self.lookup[value] = code
+            self.values.append(value)
+        self.codes.append(code)
+
+    def __getitem__(self, index: int) -> Optional[str]:
+        code = self.codes[index]
+        return None if code < 0 else self.values[code]
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def select(self, indices: Sequence[int]) -> "DictionaryColumn":
+        # the dictionary is shared, so a selection may keep unused values.
+        column = DictionaryColumn()
+        column.values = self.values
+        column.lookup = self.lookup
+        codes = self.codes
+        column.codes = array(CODE_TYPE, [codes[index] for index in indices])
+        return column
+
+    def get_sort_keys(self) -> List[int]:
+        ranks = [0] * (len(self.values) + 1)
+        for rank, code in enumerate(
+            sorted(range(len(self.values)), key=self.values.__getitem__)
+        ):
+            ranks[code] = rank + 1
+        # code -1 reads the last slot, which stays 0 so None sorts first.
+        return [ranks[code] for code in self.codes]
+
+
+class PlainColumn(list):
+    def select(self, indices: Sequence[int]) -> "PlainColumn":
+        return PlainColumn([self[index] for index in indices])
+
+    def get_sort_keys(self) -> list:
+        return [(value is not None, value or "") for value in self]
+
+
+class JournalBuilder:
+    def __init__(self):
+        self.columns = {
+            name: PlainColumn() if name in PLAIN_FIELDS else DictionaryColumn()
+            for name in CAAJ_FIELDS
+        }
+        self.size = 0
+        self.appenders = [column.append for column in self.columns.values()]
+
+    @classmethod
+    def from_caajs(cls, caajs: Iterable[CaajJournal]) -> "JournalBuilder":
+        builder = cls()
+        builder.extend(caajs)
+        return builder
+
+    def append(self, *fields: Any) -> None:
+        # takes the fields in the positional order of CaajJournal.
+        for append, value in zip(self.appenders, fields):
+            append(value)
+        self.size += 1
+
+    def extend(self, caajs: Iterable[CaajJournal]) -> None:
+        get_fields = attrgetter(*CAAJ_FIELDS)
+        for caaj in caajs:
+            self.append(*get_fields(caaj))
+
+    def __len__(self) -> int:
+        return self.size
+
+    def sort(self, field: str = "executed_at") -> None:
+        keys = self.columns[field].get_sort_keys()
+        order = sorted(range(self.size), key=keys.__getitem__)
+        self.columns = {
+            name: column.select(order) for name, column in self.columns.items()
+        }
+        self.appenders = [column.append for column in self.columns.values()]
+
+    def select(self, indices: Sequence[int]) -> "JournalBuilder":
+        builder = JournalBuilder()
+        builder.columns = {
+            name: column.select(indices) for name, column in self.columns.items()
+        }
+        builder.appenders = [column.append for column in builder.columns.values()]
+        builder.size = len(indices)
+        return builder
+
+    def partition(self, field: str, key: Callable[[str], str]) -> Dict[str, List[int]]:
+        # maps key(value) of a dictionary-encoded field to the indices of its rows.
+        column = self.columns[field]
+        assert isinstance(column, DictionaryColumn)
+        keys = [key(value) for value in column.values]
+        partitions: Dict[str, List[int]] = {}
+        for index, code in enumerate(column.codes):
+            partitions.setdefault(keys[code], []).append(index)
+        return partitions
+
+    def rows(self) -> Iterator[Tuple[Optional[str], ...]]:
+        columns = list(self.columns.values())
+        for index in range(self.size):
+            yield tuple(column[index] for column in columns)
+
+    def to_caajs(self) -> List[CaajJournal]:
+        # fee journals have no trade_uuid and amounts are strings, as in every
+        # CaajJournal the plugin makes, which its annotations do not allow.
+        return [CaajJournal(*cast(Tuple[Any, ...], row)) for row in self.rows()]
+
+    def write_csv(self, stream: TextIO) -> int:
+        writer = csv.writer(stream, lineterminator="\n")
+        writer.writerow(CAAJ_FIELDS)
+        writer.writerows(self.rows())
+        return self.size
+
+    def to_pandas(self):
+        import numpy as np
+        import pandas as pd
+
+        data = {}
+        for name, column in self.columns.items():
+            if isinstance(column, DictionaryColumn):
+                data[name] = pd.Categorical.from_codes(
+                    np.frombuffer(column.codes, dtype=np.int32),
+                    categories=pd.Index(column.values, dtype=object),
+                )
+            else:
+                data[name] = pd.Series(column, dtype=object)
+        return pd.DataFrame(data, columns=pd.Index(CAAJ_FIELDS))
+
+    def to_arrow(self):
+        import numpy as np
+        import pyarrow as pa
+
+        arrays = []
+        for column in self.columns.values():
+            if isinstance(column, DictionaryColumn):
+                codes = np.frombuffer(column.codes, dtype=np.int32)
+                indices = pa.array(codes, mask=codes < 0, type=pa.int32())
+                arrays.append(
+                    pa.DictionaryArray.from_arrays(
+                        indices, pa.array(column.values, type=pa.string())
+                    )
+                )
+            else:
+                arrays.append(pa.array(column, type=pa.string()))
+        return pa.Table.from_arrays(arrays, names=CAAJ_FIELDS)
+
+    def write_parquet(self, path: str, **kwargs) -> int:
+        import pyarrow.parquet as pq
+
+        pq.write_table(self.to_arrow(), path, **kwargs)
+        return self.size
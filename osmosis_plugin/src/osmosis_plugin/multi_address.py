@@ -0,0 +1,97 @@
+import os
+from typing import Dict, Iterator, List, Optional, Union
+
+from senkalib.caaj_journal import CaajJournal
+from senkalib.token_original_id_table import TokenOriginalIdTable
+
+from osmosis_plugin.caaj_writer import write_caajs_csv
+from osmosis_plugin.dataset_writer import DEFAULT_ROW_GROUP_SIZE, write_dataset
+from osmosis_plugin.decoder import DecodedTransaction, decode_transaction_bytes
+from osmosis_plugin.external_sort import DEFAULT_BUFFER_SIZE
+from osmosis_plugin.fetcher import OsmosisTransactionFetcher
+from osmosis_plugin.journal_builder import JournalBuilder
+from osmosis_plugin.osmosis_plugin import OsmosisPlugin
+from osmosis_plugin.token_resolver import TokenResolver
+from osmosis_plugin.transaction_cache import TransactionCache
+
+
+class MultiAddressConverter:
+    def __init__(
+        self,
+        addresses: List[str],
+        cache: TransactionCache,
+        token_table: Union[TokenOriginalIdTable, TokenResolver],
+    ):
+        self.addresses = list(dict.fromkeys(addresses))
+        self.cache = cache
+        self.token_table = TokenResolver.of(token_table)
+        self.references: Optional[Dict[str, int]] = None
+        # transactions shared by several tracked addresses stay decoded until
+        # the last of those addresses has been converted.
+        self.shared: Dict[str, list] = {}
+        self.decoded = 0
+
+    def update(self, fetcher: OsmosisTransactionFetcher) -> int:
+        self.references = None
+        return sum(self.cache.update(address, fetcher) for address in self.addresses)
+
+    def get_caajs(self, address: str) -> Iterator[CaajJournal]:
+        return OsmosisPlugin.get_caajs_batch(
+            address, self._get_transactions(address), self.token_table
+        )
+
+    def get_caajs_columns(self, address: str) -> JournalBuilder:
+        return OsmosisPlugin.get_caajs_columns(
+            address, self._get_transactions(address), self.token_table
+        )
+
+    def write_csv(
+        self,
+        directory: str,
+        sort: bool = True,
+        buffer_size: int = DEFAULT_BUFFER_SIZE,
+    ) -> Dict[str, int]:
+        os.makedirs(directory, exist_ok=True)
+        counts = {}
+        for address in self.addresses:
+            path = os.path.join(directory, f"{address}.csv")
+            with open(path, "w", encoding="utf-8", newline="") as output:
+                counts[address] = write_caajs_csv(
+                    self.get_caajs(address), output, sort, buffer_size
+                )
+        return counts
+
+    def write_dataset(
+        self,
+        directory: str,
+        output_format: str,
+        row_group_size: int = DEFAULT_ROW_GROUP_SIZE,
+    ) -> Dict[str, int]:
+        counts = {}
+        for address in self.addresses:
+            builder = self.get_caajs_columns(address)
+            write_dataset(builder, directory, address, output_format, row_group_size)
+            counts[address] = len(builder)
+        return counts
+
+    def _get_transactions(self, address: str) -> Iterator[DecodedTransaction]:
+        if self.references is None:
+            self.references = self.cache.get_shared_transactions(self.addresses)
+        for txhash, body in self.cache.get_raw_transactions(address):
+            yield self._decode(txhash, body)
+
+    def _decode(self, txhash: str, body: str) -> DecodedTransaction:
+        entry = self.shared.get(txhash)
+        if entry is not None:
+            entry[0] -= 1
+            if entry[0] == 0:
+                del self.shared[txhash]
+            return entry[1]
+
+        transaction = OsmosisPlugin.get_decoder(decode_transaction_bytes)(body)
+        self.decoded += 1
+        assert self.references is not None
+        remaining = self.references.get(txhash, 1) - 1
+        if remaining > 0:
+            self.shared[txhash] = [remaining, transaction]
+        return transaction
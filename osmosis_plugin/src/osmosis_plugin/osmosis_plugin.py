@@ -1,19 +1,31 @@
-import re
+import logging
 import uuid
-from decimal import Decimal
-from typing import Union
+from time import perf_counter
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Union
 
 from senkalib.caaj_journal import CaajJournal
 from senkalib.chain.transaction import Transaction
 from senkalib.token_original_id_table import TokenOriginalIdTable
 
-MEGA = 10**6
-EXA = 10**18
+from osmosis_plugin.coin import format_amount, get_decimals, parse_coin, parse_coins
+from osmosis_plugin.decoder import DecodedTransaction
+from osmosis_plugin.event_index import Event, EventIndex
+from osmosis_plugin.journal_builder import JournalBuilder
+from osmosis_plugin.stats import PluginStats
+from osmosis_plugin.token_resolver import TokenResolver
+
+TRADE_UUID_NAMESPACE = uuid.UUID("168ee489-ed21-45eb-8f66-5daf188ebf15")
+
+logger = logging.getLogger(__name__)
 
 
 class OsmosisPlugin:
     chain = "osmosis"
     PLATFORM = "osmosis"
+    NO_FEE_MESSAGE_TYPES = {"/ibc.core.client.v1.MsgUpdateClient"}
+    message_handlers: Dict[str, Callable[..., None]] = {}
+    # instrumentation is off unless a PluginStats is enabled.
+    stats: Optional[PluginStats] = None
 
     @classmethod
     def can_handle(cls, transaction: Transaction) -> bool:
@@ -21,96 +33,237 @@ class OsmosisPlugin:
         return OsmosisPlugin.chain in chain_type
 
     @classmethod
-    def get_caajs(
-        cls, address: str, transaction: Transaction, token_table: TokenOriginalIdTable
-    ) -> list:
-        caaj = []
-        if transaction.get_transaction()["data"]["code"] != 0:
-            return caaj
+    def register_handler(cls, type_url: str, handler: Callable[..., None]) -> None:
+        cls.message_handlers[type_url] = handler
 
-        transaction_type = transaction.get_transaction()["data"]["tx"]["body"][
-            "messages"
-        ][0]["@type"].split(".")[-1]
+    @classmethod
+    def enable_stats(cls, stats: Optional[PluginStats] = None) -> PluginStats:
+        OsmosisPlugin.stats = PluginStats() if stats is None else stats
+        return OsmosisPlugin.stats
 
-        if transaction_type in [
-            "MsgSwapExactAmountIn",
-            "MsgJoinSwapExternAmountIn",
-        ]:
-            caaj.extend(OsmosisPlugin._get_caaj_swap(transaction, token_table))
+    @classmethod
+    def disable_stats(cls) -> None:
+        OsmosisPlugin.stats = None
 
-        elif transaction_type in "MsgTransfer":
-            caaj.extend(OsmosisPlugin._get_caaj_transfer(transaction, token_table))
+    @classmethod
+    def get_decoder(
+        cls, decode: Callable[[Any], DecodedTransaction]
+    ) -> Callable[[Any], DecodedTransaction]:
+        # decoders outside the plugin count as parse time while stats are enabled.
+        if cls.stats is None:
+            return decode
+        return cls.stats.time_parse(decode)
 
-        elif transaction_type == "MsgJoinPool":
-            caaj.extend(OsmosisPlugin._get_caaj_join_pool(transaction, token_table))
+    @classmethod
+    def get_caajs(
+        cls,
+        address: str,
+        transaction: Union[Transaction, DecodedTransaction],
+        token_table: Union[TokenOriginalIdTable, TokenResolver],
+    ) -> list:
+        caaj: List[CaajJournal] = []
+        decoded = cls._decode(transaction)
+        if decoded.code != 0:
+            if cls.stats is not None:
+                cls.stats.skipped_transactions += 1
+            return caaj
 
-        elif transaction_type in ["MsgSend", "MsgLockTokens"]:
-            caaj.extend(OsmosisPlugin._get_caaj_lock_token(transaction, token_table))
+        cls.emit_caajs(
+            address,
+            decoded,
+            token_table,
+            lambda *fields: caaj.append(CaajJournal(*fields)),
+        )
+        return caaj
 
-        elif transaction_type == "MsgExitPool":
-            caaj.extend(OsmosisPlugin._get_caaj_exit_pool(transaction, token_table))
+    @classmethod
+    def emit_caajs(
+        cls,
+        address: str,
+        transaction: Union[Transaction, DecodedTransaction],
+        token_table: Union[TokenOriginalIdTable, TokenResolver],
+        emit: Callable[..., None],
+    ) -> None:
+        token_table = TokenResolver.of(token_table)
+        if cls.stats is not None:
+            cls._emit_caajs_measured(address, transaction, token_table, emit, cls.stats)
+            return
+
+        decoded = DecodedTransaction.of(transaction)
+        events = decoded.events
+        for msg_index, message in enumerate(decoded.messages):
+            handler = cls._get_handler(decoded, message, msg_index)
+            handler(address, decoded, message, msg_index, events, token_table, emit)
+
+        if cls._has_fee(decoded):
+            OsmosisPlugin._get_caaj_fee(address, decoded, token_table, emit)
 
-        elif transaction_type == "MsgDelegate":
-            caaj.extend(
-                OsmosisPlugin._get_caaj_delegate(address, transaction, token_table)
-            )
+    @classmethod
+    def _emit_caajs_measured(
+        cls,
+        address: str,
+        transaction: Union[Transaction, DecodedTransaction],
+        token_table: TokenResolver,
+        emit: Callable[..., None],
+        stats: PluginStats,
+    ) -> None:
+        started = perf_counter()
+        decoded = DecodedTransaction.of(transaction)
+        converting = perf_counter()
+        stats.parse_seconds += converting - started
+        hits = token_table.hits
+        misses = token_table.misses
+        journals = 0
+
+        def counted_emit(*fields) -> None:
+            nonlocal journals
+            journals += 1
+            emit(*fields)
+
+        events = decoded.events
+        for msg_index, message in enumerate(decoded.messages):
+            handler = cls._get_handler(decoded, message, msg_index)
+            emitted = journals
+            handler_started = perf_counter()
+            handler(
+                address, decoded, message, msg_index, events, token_table, counted_emit
+            )
+            stats.record_handler(
+                getattr(handler, "__name__", repr(handler)),
+                perf_counter() - handler_started,
+            )
+            stats.record_message(message["@type"], journals - emitted)
+
+        if cls._has_fee(decoded):
+            handler_started = perf_counter()
+            OsmosisPlugin._get_caaj_fee(address, decoded, token_table, counted_emit)
+            stats.record_handler("_get_caaj_fee", perf_counter() - handler_started)
+
+        stats.convert_seconds += perf_counter() - converting
+        stats.transactions += 1
+        stats.journals += journals
+        stats.resolver_hits += token_table.hits - hits
+        stats.resolver_misses += token_table.misses - misses
 
-        elif transaction_type == "MsgUpdateClient":
-            caaj.extend(
-                OsmosisPlugin._get_caaj_update_client(address, transaction, token_table)
-            )
-            return caaj  # it ignores fee because this address does not pay fee in case of MsgUpdateClient.
-        else:
+    @classmethod
+    def _get_handler(
+        cls, transaction: DecodedTransaction, message: dict, msg_index: int
+    ) -> Callable[..., None]:
+        handler = cls.message_handlers.get(message["@type"])
+        if handler is not None:
+            return handler
+        # the first message decides what a transaction is, as it did before every
+        # message was dispatched, so only later unknown messages are skipped.
+        if msg_index == 0:
             raise Exception(
-                f"This type of transaction is not defined. transaction_id: {transaction.get_transaction_id()}"
+                f"This type of transaction is not defined. transaction_id: {transaction.transaction_id}"
             )
+        logger.warning(
+            "skipped a message of an undefined type. transaction_id: %s, type: %s",
+            transaction.transaction_id,
+            message["@type"],
+        )
+        return cls._skip_message
 
-        transaction_fee = transaction.get_transaction_fee()
-        if transaction_fee != 0:
-            caaj_fee = OsmosisPlugin._get_caaj_fee(address, transaction, token_table)
-            caaj.extend(caaj_fee)
+    @classmethod
+    def _has_fee(cls, transaction: DecodedTransaction) -> bool:
+        # it ignores fee because this address does not pay fee in case of relayed ibc packets.
+        messages = transaction.messages
+        if messages and messages[0]["@type"] in cls.NO_FEE_MESSAGE_TYPES:
+            return False
+        return transaction.get_transaction_fee() != 0
 
-        return caaj
+    @classmethod
+    def get_caajs_batch(
+        cls,
+        address: str,
+        transactions: Iterable[Union[Transaction, DecodedTransaction]],
+        token_table: Union[TokenOriginalIdTable, TokenResolver],
+    ) -> Iterator[CaajJournal]:
+        token_table = TokenResolver.of(token_table)
+        for transaction in cls._get_convertible(transactions):
+            yield from cls.get_caajs(address, transaction, token_table)
+
+    @classmethod
+    def get_caajs_columns(
+        cls,
+        address: str,
+        transactions: Iterable[Union[Transaction, DecodedTransaction]],
+        token_table: Union[TokenOriginalIdTable, TokenResolver],
+        builder: Optional[JournalBuilder] = None,
+    ) -> JournalBuilder:
+        token_table = TokenResolver.of(token_table)
+        builder = JournalBuilder() if builder is None else builder
+        for transaction in cls._get_convertible(transactions):
+            cls.emit_caajs(address, transaction, token_table, builder.append)
+        return builder
+
+    @classmethod
+    def _get_convertible(
+        cls, transactions: Iterable[Union[Transaction, DecodedTransaction]]
+    ) -> Iterator[DecodedTransaction]:
+        stats = cls.stats
+        for transaction in transactions:
+            # failed and foreign transactions are skipped before they are decoded.
+            if isinstance(transaction, DecodedTransaction):
+                code, chain_id = transaction.code, transaction.chain_id
+            else:
+                raw_transaction = transaction.get_transaction()
+                code = raw_transaction["data"]["code"]
+                chain_id = raw_transaction["header"]["chain_id"]
+            if code != 0 or cls.chain not in chain_id:
+                if stats is not None:
+                    stats.skipped_transactions += 1
+                continue
+            yield cls._decode(transaction)
+
+    @classmethod
+    def _decode(
+        cls, transaction: Union[Transaction, DecodedTransaction]
+    ) -> DecodedTransaction:
+        # decoding counts as parse time, so the conversion that follows does not.
+        stats = cls.stats
+        if stats is None or isinstance(transaction, DecodedTransaction):
+            return DecodedTransaction.of(transaction)
+        started = perf_counter()
+        decoded = DecodedTransaction.of(transaction)
+        stats.parse_seconds += perf_counter() - started
+        return decoded
 
     @classmethod
     def _get_caaj_swap(
-        cls, transaction: Transaction, token_table: TokenOriginalIdTable
-    ) -> list:
-        caaj = []
-        attributes_list = OsmosisPlugin._get_attributes_list(transaction, "transfer")
-        for attribute in attributes_list:
-            caaj_to = OsmosisPlugin._get_attribute_data(attribute, "sender")[0]["value"]
-            caaj_from = OsmosisPlugin._get_attribute_data(attribute, "recipient")[0][
-                "value"
-            ]
-
-            amounts = OsmosisPlugin._get_attribute_data(attribute, "amount")
-            amount_to = OsmosisPlugin._get_token_amount(amounts[0]["value"])
-            token_original_id_to = OsmosisPlugin._get_token_original_id(
-                amounts[0]["value"]
-            )
-            token_symbol_to = token_table.get_symbol(
-                OsmosisPlugin.chain, token_original_id_to
-            )
-            symbol_uuid_to = token_table.get_symbol_uuid(
+        cls,
+        address: str,
+        transaction: DecodedTransaction,
+        message: dict,
+        msg_index: int,
+        events: EventIndex,
+        token_table: TokenResolver,
+        emit: Callable[..., None],
+    ) -> None:
+        for event in events.get_events("transfer", msg_index):
+            caaj_to = event.get("sender")[0]
+            caaj_from = event.get("recipient")[0]
+
+            amounts = event.get("amount")
+            coin_to = parse_coin(amounts[0])
+            amount_to = coin_to.amount
+            token_original_id_to = coin_to.token_original_id
+            token_symbol_to, symbol_uuid_to = token_table.resolve(
                 OsmosisPlugin.chain, token_original_id_to
             )
 
-            amount_from = OsmosisPlugin._get_token_amount(amounts[1]["value"])
-            token_original_id_from = OsmosisPlugin._get_token_original_id(
-                amounts[1]["value"]
-            )
+            coin_from = parse_coin(amounts[1])
+            amount_from = coin_from.amount
+            token_original_id_from = coin_from.token_original_id
 
-            token_symbol_from = token_table.get_symbol(
-                OsmosisPlugin.chain, token_original_id_from
-            )
-            symbol_uuid_from = token_table.get_symbol_uuid(
+            token_symbol_from, symbol_uuid_from = token_table.resolve(
                 OsmosisPlugin.chain, token_original_id_from
             )
 
-            trade_uuid = OsmosisPlugin._get_uuid()
+            trade_uuid = OsmosisPlugin._get_uuid(transaction, event)
 
-            caaj_journal_get = CaajJournal(
+            emit(
                 transaction.get_timestamp(),
                 cls.chain,
                 cls.PLATFORM,
@@ -127,7 +280,7 @@ class OsmosisPlugin:
                 "",
             )
 
-            caaj_journal_lose = CaajJournal(
+            emit(
                 transaction.get_timestamp(),
                 cls.chain,
                 cls.PLATFORM,
@@ -143,23 +296,24 @@ class OsmosisPlugin:
                 caaj_to,
                 "",
             )
-            caaj.append(caaj_journal_get)
-            caaj.append(caaj_journal_lose)
-        return caaj
 
     @classmethod
     def _get_caaj_transfer(
-        cls, transaction: Transaction, token_table: TokenOriginalIdTable
-    ) -> list:
-        caaj = []
-        message = transaction.get_transaction()["data"]["tx"]["body"]["messages"][0]
+        cls,
+        address: str,
+        transaction: DecodedTransaction,
+        message: dict,
+        msg_index: int,
+        events: EventIndex,
+        token_table: TokenResolver,
+        emit: Callable[..., None],
+    ) -> None:
         token_original_id = message["token"]["denom"]
-        symbol = token_table.get_symbol(OsmosisPlugin.chain, token_original_id)
-        symbol_uuid = token_table.get_symbol_uuid(
+        symbol, symbol_uuid = token_table.resolve(
             OsmosisPlugin.chain, token_original_id
         )
 
-        caaj_journal_lose = CaajJournal(
+        emit(
             transaction.get_timestamp(),
             cls.chain,
             cls.PLATFORM,
@@ -167,7 +321,7 @@ class OsmosisPlugin:
             transaction.get_transaction_id(),
             None,
             "send",
-            str(Decimal(message["token"]["amount"]) / Decimal(MEGA)),
+            format_amount(message["token"]["amount"], get_decimals(token_original_id)),
             symbol,
             token_original_id,
             symbol_uuid,
@@ -175,49 +329,39 @@ class OsmosisPlugin:
             message["receiver"],
             "",
         )
-        caaj.append(caaj_journal_lose)
-        return caaj
 
     @classmethod
     def _get_caaj_join_pool(
-        cls, transaction: Transaction, token_table: TokenOriginalIdTable
-    ) -> list:
-        caaj = []
-        attributes_list = OsmosisPlugin._get_attributes_list(transaction, "transfer")
-        for attribute in attributes_list:
-            senders = OsmosisPlugin._get_attribute_data(attribute, "sender")
-            recipients = OsmosisPlugin._get_attribute_data(attribute, "recipient")
-            amounts = OsmosisPlugin._get_attribute_data(attribute, "amount")
-            amount_one = OsmosisPlugin._get_token_amount(
-                amounts[0]["value"].split(",")[0]
-            )
-            amount_two = OsmosisPlugin._get_token_amount(
-                amounts[0]["value"].split(",")[1]
-            )
-
-            token_original_id_one = OsmosisPlugin._get_token_original_id(
-                amounts[0]["value"].split(",")[0]
-            )
-            token_original_id_two = OsmosisPlugin._get_token_original_id(
-                amounts[0]["value"].split(",")[1]
-            )
-
-            token_symbol_one = token_table.get_symbol(
-                OsmosisPlugin.chain, token_original_id_one
-            )
-            symbol_uuid_one = token_table.get_symbol_uuid(
+        cls,
+        address: str,
+        transaction: DecodedTransaction,
+        message: dict,
+        msg_index: int,
+        events: EventIndex,
+        token_table: TokenResolver,
+        emit: Callable[..., None],
+    ) -> None:
+        for event in events.get_events("transfer", msg_index):
+            senders = event.get("sender")
+            recipients = event.get("recipient")
+            amounts = event.get("amount")
+            coin_one, coin_two = parse_coins(amounts[0])[:2]
+            amount_one = coin_one.amount
+            amount_two = coin_two.amount
+
+            token_original_id_one = coin_one.token_original_id
+            token_original_id_two = coin_two.token_original_id
+
+            token_symbol_one, symbol_uuid_one = token_table.resolve(
                 OsmosisPlugin.chain, token_original_id_one
             )
-            token_symbol_two = token_table.get_symbol(
-                OsmosisPlugin.chain, token_original_id_two
-            )
-            symbol_uuid_two = token_table.get_symbol_uuid(
+            token_symbol_two, symbol_uuid_two = token_table.resolve(
                 OsmosisPlugin.chain, token_original_id_two
             )
 
-            trade_uuid = OsmosisPlugin._get_uuid()
+            trade_uuid = OsmosisPlugin._get_uuid(transaction, event)
 
-            caaj_journal_lose_one = CaajJournal(
+            emit(
                 transaction.get_timestamp(),
                 cls.chain,
                 cls.PLATFORM,
@@ -225,15 +369,15 @@ class OsmosisPlugin:
                 transaction.get_transaction_id(),
                 trade_uuid,
                 "deposit",
-                str(Decimal(amount_one)),
+                amount_one,
                 token_symbol_one,
-                OsmosisPlugin._get_token_original_id(amounts[0]["value"].split(",")[0]),
+                token_original_id_one,
                 symbol_uuid_one,
-                senders[0]["value"],
-                recipients[0]["value"],
+                senders[0],
+                recipients[0],
                 "",
             )
-            caaj_journal_lose_two = CaajJournal(
+            emit(
                 transaction.get_timestamp(),
                 cls.chain,
                 cls.PLATFORM,
@@ -241,24 +385,21 @@ class OsmosisPlugin:
                 transaction.get_transaction_id(),
                 trade_uuid,
                 "deposit",
-                str(Decimal(amount_two)),
+                amount_two,
                 token_symbol_two,
-                OsmosisPlugin._get_token_original_id(amounts[0]["value"].split(",")[1]),
+                token_original_id_two,
                 symbol_uuid_two,
-                senders[0]["value"],
-                recipients[0]["value"],
+                senders[0],
+                recipients[0],
                 "",
             )
-            caaj.append(caaj_journal_lose_one)
-            caaj.append(caaj_journal_lose_two)
 
-            token_original_id_liquidity = OsmosisPlugin._get_token_original_id(
-                amounts[1]["value"]
-            )
+            coin_liquidity = parse_coin(amounts[1])
+            token_original_id_liquidity = coin_liquidity.token_original_id
 
-            amount_liquidity = OsmosisPlugin._get_token_amount(amounts[1]["value"])
+            amount_liquidity = coin_liquidity.amount
 
-            caaj_journal_get_liquidity = CaajJournal(
+            emit(
                 transaction.get_timestamp(),
                 cls.chain,
                 cls.PLATFORM,
@@ -270,82 +411,78 @@ class OsmosisPlugin:
                 None,
                 token_original_id_liquidity,
                 None,
-                senders[1]["value"],
-                recipients[1]["value"],
+                senders[1],
+                recipients[1],
                 "",
             )
-            caaj.append(caaj_journal_get_liquidity)
-        return caaj
 
     @classmethod
     def _get_caaj_lock_token(
-        cls, transaction: Transaction, token_table: TokenOriginalIdTable
-    ) -> list:
-        caaj = []
-        attributes_list = OsmosisPlugin._get_attributes_list(transaction, "transfer")
-        for attribute in attributes_list:
-            senders = OsmosisPlugin._get_attribute_data(attribute, "sender")
-            recipients = OsmosisPlugin._get_attribute_data(attribute, "recipient")
-            amounts = OsmosisPlugin._get_attribute_data(attribute, "amount")
-
-            token_original_id_liquidity = OsmosisPlugin._get_token_original_id(
-                amounts[0]["value"]
-            )
-
-            token_symbol_liquidity = token_table.get_symbol(
+        cls,
+        address: str,
+        transaction: DecodedTransaction,
+        message: dict,
+        msg_index: int,
+        events: EventIndex,
+        token_table: TokenResolver,
+        emit: Callable[..., None],
+    ) -> None:
+        for event in events.get_events("transfer", msg_index):
+            senders = event.get("sender")
+            recipients = event.get("recipient")
+            amounts = event.get("amount")
+
+            coin_liquidity = parse_coin(amounts[0])
+            token_original_id_liquidity = coin_liquidity.token_original_id
+
+            token_symbol_liquidity, symbol_uuid_liquidity = token_table.resolve(
                 OsmosisPlugin.chain, token_original_id_liquidity
             )
-            symbol_uuid_liquidity = token_table.get_symbol_uuid(
-                OsmosisPlugin.chain, token_original_id_liquidity
-            )
-            amount_liquidity = OsmosisPlugin._get_token_amount(amounts[0]["value"])
+            amount_liquidity = coin_liquidity.amount
 
-            caaj_journal_get_liquidity = CaajJournal(
+            emit(
                 transaction.get_timestamp(),
                 cls.chain,
                 cls.PLATFORM,
                 "staking",
                 transaction.get_transaction_id(),
-                OsmosisPlugin._get_uuid(),
+                OsmosisPlugin._get_uuid(transaction, event),
                 "deposit",
                 amount_liquidity,
                 token_symbol_liquidity,
                 token_original_id_liquidity,
                 symbol_uuid_liquidity,
-                senders[0]["value"],
-                recipients[0]["value"],
+                senders[0],
+                recipients[0],
                 "",
             )
-            caaj.append(caaj_journal_get_liquidity)
-        return caaj
 
     @classmethod
     def _get_caaj_exit_pool(
-        cls, transaction: Transaction, token_table: TokenOriginalIdTable
-    ) -> list:
-        caaj = []
-        attributes_list = OsmosisPlugin._get_attributes_list(transaction, "transfer")
-        for attribute in attributes_list:
-            senders = OsmosisPlugin._get_attribute_data(attribute, "sender")
-            recipients = OsmosisPlugin._get_attribute_data(attribute, "recipient")
-            amounts = OsmosisPlugin._get_attribute_data(attribute, "amount")
-            amount_one = OsmosisPlugin._get_token_amount(
-                amounts[0]["value"].split(",")[0]
-            )
-
-            token_original_id_one = OsmosisPlugin._get_token_original_id(
-                amounts[0]["value"].split(",")[0]
-            )
-            token_symbol_one = token_table.get_symbol(
-                OsmosisPlugin.chain, token_original_id_one
-            )
-            symbol_uuid_one = token_table.get_symbol_uuid(
+        cls,
+        address: str,
+        transaction: DecodedTransaction,
+        message: dict,
+        msg_index: int,
+        events: EventIndex,
+        token_table: TokenResolver,
+        emit: Callable[..., None],
+    ) -> None:
+        for event in events.get_events("transfer", msg_index):
+            senders = event.get("sender")
+            recipients = event.get("recipient")
+            amounts = event.get("amount")
+            coin_one, coin_two = parse_coins(amounts[0])[:2]
+            amount_one = coin_one.amount
+
+            token_original_id_one = coin_one.token_original_id
+            token_symbol_one, symbol_uuid_one = token_table.resolve(
                 OsmosisPlugin.chain, token_original_id_one
             )
 
-            trade_uuid = OsmosisPlugin._get_uuid()
+            trade_uuid = OsmosisPlugin._get_uuid(transaction, event)
 
-            caaj_journal_lose_one = CaajJournal(
+            emit(
                 transaction.get_timestamp(),
                 cls.chain,
                 cls.PLATFORM,
@@ -353,31 +490,23 @@ class OsmosisPlugin:
                 transaction.get_transaction_id(),
                 trade_uuid,
                 "withdraw",
-                str(Decimal(amount_one)),
+                amount_one,
                 token_symbol_one,
                 token_original_id_one,
                 symbol_uuid_one,
-                senders[0]["value"],
-                recipients[0]["value"],
+                senders[0],
+                recipients[0],
                 "",
             )
-            caaj.append(caaj_journal_lose_one)
 
-            amount_two = OsmosisPlugin._get_token_amount(
-                amounts[0]["value"].split(",")[1]
-            )
+            amount_two = coin_two.amount
 
-            token_original_id_two = OsmosisPlugin._get_token_original_id(
-                amounts[0]["value"].split(",")[1]
-            )
-            token_symbol_two = token_table.get_symbol(
-                OsmosisPlugin.chain, token_original_id_two
-            )
-            symbol_uuid_two = token_table.get_symbol_uuid(
+            token_original_id_two = coin_two.token_original_id
+            token_symbol_two, symbol_uuid_two = token_table.resolve(
                 OsmosisPlugin.chain, token_original_id_two
             )
 
-            caaj_journal_lose_two = CaajJournal(
+            emit(
                 transaction.get_timestamp(),
                 cls.chain,
                 cls.PLATFORM,
@@ -385,29 +514,24 @@ class OsmosisPlugin:
                 transaction.get_transaction_id(),
                 trade_uuid,
                 "withdraw",
-                str(Decimal(amount_two)),
+                amount_two,
                 token_symbol_two,
                 token_original_id_two,
                 symbol_uuid_two,
-                senders[0]["value"],
-                recipients[0]["value"],
+                senders[0],
+                recipients[0],
                 "",
             )
-            caaj.append(caaj_journal_lose_two)
 
-            token_original_id_liquidity = OsmosisPlugin._get_token_original_id(
-                amounts[1]["value"]
-            )
+            coin_liquidity = parse_coin(amounts[1])
+            token_original_id_liquidity = coin_liquidity.token_original_id
 
-            token_symbol_liquidity = token_table.get_symbol(
+            token_symbol_liquidity, symbol_uuid_liquidity = token_table.resolve(
                 OsmosisPlugin.chain, token_original_id_liquidity
             )
-            symbol_uuid_liquidity = token_table.get_symbol_uuid(
-                OsmosisPlugin.chain, token_original_id_liquidity
-            )
-            amount_liquidity = OsmosisPlugin._get_token_amount(amounts[1]["value"])
+            amount_liquidity = coin_liquidity.amount
 
-            caaj_journal_get_liquidity = CaajJournal(
+            emit(
                 transaction.get_timestamp(),
                 cls.chain,
                 cls.PLATFORM,
@@ -419,47 +543,41 @@ class OsmosisPlugin:
                 token_symbol_liquidity,
                 token_original_id_liquidity,
                 symbol_uuid_liquidity,
-                senders[1]["value"],
-                recipients[1]["value"],
+                senders[1],
+                recipients[1],
                 "",
             )
-            caaj.append(caaj_journal_get_liquidity)
-        return caaj
 
     @classmethod
     def _get_caaj_delegate(
-        cls, address: str, transaction: Transaction, token_table: TokenOriginalIdTable
-    ) -> list:
-        caaj = []
-
-        attributes_list_delegate = OsmosisPlugin._get_attributes_list(
-            transaction, "delegate"
-        )
-        for attribute in attributes_list_delegate:
-            caaj_to = OsmosisPlugin._get_attribute_data(attribute, "validator")[0][
-                "value"
-            ]
-            amounts = OsmosisPlugin._get_attribute_data(attribute, "amount")
+        cls,
+        address: str,
+        transaction: DecodedTransaction,
+        message: dict,
+        msg_index: int,
+        events: EventIndex,
+        token_table: TokenResolver,
+        emit: Callable[..., None],
+    ) -> None:
+        for event in events.get_events("delegate", msg_index):
+            caaj_to = event.get("validator")[0]
+            amounts = event.get("amount")
             caaj_from = address
 
-            token_original_id_staking = OsmosisPlugin._get_token_original_id(
-                amounts[0]["value"]
-            )
-            token_symbol_staking = token_table.get_symbol(
-                OsmosisPlugin.chain, token_original_id_staking
-            )
-            symbol_uuid_staking = token_table.get_symbol_uuid(
+            coin_staking = parse_coin(amounts[0])
+            token_original_id_staking = coin_staking.token_original_id
+            token_symbol_staking, symbol_uuid_staking = token_table.resolve(
                 OsmosisPlugin.chain, token_original_id_staking
             )
-            amount_liquidity = OsmosisPlugin._get_token_amount(amounts[0]["value"])
+            amount_liquidity = coin_staking.amount
 
-            caaj_journal_get_liquidity = CaajJournal(
+            emit(
                 transaction.get_timestamp(),
                 cls.chain,
                 cls.PLATFORM,
                 "staking",
                 transaction.get_transaction_id(),
-                OsmosisPlugin._get_uuid(),
+                OsmosisPlugin._get_uuid(transaction, event),
                 "deposit",
                 amount_liquidity,
                 token_symbol_staking,
@@ -469,95 +587,96 @@ class OsmosisPlugin:
                 caaj_to,
                 "",
             )
-            caaj.append(caaj_journal_get_liquidity)
-        return caaj
 
     @classmethod
     def _get_caaj_update_client(
-        cls, address: str, transaction: Transaction, token_table: TokenOriginalIdTable
-    ) -> list:
-        caaj = []
-        logs = transaction.get_transaction()["data"]["logs"]
-        for log in logs:
-            fungible_token_packet_list = list(
-                filter(
-                    lambda event: event["type"] == "fungible_token_packet",
-                    log["events"],
+        cls,
+        address: str,
+        transaction: DecodedTransaction,
+        message: dict,
+        msg_index: int,
+        events: EventIndex,
+        token_table: TokenResolver,
+        emit: Callable[..., None],
+    ) -> None:
+        pass
+
+    @classmethod
+    def _get_caaj_recv_packet(
+        cls,
+        address: str,
+        transaction: DecodedTransaction,
+        message: dict,
+        msg_index: int,
+        events: EventIndex,
+        token_table: TokenResolver,
+        emit: Callable[..., None],
+    ) -> None:
+        for packet in events.get_events("fungible_token_packet", msg_index):
+            success = packet.get("success")[0]
+            receiver = packet.get("receiver")[0]
+
+            if success == "true" and receiver == address:
+                transfer = events.get_events("transfer", msg_index)[0]
+
+                recipients = transfer.get("recipient")
+                senders = transfer.get("sender")
+                amounts = transfer.get("amount")
+
+                caaj_from = senders[0]
+                caaj_to = recipients[0]
+
+                coin_liquidity = parse_coin(amounts[0])
+                token_original_id_liquidity = coin_liquidity.token_original_id
+
+                token_symbol_liquidity, symbol_uuid_liquidity = token_table.resolve(
+                    OsmosisPlugin.chain, token_original_id_liquidity
                 )
-            )
-            if not fungible_token_packet_list:
-                pass
-            else:
-                success = OsmosisPlugin._get_attribute_data(
-                    fungible_token_packet_list[0]["attributes"], "success"
-                )[0]["value"]
-
-                receiver = OsmosisPlugin._get_attribute_data(
-                    fungible_token_packet_list[0]["attributes"], "receiver"
-                )[0]["value"]
-
-                if success == "true" and receiver == address:
-                    transfer_list = list(
-                        filter(
-                            lambda event: event["type"] == "transfer",
-                            log["events"],
-                        )
-                    )
-
-                    recipients = OsmosisPlugin._get_attribute_data(
-                        transfer_list[0]["attributes"], "recipient"
-                    )
-
-                    senders = OsmosisPlugin._get_attribute_data(
-                        transfer_list[0]["attributes"], "sender"
-                    )
-
-                    amounts = OsmosisPlugin._get_attribute_data(
-                        transfer_list[0]["attributes"], "amount"
-                    )
-
-                    caaj_from = senders[0]["value"]
-                    caaj_to = recipients[0]["value"]
-
-                    token_original_id_liquidity = OsmosisPlugin._get_token_original_id(
-                        amounts[0]["value"]
-                    )
-
-                    token_symbol_liquidity = token_table.get_symbol(
-                        OsmosisPlugin.chain, token_original_id_liquidity
-                    )
-                    symbol_uuid_liquidity = token_table.get_symbol_uuid(
-                        OsmosisPlugin.chain, token_original_id_liquidity
-                    )
-                    amount_liquidity = OsmosisPlugin._get_token_amount(
-                        amounts[0]["value"]
-                    )
-
-                    caaj_journal_get_liquidity = CaajJournal(
-                        transaction.get_timestamp(),
-                        cls.chain,
-                        cls.PLATFORM,
-                        cls.chain,
-                        transaction.get_transaction_id(),
-                        OsmosisPlugin._get_uuid(),
-                        "receive",
-                        amount_liquidity,
-                        token_symbol_liquidity,
-                        token_original_id_liquidity,
-                        symbol_uuid_liquidity,
-                        caaj_from,
-                        caaj_to,
-                        "",
-                    )
-                    caaj.append(caaj_journal_get_liquidity)
-        return caaj
+                amount_liquidity = coin_liquidity.amount
+
+                emit(
+                    transaction.get_timestamp(),
+                    cls.chain,
+                    cls.PLATFORM,
+                    cls.chain,
+                    transaction.get_transaction_id(),
+                    OsmosisPlugin._get_uuid(transaction, packet),
+                    "receive",
+                    amount_liquidity,
+                    token_symbol_liquidity,
+                    token_original_id_liquidity,
+                    symbol_uuid_liquidity,
+                    caaj_from,
+                    caaj_to,
+                    "",
+                )
+
+    @classmethod
+    def _skip_message(
+        cls,
+        address: str,
+        transaction: DecodedTransaction,
+        message: dict,
+        msg_index: int,
+        events: EventIndex,
+        token_table: TokenResolver,
+        emit: Callable[..., None],
+    ) -> None:
+        # relayers acknowledge and time out packets next to MsgUpdateClient and
+        # MsgRecvPacket; none of them moves tokens of the relayer.
+        pass
 
     @classmethod
     def _get_caaj_fee(
-        cls, address: str, transaction: Transaction, token_table: TokenOriginalIdTable
-    ) -> list:
-        caaj = []
-        caaj_journal_get = CaajJournal(
+        cls,
+        address: str,
+        transaction: DecodedTransaction,
+        token_table: TokenResolver,
+        emit: Callable[..., None],
+    ) -> None:
+        fee = transaction.fee
+        assert fee is not None
+        emit(
             transaction.get_timestamp(),
             cls.chain,
             cls.PLATFORM,
@@ -565,7 +684,7 @@ class OsmosisPlugin:
             transaction.get_transaction_id(),
             None,
             "lose",
-            str(transaction.get_transaction_fee() / Decimal(MEGA)),
+            format_amount(fee.amount, get_decimals(fee.denom)),
             "osmo",
             None,
             "c0c8e177-53c3-c408-d8bd-067a2ef41ea7",
@@ -573,58 +692,45 @@ class OsmosisPlugin:
             "fee",
             "",
         )
-        caaj.append(caaj_journal_get)
-        return caaj
 
     @classmethod
     def _get_token_amount(cls, value: str) -> str:
-        token_amount_original = re.search(r"\d+", value)
-        if token_amount_original is None:
-            raise ValueError("token_amount_original is None")
-
-        if "pool" in value:
-            token_amount = str(Decimal(token_amount_original.group()) / Decimal(EXA))
-
-        else:
-            token_amount = str(Decimal(token_amount_original.group()) / Decimal(MEGA))
-        return token_amount
+        return parse_coin(value).amount
 
     @classmethod
-    def _get_uuid(cls) -> str:
-        return str(uuid.uuid4())
+    def _get_uuid(cls, transaction: DecodedTransaction, event: Event) -> str:
+        # the same journals get the same uuid every time a transaction is converted.
+        name = f"{cls.chain}:{transaction.get_transaction_id()}:{event.msg_index}:{event.position}"
+        return str(uuid.uuid5(TRADE_UUID_NAMESPACE, name))
 
     @classmethod
     def _get_token_original_id(cls, value: str) -> Union[str, None]:
-        token_original_id_original = re.search(r"\d+", value)
-        if token_original_id_original is None:
-            raise ValueError("token_original_id_original is None")
-
-        token_original_id = value[token_original_id_original.end() :]
-        if token_original_id == "uosmo" or token_original_id == "":
-            token_original_id = None
-        elif token_original_id == "uion":
-            token_original_id = None
-        return token_original_id
-
-    @classmethod
-    def _get_attribute_data(cls, attribute: dict, attribute_key: str) -> list:
-        attribute_data = list(
-            filter(lambda attribute: attribute["key"] == attribute_key, attribute)
-        )
-
-        return attribute_data
+        return parse_coin(value).token_original_id
 
     @classmethod
     def _get_attributes_list(cls, transaction: Transaction, event_type: str) -> list:
-        logs = transaction.get_transaction()["data"]["logs"]
-        events_list = []
-        for log in logs:
-            events = list(
-                filter(lambda event: event["type"] == event_type, log["events"])
-            )
-            if len(events) > 0:
-                events_list.append(*events)
-
-        attributes_list = list(map(lambda event: event["attributes"], events_list))
+        events = EventIndex.from_transaction(transaction).get_events(event_type)
+        attributes_list = [
+            [{"key": key, "value": value} for key, value in event.attributes]
+            for event in events
+        ]
 
         return attributes_list
+
+
+for type_url, handler in [
+    ("/osmosis.gamm.v1beta1.MsgSwapExactAmountIn", OsmosisPlugin._get_caaj_swap),
+    ("/osmosis.gamm.v1beta1.MsgJoinSwapExternAmountIn", OsmosisPlugin._get_caaj_swap),
+    ("/ibc.applications.transfer.v1.MsgTransfer", OsmosisPlugin._get_caaj_transfer),
+    ("/osmosis.gamm.v1beta1.MsgJoinPool", OsmosisPlugin._get_caaj_join_pool),
+    ("/cosmos.bank.v1beta1.MsgSend", OsmosisPlugin._get_caaj_lock_token),
+    ("/osmosis.lockup.MsgLockTokens", OsmosisPlugin._get_caaj_lock_token),
+    ("/osmosis.gamm.v1beta1.MsgExitPool", OsmosisPlugin._get_caaj_exit_pool),
+    ("/cosmos.staking.v1beta1.MsgDelegate", OsmosisPlugin._get_caaj_delegate),
+    ("/ibc.core.client.v1.MsgUpdateClient", OsmosisPlugin._get_caaj_update_client),
+    ("/ibc.core.channel.v1.MsgRecvPacket", OsmosisPlugin._get_caaj_recv_packet),
+    ("/ibc.core.channel.v1.MsgAcknowledgement", OsmosisPlugin._skip_message),
+    ("/ibc.core.channel.v1.MsgTimeout", OsmosisPlugin._skip_message),
+    ("/ibc.core.channel.v1.MsgTimeoutOnClose", OsmosisPlugin._skip_message),
+]:
+    OsmosisPlugin.register_handler(type_url, handler)
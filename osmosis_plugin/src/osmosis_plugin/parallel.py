@@ -0,0 +1,104 @@
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from functools import partial
+from itertools import islice
+from typing import Iterable, Iterator, List, Optional, Tuple, Union
+
+from senkalib.caaj_journal import CaajJournal
+from senkalib.chain.transaction import Transaction
+from senkalib.token_original_id_table import TokenOriginalIdTable
+
+from osmosis_plugin.decoder import (
+    DecodedTransaction,
+    decode_transaction,
+    decode_transaction_bytes,
+)
+from osmosis_plugin.osmosis_plugin import OsmosisPlugin
+from osmosis_plugin.stats import PluginStats
+from osmosis_plugin.token_resolver import TokenResolver
+
+DEFAULT_CHUNK_SIZE = 256
+
+# transactions are sent to the workers as raw dicts, cached json bodies or
+# already decoded transactions.
+Payload = Union[dict, str, bytes, DecodedTransaction]
+
+# each worker process keeps its own warm resolver; the table is sent once per worker.
+worker_resolver: Optional[TokenResolver] = None
+
+
+def get_caajs_parallel(
+    address: str,
+    transactions: Iterable[Union[Transaction, DecodedTransaction, str, bytes]],
+    token_table: Union[TokenOriginalIdTable, TokenResolver],
+    workers: int,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> Iterator[CaajJournal]:
+    if isinstance(token_table, TokenResolver):
+        token_table = token_table.token_table
+
+    chunks = _get_chunks(map(_get_payload, transactions), chunk_size)
+    stats = OsmosisPlugin.stats
+    convert = partial(_convert_chunk, address, stats is not None)
+    with ProcessPoolExecutor(
+        workers, initializer=_init_worker, initargs=(token_table,)
+    ) as executor:
+        # results are yielded in submission order, with at most 2 chunks per worker in flight.
+        pending: deque = deque()
+        for chunk in chunks:
+            pending.append(executor.submit(convert, chunk))
+            if len(pending) >= workers * 2:
+                yield from _get_result(pending.popleft(), stats)
+        while pending:
+            yield from _get_result(pending.popleft(), stats)
+
+
+def _init_worker(token_table: TokenOriginalIdTable) -> None:
+    global worker_resolver
+    worker_resolver = TokenResolver(token_table)
+
+
+def _get_payload(
+    transaction: Union[Transaction, DecodedTransaction, str, bytes]
+) -> Payload:
+    if isinstance(transaction, (DecodedTransaction, str, bytes)):
+        return transaction
+    return transaction.get_transaction()
+
+
+def _decode_payload(payload: Payload) -> DecodedTransaction:
+    if isinstance(payload, DecodedTransaction):
+        return payload
+    if isinstance(payload, (str, bytes)):
+        return decode_transaction_bytes(payload)
+    return decode_transaction(payload)
+
+
+def _convert_chunk(
+    address: str, measure: bool, chunk: List[Payload]
+) -> Tuple[List[CaajJournal], Optional[PluginStats]]:
+    assert worker_resolver is not None
+    # the stats of each chunk are sent back and merged in the parent process.
+    stats = OsmosisPlugin.enable_stats() if measure else None
+    if stats is None:
+        OsmosisPlugin.disable_stats()
+    decode = OsmosisPlugin.get_decoder(_decode_payload)
+    transactions = (decode(transaction) for transaction in chunk)
+    caajs = list(OsmosisPlugin.get_caajs_batch(address, transactions, worker_resolver))
+    return caajs, stats
+
+
+def _get_result(future: Future, stats: Optional[PluginStats]) -> List[CaajJournal]:
+    caajs, chunk_stats = future.result()
+    if stats is not None and chunk_stats is not None:
+        stats.merge(chunk_stats)
+    return caajs
+
+
+def _get_chunks(items: Iterable, chunk_size: int) -> Iterator[list]:
+    iterator = iter(items)
+    while True:
+        chunk = list(islice(iterator, chunk_size))
+        if not chunk:
+            return
+        yield chunk
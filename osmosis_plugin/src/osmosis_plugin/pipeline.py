@@ -0,0 +1,103 @@
+import queue
+import threading
+from typing import Iterator, Union
+
+from senkalib.caaj_journal import CaajJournal
+from senkalib.token_original_id_table import TokenOriginalIdTable
+
+from osmosis_plugin.decoder import decode_transaction
+from osmosis_plugin.fetcher import OsmosisTransactionFetcher
+from osmosis_plugin.osmosis_plugin import OsmosisPlugin
+from osmosis_plugin.token_resolver import TokenResolver
+
+DEFAULT_PREFETCH = 4
+DEFAULT_QUEUE_SIZE = 16
+POLL_INTERVAL = 0.1
+
+DONE = object()
+
+
+class StageFailure:
+    def __init__(self, error: BaseException):
+        self.error = error
+
+
+def get_caajs_pipelined(
+    address: str,
+    fetcher: OsmosisTransactionFetcher,
+    token_table: Union[TokenOriginalIdTable, TokenResolver],
+    prefetch: int = DEFAULT_PREFETCH,
+    queue_size: int = DEFAULT_QUEUE_SIZE,
+) -> Iterator[CaajJournal]:
+    # fetch thread -> pages queue -> convert thread -> journals queue -> caller.
+    # both queues are bounded, so a slow consumer stalls the stages before it.
+    token_table = TokenResolver.of(token_table)
+    pages: queue.Queue = queue.Queue(maxsize=prefetch)
+    journals: queue.Queue = queue.Queue(maxsize=queue_size)
+    stop = threading.Event()
+
+    def fetch() -> None:
+        try:
+            for page in fetcher.get_pages(address):
+                if not _put(pages, page, stop):
+                    return
+            _put(pages, DONE, stop)
+        except BaseException as error:
+            _put(pages, StageFailure(error), stop)
+
+    def convert() -> None:
+        try:
+            while True:
+                page = _get(pages, stop)
+                if page is None:
+                    return
+                if page is DONE or isinstance(page, StageFailure):
+                    _put(journals, page, stop)
+                    return
+                decode = OsmosisPlugin.get_decoder(decode_transaction)
+                transactions = (decode(tx) for tx in page)
+                caajs = list(
+                    OsmosisPlugin.get_caajs_batch(address, transactions, token_table)
+                )
+                if not _put(journals, caajs, stop):
+                    return
+        except BaseException as error:
+            _put(journals, StageFailure(error), stop)
+
+    threads = [
+        threading.Thread(target=fetch, name="osmosis-fetch", daemon=True),
+        threading.Thread(target=convert, name="osmosis-convert", daemon=True),
+    ]
+    for thread in threads:
+        thread.start()
+    try:
+        while True:
+            caajs = journals.get()
+            if caajs is DONE:
+                return
+            if isinstance(caajs, StageFailure):
+                raise caajs.error
+            yield from caajs
+    finally:
+        stop.set()
+        for thread in threads:
+            thread.join()
+
+
+def _put(target: queue.Queue, item, stop: threading.Event) -> bool:
+    while not stop.is_set():
+        try:
+            target.put(item, timeout=POLL_INTERVAL)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def _get(source: queue.Queue, stop: threading.Event):
+    while not stop.is_set():
+        try:
+            return source.get(timeout=POLL_INTERVAL)
+        except queue.Empty:
+            continue
+    return None
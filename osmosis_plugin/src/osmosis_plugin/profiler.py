@@ -0,0 +1,144 @@
+import cProfile
+import os
+import sys
+import threading
+from collections import Counter
+from types import CodeType, FrameType
+from typing import Optional, TextIO
+
+from osmosis_plugin.osmosis_plugin import OsmosisPlugin
+
+DEFAULT_INTERVAL = 0.005
+PSTATS_FILENAME = "profile.pstats"
+COLLAPSED_FILENAME = "stacks.collapsed"
+# frames whose local `message` is the message being dispatched to a handler.
+DISPATCH_CODES = frozenset(
+    vars(OsmosisPlugin)[name].__func__.__code__
+    for name in ["emit_caajs", "_emit_caajs_measured"]
+)
+FEE_CODE = vars(OsmosisPlugin)["_get_caaj_fee"].__func__.__code__
+
+
+class StackSampler:
+    def __init__(self, interval: float = DEFAULT_INTERVAL):
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.stopped = threading.Event()
+        self.thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self.stopped.clear()
+        self.thread = threading.Thread(
+            target=self._run, name="osmosis-profiler", daemon=True
+        )
+        self.thread.start()
+
+    def stop(self) -> None:
+        self.stopped.set()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+
+    def sample(self) -> None:
+        sampler_ident = None if self.thread is None else self.thread.ident
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        for ident, frame in sys._current_frames().items():
+            if ident == sampler_ident:
+                continue
+            self.stacks[self.get_stack(names.get(ident, str(ident)), frame)] += 1
+
+    @classmethod
+    def get_stack(cls, thread_name: str, frame: Optional[FrameType]) -> str:
+        # frames are collected from the leaf, so the message type lands between
+        # the dispatch frame and the handler it called.
+        labels = []
+        callee: Optional[CodeType] = None
+        while frame is not None:
+            code = frame.f_code
+            if code in DISPATCH_CODES:
+                tag = cls._get_message_tag(frame, callee)
+                if tag is not None:
+                    labels.append(tag)
+            labels.append(cls._get_label(frame))
+            callee = code
+            frame = frame.f_back
+        labels.append(thread_name)
+        return ";".join(reversed(labels))
+
+    def write_collapsed(self, stream: TextIO) -> int:
+        for stack, count in sorted(self.stacks.items()):
+            stream.write(f"{stack} {count}\n")
+        return len(self.stacks)
+
+    def _run(self) -> None:
+        while not self.stopped.wait(self.interval):
+            self.sample()
+
+    @classmethod
+    def _get_message_tag(
+        cls, frame: FrameType, callee: Optional[CodeType]
+    ) -> Optional[str]:
+        # `message` keeps the last message while the fee is converted.
+        if callee is FEE_CODE:
+            return "[fee]"
+        message = frame.f_locals.get("message")
+        if isinstance(message, dict) and "@type" in message:
+            return f"[{message['@type']}]"
+        return None
+
+    @classmethod
+    def _get_label(cls, frame: FrameType) -> str:
+        code = frame.f_code
+        return (
+            f"{cls._get_qualname(frame)} "
+            f"({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+        )
+
+    @classmethod
+    def _get_qualname(cls, frame: FrameType) -> str:
+        # co_qualname only exists from python 3.11, so methods are qualified by
+        # the class of their cls or self argument that defines the code.
+        code = frame.f_code
+        if code.co_argcount == 0 or code.co_varnames[0] not in ("cls", "self"):
+            return code.co_name
+        first = frame.f_locals.get(code.co_varnames[0])
+        owner = first if isinstance(first, type) else type(first)
+        for klass in owner.__mro__:
+            function = vars(klass).get(code.co_name)
+            function = getattr(function, "__func__", function)
+            if getattr(function, "__code__", None) is code:
+                return f"{klass.__name__}.{code.co_name}"
+        return code.co_name
+
+
+class RunProfiler:
+    def __init__(
+        self,
+        directory: str,
+        interval: float = DEFAULT_INTERVAL,
+        deterministic: bool = True,
+    ):
+        self.directory = directory
+        self.sampler = StackSampler(interval)
+        self.profile = cProfile.Profile() if deterministic else None
+
+    def __enter__(self) -> "RunProfiler":
+        os.makedirs(self.directory, exist_ok=True)
+        self.sampler.start()
+        if self.profile is not None:
+            self.profile.enable()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        if self.profile is not None:
+            self.profile.disable()
+        self.sampler.stop()
+        self.write()
+
+    def write(self) -> None:
+        if self.profile is not None:
+            self.profile.dump_stats(os.path.join(self.directory, PSTATS_FILENAME))
+        with open(
+            os.path.join(self.directory, COLLAPSED_FILENAME), "w", encoding="utf-8"
+        ) as collapsed_file:
+            self.sampler.write_collapsed(collapsed_file)
@@ -0,0 +1,159 @@
+from bisect import bisect_left
+from time import perf_counter
+from typing import Any, Callable, Dict, List, Optional
+
+# upper bounds in seconds, doubling from 1us to about 1s.
+LATENCY_BOUNDS = [1e-6 * 2**exponent for exponent in range(21)]
+QUANTILES = [0.5, 0.9, 0.99]
+
+
+class LatencyHistogram:
+    def __init__(self):
+        # the last bucket holds latencies above the last bound.
+        self.counts = [0] * (len(LATENCY_BOUNDS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, seconds: float) -> None:
+        self.counts[bisect_left(LATENCY_BOUNDS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def get_quantile(self, quantile: float) -> float:
+        # the upper bound of the bucket holding the quantile, or the max.
+        rank = quantile * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank and count:
+                if index < len(LATENCY_BOUNDS):
+                    return min(LATENCY_BOUNDS[index], self.max)
+                return self.max
+        return 0.0
+
+    def merge(self, other: "LatencyHistogram") -> None:
+        self.counts = [a + b for a, b in zip(self.counts, other.counts)]
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+
+    def to_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "total_seconds": self.total,
+            "max_seconds": self.max,
+            **{
+                f"p{int(quantile * 100)}_seconds": self.get_quantile(quantile)
+                for quantile in QUANTILES
+            },
+        }
+
+
+class PluginStats:
+    def __init__(self):
+        self.transactions = 0
+        self.skipped_transactions = 0
+        self.journals = 0
+        self.messages: Dict[str, int] = {}
+        self.message_journals: Dict[str, int] = {}
+        self.handlers: Dict[str, LatencyHistogram] = {}
+        self.resolver_hits = 0
+        self.resolver_misses = 0
+        self.parse_seconds = 0.0
+        self.convert_seconds = 0.0
+
+    def record_message(self, message_type: str, journals: int) -> None:
+        self.messages[message_type] = self.messages.get(message_type, 0) + 1
+        self.message_journals[message_type] = (
+            self.message_journals.get(message_type, 0) + journals
+        )
+
+    def record_handler(self, handler: str, seconds: float) -> None:
+        histogram = self.handlers.get(handler)
+        if histogram is None:
+            histogram = self.handlers[handler] = LatencyHistogram()
+        histogram.record(seconds)
+
+    def time_parse(self, decode: Callable[[Any], Any]) -> Callable[[Any], Any]:
+        def timed_decode(raw_transaction):
+            started = perf_counter()
+            try:
+                return decode(raw_transaction)
+            finally:
+                self.parse_seconds += perf_counter() - started
+
+        return timed_decode
+
+    def get_resolver_hit_rate(self) -> Optional[float]:
+        lookups = self.resolver_hits + self.resolver_misses
+        return self.resolver_hits / lookups if lookups else None
+
+    def merge(self, other: "PluginStats") -> None:
+        self.transactions += other.transactions
+        self.skipped_transactions += other.skipped_transactions
+        self.journals += other.journals
+        for message_type, count in other.messages.items():
+            self.messages[message_type] = self.messages.get(message_type, 0) + count
+        for message_type, count in other.message_journals.items():
+            self.message_journals[message_type] = (
+                self.message_journals.get(message_type, 0) + count
+            )
+        for handler, histogram in other.handlers.items():
+            self.handlers.setdefault(handler, LatencyHistogram()).merge(histogram)
+        self.resolver_hits += other.resolver_hits
+        self.resolver_misses += other.resolver_misses
+        self.parse_seconds += other.parse_seconds
+        self.convert_seconds += other.convert_seconds
+
+    def to_dict(self) -> dict:
+        return {
+            "transactions": self.transactions,
+            "skipped_transactions": self.skipped_transactions,
+            "journals": self.journals,
+            "parse_seconds": self.parse_seconds,
+            "convert_seconds": self.convert_seconds,
+            "resolver_hits": self.resolver_hits,
+            "resolver_misses": self.resolver_misses,
+            "resolver_hit_rate": self.get_resolver_hit_rate(),
+            "messages": {
+                message_type: {
+                    "count": count,
+                    "journals": self.message_journals.get(message_type, 0),
+                }
+                for message_type, count in sorted(self.messages.items())
+            },
+            "handlers": {
+                handler: histogram.to_dict()
+                for handler, histogram in sorted(self.handlers.items())
+            },
+        }
+
+    def format_summary(self) -> str:
+        hit_rate = self.get_resolver_hit_rate()
+        lines: List[str] = [
+            f"transactions: {self.transactions} "
+            f"(skipped {self.skipped_transactions})",
+            f"journals: {self.journals}",
+            f"parse: {self.parse_seconds:.3f}s convert: {self.convert_seconds:.3f}s",
+            f"token resolver: {self.resolver_hits} hits {self.resolver_misses} misses"
+            + ("" if hit_rate is None else f" ({hit_rate:.1%})"),
+            "messages:",
+        ]
+        for message_type, count in sorted(self.messages.items()):
+            journals = self.message_journals.get(message_type, 0)
+            lines.append(f"  {message_type}: {count} messages {journals} journals")
+        lines.append("handlers:")
+        for handler, histogram in sorted(self.handlers.items()):
+            quantiles = " ".join(
+                f"p{int(quantile * 100)}={histogram.get_quantile(quantile) * 1e6:.0f}us"
+                for quantile in QUANTILES
+            )
+            lines.append(
+                f"  {handler}: {histogram.count} calls "
+                f"total={histogram.total:.3f}s {quantiles} "
+                f"max={histogram.max * 1e6:.0f}us"
+            )
+        return "\n".join(lines) + "\n"
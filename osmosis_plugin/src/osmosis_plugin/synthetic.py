@@ -0,0 +1,285 @@
+import argparse
+import copy
+import json
+import os
+import random
+import re
+import sys
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, Iterator, List, Optional, TextIO
+
+TEMPLATE_ADDRESS = "osmo14ls9rcxxd5gqwshj85dae74tcp3umypp786h3m"
+TEMPLATE_NAMES = [
+    "swap",
+    "swap2",
+    "join_pool",
+    "exit_pool",
+    "lock_tokens",
+    "delegate",
+    "ibc_transfer",
+    "ibc_received_effect0",
+    "ibc_received_effect1",
+]
+START_TIME = datetime(2022, 1, 1)
+START_ID = 1
+TIMESTAMP_FORMAT = "%Y-%m-%dT%H:%M:%SZ"
+IBC_DENOM_PATTERN = re.compile(r"ibc/[0-9A-F]{64}")
+POOL_DENOM_PATTERN = re.compile(r"gamm/pool/\d+")
+COIN_PATTERN = re.compile(r"(\d+)(\D.*)?")
+# attributes and fields holding coin amounts, scaled together within a transaction.
+AMOUNT_KEYS = {"amount", "tokens_in", "tokens_out", "tokenOutMinAmount"}
+# events of a swap log holding one group of attributes per route hop.
+HOP_EVENT_TYPES = {"transfer", "coin_received", "coin_spent", "token_swapped"}
+FAILURE_CODES = [
+    (5, "insufficient funds"),
+    (11, "out of gas"),
+    (13, "insufficient fee"),
+]
+
+
+def load_templates(
+    directory: str, names: Optional[List[str]] = None
+) -> Dict[str, dict]:
+    templates = {}
+    for name in names or TEMPLATE_NAMES:
+        with open(
+            os.path.join(directory, f"{name}.json"), encoding="utf-8"
+        ) as jsonfile_local:
+            templates[name] = json.load(jsonfile_local)
+    return templates
+
+
+class SyntheticTransactionGenerator:
+    def __init__(
+        self,
+        templates: Dict[str, dict],
+        seed: int = 0,
+        address: str = TEMPLATE_ADDRESS,
+        denom_count: int = 64,
+        pool_count: int = 1000,
+        failure_rate: float = 0.02,
+        multi_message_rate: float = 0.1,
+        max_messages: int = 4,
+        max_route_length: int = 3,
+    ):
+        self.random = random.Random(seed)
+        self.names = sorted(templates)
+        self.templates = {
+            name: json.dumps(templates[name]).replace(TEMPLATE_ADDRESS, address)
+            for name in self.names
+        }
+        self.denoms = [
+            "ibc/" + "".join(self.random.choice("0123456789ABCDEF") for _ in range(64))
+            for _ in range(denom_count)
+        ]
+        self.pool_count = pool_count
+        self.failure_rate = failure_rate
+        self.multi_message_rate = multi_message_rate
+        self.max_messages = max_messages
+        self.max_route_length = max_route_length
+        self.id = START_ID
+        self.height = 1
+        self.time = START_TIME
+
+    def generate(self, count: int) -> Iterator[dict]:
+        # transactions come oldest first with increasing header ids.
+        for _ in range(count):
+            yield self._generate_transaction()
+
+    def _generate_transaction(self) -> dict:
+        name = self.random.choice(self.names)
+        transaction = json.loads(self._replace_denoms(self.templates[name]))
+        data = transaction["data"]
+
+        factor = 10 ** self.random.uniform(-2, 3)
+        self._scale_amounts(data["tx"], factor)
+        self._scale_amounts(data["logs"], factor)
+
+        messages = data["tx"]["body"]["messages"]
+        for msg_index, message in enumerate(messages):
+            if "routes" in message:
+                log = data["logs"][msg_index] if msg_index < len(data["logs"]) else None
+                self._extend_routes(message, log)
+        if len(messages) == 1 and self.random.random() < self.multi_message_rate:
+            self._repeat_message(data, self.random.randint(2, self.max_messages))
+
+        if self.random.random() < self.failure_rate:
+            code, reason = self.random.choice(FAILURE_CODES)
+            data["code"] = code
+            data["codespace"] = "sdk"
+            data["logs"] = []
+            data["raw_log"] = f"{reason}: synthetic failure"
+        else:
+            data["raw_log"] = json.dumps(data["logs"], separators=(",", ":"))
+
+        self.id += self.random.randint(1, 50)
+        self.height += self.random.randint(1, 20)
+        self.time += timedelta(seconds=self.random.randint(1, 3600))
+        timestamp = self.time.strftime(TIMESTAMP_FORMAT)
+        transaction["header"]["id"] = self.id
+        transaction["header"]["timestamp"] = timestamp
+        data["timestamp"] = timestamp
+        data["height"] = str(self.height)
+        data["txhash"] = "%064X" % self.random.getrandbits(256)
+        return transaction
+
+    def _replace_denoms(self, template: str) -> str:
+        denoms: Dict[str, str] = {}
+
+        def replace_denom(matched):
+            if matched.group(0) not in denoms:
+                denoms[matched.group(0)] = self.random.choice(self.denoms)
+            return denoms[matched.group(0)]
+
+        pools: Dict[str, str] = {}
+
+        def replace_pool(matched):
+            if matched.group(0) not in pools:
+                pool_id = self.random.randint(1, self.pool_count)
+                pools[matched.group(0)] = f"gamm/pool/{pool_id}"
+            return pools[matched.group(0)]
+
+        template = IBC_DENOM_PATTERN.sub(replace_denom, template)
+        return POOL_DENOM_PATTERN.sub(replace_pool, template)
+
+    def _scale_amounts(self, value, factor: float) -> None:
+        if isinstance(value, list):
+            for item in value:
+                self._scale_amounts(item, factor)
+        elif isinstance(value, dict):
+            if "key" in value and "value" in value:
+                if value["key"] in AMOUNT_KEYS and value["value"]:
+                    value["value"] = self._scale_coins(value["value"], factor)
+                return
+            for key, item in value.items():
+                if key in AMOUNT_KEYS and isinstance(item, str):
+                    value[key] = self._scale_coins(item, factor)
+                else:
+                    self._scale_amounts(item, factor)
+
+    @classmethod
+    def _scale_coins(cls, value: str, factor: float) -> str:
+        coins = []
+        for coin in value.split(","):
+            matched = COIN_PATTERN.fullmatch(coin)
+            if matched is None or int(matched.group(1)) == 0:
+                coins.append(coin)
+                continue
+            amount = max(1, int(int(matched.group(1)) * factor))
+            coins.append(f"{amount}{matched.group(2) or ''}")
+        return ",".join(coins)
+
+    def _extend_routes(self, message: dict, log: Optional[dict]) -> None:
+        hops = self.random.randint(1, self.max_route_length) - len(message["routes"])
+        if hops <= 0:
+            return
+        for _ in range(hops):
+            message["routes"].insert(
+                0,
+                {
+                    "poolId": str(self.random.randint(1, self.pool_count)),
+                    "tokenOutDenom": self.random.choice(self.denoms),
+                },
+            )
+        if log is not None:
+            self._extend_swap_log(log, message["routes"], hops)
+
+    def _extend_swap_log(self, log: dict, routes: List[dict], hops: int) -> None:
+        # the template log is a single hop; every hop of the route gets its own
+        # copy of the transfer, coin and token_swapped attributes.
+        events = {event["type"]: event for event in log["events"]}
+        if "transfer" not in events or "token_swapped" not in events:
+            return
+        coin_in, coin_out = self._get_attribute(events["transfer"], "amount")
+        (pool_id,) = self._get_attribute(events["token_swapped"], "pool_id")
+        matched = COIN_PATTERN.fullmatch(coin_in)
+        if matched is None:
+            return
+
+        amount = int(matched.group(1))
+        coins = [coin_in]
+        for route in routes[:hops]:
+            amount = max(1, int(amount * self.random.uniform(0.5, 2)))
+            coins.append(f"{amount}{route['tokenOutDenom']}")
+        coins.append(coin_out)
+
+        for event in log["events"]:
+            if event["type"] not in HOP_EVENT_TYPES:
+                continue
+            template = event["attributes"]
+            event["attributes"] = []
+            for hop, route in enumerate(routes):
+                replacements = {
+                    coin_in: coins[hop],
+                    coin_out: coins[hop + 1],
+                    pool_id: route["poolId"],
+                }
+                event["attributes"].extend(
+                    dict(
+                        attribute,
+                        value=replacements.get(attribute["value"], attribute["value"]),
+                    )
+                    for attribute in template
+                )
+
+    @classmethod
+    def _get_attribute(cls, event: dict, key: str) -> List[str]:
+        return [
+            attribute["value"]
+            for attribute in event["attributes"]
+            if attribute["key"] == key
+        ]
+
+    @classmethod
+    def _repeat_message(cls, data: dict, count: int) -> None:
+        body = data["tx"]["body"]
+        body["messages"] = [copy.deepcopy(body["messages"][0]) for _ in range(count)]
+        if not data["logs"]:
+            return
+        logs = []
+        for msg_index in range(count):
+            log = copy.deepcopy(data["logs"][0])
+            log["msg_index"] = msg_index
+            logs.append(log)
+        data["logs"] = logs
+
+
+def write_ndjson(transactions: Iterable[dict], stream: TextIO) -> int:
+    count = 0
+    for transaction in transactions:
+        stream.write(json.dumps(transaction, separators=(",", ":")))
+        stream.write("\n")
+        count += 1
+    return count
+
+
+def read_ndjson(stream: TextIO) -> Iterator[dict]:
+    for line in stream:
+        if line.strip():
+            yield json.loads(line)
+
+
+def parse_args(argv: list) -> argparse.Namespace:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--count", type=int, required=True)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--templates", required=True, help="directory of templates")
+    parser.add_argument("--address", default=TEMPLATE_ADDRESS)
+    parser.add_argument("--failure-rate", type=float, default=0.02)
+    parser.add_argument("--output", default=None, help="ndjson file, stdout if omitted")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args(sys.argv[1:])
+    generator = SyntheticTransactionGenerator(
+        load_templates(args.templates),
+        seed=args.seed,
+        address=args.address,
+        failure_rate=args.failure_rate,
+    )
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as output_file:
+            write_ndjson(generator.generate(args.count), output_file)
+    else:
+        write_ndjson(generator.generate(args.count), sys.stdout)
@@ -0,0 +1,59 @@
+from collections import OrderedDict
+from typing import Optional, Tuple, Union
+
+from senkalib.token_original_id_table import TokenOriginalIdTable
+
+TOKEN_CACHE_SIZE = 1024
+
+
+class TokenResolver:
+    def __init__(
+        self, token_table: TokenOriginalIdTable, maxsize: int = TOKEN_CACHE_SIZE
+    ):
+        self.token_table = token_table
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.cache: OrderedDict = OrderedDict()
+
+    @classmethod
+    def of(
+        cls, token_table: Union[TokenOriginalIdTable, "TokenResolver"]
+    ) -> "TokenResolver":
+        if isinstance(token_table, TokenResolver):
+            return token_table
+        return cls(token_table)
+
+    def resolve(
+        self, chain: str, token_original_id: Optional[str]
+    ) -> Tuple[Optional[str], Optional[str]]:
+        key = (chain, token_original_id)
+        resolved = self.cache.get(key)
+        if resolved is not None:
+            self.cache.move_to_end(key)
+            self.hits += 1
+            return resolved
+
+        self.misses += 1
+        if isinstance(self.token_table, TokenOriginalIdTable):
+            meta_data = self.token_table.get_all_meta_data(chain, token_original_id)
+            if meta_data is None:
+                resolved = (None, None)
+            else:
+                resolved = (meta_data["symbol"], meta_data["symbol_uuid"])
+        else:
+            resolved = (
+                self.token_table.get_symbol(chain, token_original_id),
+                self.token_table.get_symbol_uuid(chain, token_original_id),
+            )
+
+        self.cache[key] = resolved
+        if len(self.cache) > self.maxsize:
+            self.cache.popitem(last=False)
+        return resolved
+
+    def get_symbol(self, chain: str, token_original_id: Optional[str]):
+        return self.resolve(chain, token_original_id)[0]
+
+    def get_symbol_uuid(self, chain: str, token_original_id: Optional[str]):
+        return self.resolve(chain, token_original_id)[1]
@@ -0,0 +1,168 @@
+import csv
+import io
+import json
+import os
+import pickle
+import time
+from typing import Dict, List, Optional, Set, Tuple
+
+import requests
+from senkalib.token_original_id_table import TokenOriginalIdTable
+
+DEFAULT_MAX_AGE = 3600
+SNAPSHOT_FILE = "token_original_id.csv"
+METADATA_FILE = "token_original_id.json"
+INDEX_FILE = "token_original_id.index"
+
+
+def get_default_directory() -> str:
+    return os.path.join(os.path.expanduser("~"), ".cache", "osmosis_plugin")
+
+
+class SnapshotTokenOriginalIdTable(TokenOriginalIdTable):
+    def __init__(
+        self,
+        rows: List[dict],
+        index: Optional[Dict[tuple, dict]] = None,
+        duplicated: Optional[Set[tuple]] = None,
+    ):
+        # the parent constructor downloads the csv, so it is not called here.
+        self.token_original_id_table = rows
+        if index is None:
+            index, duplicated = _build_index(rows)
+        self.index = index
+        self.duplicated = duplicated or set()
+
+    def get_all_meta_data(self, chain: str, token_original_id: str) -> dict:
+        key = (chain, token_original_id)
+        if key in self.duplicated:
+            raise ValueError(
+                f"token_original_id table have duplicated definition. token_original_id: {token_original_id}"
+            )
+        return self.index.get(key)  # type: ignore
+
+
+def load_token_table(
+    url: str,
+    directory: str,
+    offline: bool = False,
+    max_age: float = DEFAULT_MAX_AGE,
+    timeout: float = 10,
+) -> SnapshotTokenOriginalIdTable:
+    os.makedirs(directory, exist_ok=True)
+    snapshot_path = os.path.join(directory, SNAPSHOT_FILE)
+    index_path = os.path.join(directory, INDEX_FILE)
+
+    metadata_path = os.path.join(directory, METADATA_FILE)
+    if not offline and not _is_fresh(snapshot_path, metadata_path, max_age):
+        _refresh_snapshot(url, directory, timeout)
+    if not os.path.exists(snapshot_path):
+        raise FileNotFoundError(
+            f"token_original_id snapshot is not found. path: {snapshot_path}"
+        )
+
+    # the index is only reused for the exact snapshot it was built from.
+    signature = _get_signature(snapshot_path)
+    cached = _load_index(index_path)
+    if cached is None or cached["snapshot"] != signature:
+        with open(snapshot_path, encoding="utf-8", newline="") as snapshot_file:
+            rows = list(csv.DictReader(snapshot_file))
+        index, duplicated = _build_index(rows)
+        cached = {
+            "snapshot": signature,
+            "rows": rows,
+            "index": index,
+            "duplicated": duplicated,
+        }
+        _write_atomic(index_path, pickle.dumps(cached, pickle.HIGHEST_PROTOCOL))
+
+    return SnapshotTokenOriginalIdTable(
+        cached["rows"], cached["index"], cached["duplicated"]
+    )
+
+
+def _refresh_snapshot(url: str, directory: str, timeout: float) -> None:
+    snapshot_path = os.path.join(directory, SNAPSHOT_FILE)
+    metadata_path = os.path.join(directory, METADATA_FILE)
+    metadata = _load_metadata(metadata_path) if os.path.exists(snapshot_path) else {}
+    headers = {}
+    if metadata.get("etag"):
+        headers["If-None-Match"] = metadata["etag"]
+    if metadata.get("last_modified"):
+        headers["If-Modified-Since"] = metadata["last_modified"]
+
+    try:
+        response = requests.get(url, headers=headers, timeout=timeout)
+        if response.status_code != 304:
+            response.raise_for_status()
+    except requests.RequestException:
+        # a stale snapshot is better than failing the run when the host is slow.
+        if os.path.exists(snapshot_path):
+            return
+        raise
+
+    if response.status_code == 304:
+        metadata["checked_at"] = time.time()
+        _write_atomic(metadata_path, json.dumps(metadata).encode("utf-8"))
+        return
+
+    content = response.content.decode()
+    rows = csv.reader(io.StringIO(content.strip()))
+    normalized = io.StringIO()
+    csv.writer(normalized, lineterminator="\n").writerows(rows)
+    _write_atomic(snapshot_path, normalized.getvalue().encode("utf-8"))
+    # a rewrite within the mtime resolution keeps the signature, so drop the index.
+    if os.path.exists(os.path.join(directory, INDEX_FILE)):
+        os.remove(os.path.join(directory, INDEX_FILE))
+    metadata = {
+        "etag": response.headers.get("ETag"),
+        "last_modified": response.headers.get("Last-Modified"),
+        "checked_at": time.time(),
+    }
+    _write_atomic(metadata_path, json.dumps(metadata).encode("utf-8"))
+
+
+def _load_metadata(metadata_path: str) -> dict:
+    if not os.path.exists(metadata_path):
+        return {}
+    with open(metadata_path, encoding="utf-8") as metadata_file:
+        return json.load(metadata_file)
+
+
+def _is_fresh(snapshot_path: str, metadata_path: str, max_age: float) -> bool:
+    if not os.path.exists(snapshot_path):
+        return False
+    checked_at = _load_metadata(metadata_path).get("checked_at", 0)
+    return time.time() - checked_at < max_age
+
+
+def _get_signature(path: str) -> Tuple[int, int]:
+    stat = os.stat(path)
+    return stat.st_size, stat.st_mtime_ns
+
+
+def _load_index(index_path: str) -> Optional[dict]:
+    if not os.path.exists(index_path):
+        return None
+    with open(index_path, "rb") as index_file:
+        index = pickle.load(index_file)
+    # indexes written by older versions are a (fields, values) tuple.
+    return index if isinstance(index, dict) else None
+
+
+def _build_index(rows: List[dict]) -> Tuple[Dict[tuple, dict], Set[tuple]]:
+    index: Dict[tuple, dict] = {}
+    duplicated = set()
+    for row in rows:
+        key = (row["chain"], row["original_id"])
+        if key in index:
+            duplicated.add(key)
+        index[key] = row
+    return index, duplicated
+
+
+def _write_atomic(path: str, content: bytes) -> None:
+    temporary_path = f"{path}.tmp"
+    with open(temporary_path, "wb") as temporary_file:
+        temporary_file.write(content)
+    os.replace(temporary_path, path)
@@ -0,0 +1,192 @@
+import json
+import sqlite3
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from osmosis_plugin.fetcher import OsmosisTransactionFetcher
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS transactions (
+    txhash TEXT PRIMARY KEY,
+    id INTEGER NOT NULL,
+    height INTEGER NOT NULL,
+    timestamp TEXT NOT NULL,
+    body TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS address_transactions (
+    address TEXT NOT NULL,
+    txhash TEXT NOT NULL,
+    id INTEGER NOT NULL,
+    PRIMARY KEY (address, txhash)
+);
+CREATE INDEX IF NOT EXISTS address_transactions_id
+    ON address_transactions (address, id);
+CREATE TABLE IF NOT EXISTS high_water_marks (
+    address TEXT PRIMARY KEY,
+    id INTEGER NOT NULL,
+    height INTEGER NOT NULL,
+    timestamp TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS watch_cursors (
+    address TEXT PRIMARY KEY,
+    id INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS watch_dead_letters (
+    address TEXT NOT NULL,
+    txhash TEXT NOT NULL,
+    id INTEGER NOT NULL,
+    error TEXT NOT NULL,
+    PRIMARY KEY (address, txhash)
+);
+"""
+
+
+class TransactionCache:
+    def __init__(self, path: str):
+        self.connection = sqlite3.connect(path)
+        self.connection.executescript(SCHEMA)
+
+    def close(self) -> None:
+        self.connection.close()
+
+    def get_high_water_mark(self, address: str) -> Optional[int]:
+        row = self.connection.execute(
+            "SELECT id FROM high_water_marks WHERE address = ?", (address,)
+        ).fetchone()
+        return None if row is None else row[0]
+
+    def add(self, address: str, transactions: Iterable[dict]) -> None:
+        with self.connection:
+            for transaction in transactions:
+                txhash = transaction["data"]["txhash"]
+                tx_id = int(transaction["header"]["id"])
+                self.connection.execute(
+                    "INSERT OR IGNORE INTO transactions VALUES (?, ?, ?, ?, ?)",
+                    (
+                        txhash,
+                        tx_id,
+                        int(transaction["data"]["height"]),
+                        transaction["header"]["timestamp"],
+                        json.dumps(transaction, separators=(",", ":")),
+                    ),
+                )
+                self.connection.execute(
+                    "INSERT OR IGNORE INTO address_transactions VALUES (?, ?, ?)",
+                    (address, txhash, tx_id),
+                )
+
+    def set_high_water_mark(self, address: str, transaction: dict) -> None:
+        with self.connection:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO high_water_marks VALUES (?, ?, ?, ?)",
+                (
+                    address,
+                    int(transaction["header"]["id"]),
+                    int(transaction["data"]["height"]),
+                    transaction["header"]["timestamp"],
+                ),
+            )
+
+    def update(self, address: str, fetcher: OsmosisTransactionFetcher) -> int:
+        # confirmed transactions never change, so only pages newer than the
+        # high-water mark are fetched. The mark moves only after every new page
+        # is stored; an interrupted update is simply fetched again.
+        high_water_mark = self.get_high_water_mark(address)
+        newest = None
+        count = 0
+        for page in fetcher.get_pages(address):
+            new_transactions = [
+                transaction
+                for transaction in page
+                if high_water_mark is None
+                or int(transaction["header"]["id"]) > high_water_mark
+            ]
+            self.add(address, new_transactions)
+            count += len(new_transactions)
+            if newest is None and new_transactions:
+                newest = new_transactions[0]
+            if len(new_transactions) < len(page):
+                break
+
+        if newest is not None:
+            self.set_high_water_mark(address, newest)
+        return count
+
+    def get_transactions(self, address: str) -> Iterator[dict]:
+        for _, body in self.get_raw_transactions(address):
+            yield json.loads(body)
+
+    def get_raw_transactions(self, address: str) -> Iterator[Tuple[str, str]]:
+        cursor = self.connection.execute(
+            """
+            SELECT txhash, transactions.body FROM address_transactions
+            JOIN transactions USING (txhash)
+            WHERE address_transactions.address = ?
+            ORDER BY address_transactions.id DESC
+            """,
+            (address,),
+        )
+        yield from cursor
+
+    def get_raw_transactions_after(
+        self, address: str, id_after: int, limit: int = -1
+    ) -> Iterator[Tuple[int, str, str]]:
+        # oldest first, so journals can be appended in the order they happened.
+        cursor = self.connection.execute(
+            """
+            SELECT address_transactions.id, txhash, transactions.body
+            FROM address_transactions
+            JOIN transactions USING (txhash)
+            WHERE address_transactions.address = ? AND address_transactions.id > ?
+            ORDER BY address_transactions.id
+            LIMIT ?
+            """,
+            (address, id_after, limit),
+        )
+        yield from cursor
+
+    def get_watch_cursor(self, address: str) -> Optional[int]:
+        row = self.connection.execute(
+            "SELECT id FROM watch_cursors WHERE address = ?", (address,)
+        ).fetchone()
+        return None if row is None else row[0]
+
+    def set_watch_cursor(self, address: str, tx_id: int) -> None:
+        with self.connection:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO watch_cursors VALUES (?, ?)", (address, tx_id)
+            )
+
+    def add_watch_dead_letter(
+        self, address: str, txhash: str, tx_id: int, error: str
+    ) -> None:
+        with self.connection:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO watch_dead_letters VALUES (?, ?, ?, ?)",
+                (address, txhash, tx_id, error),
+            )
+
+    def get_watch_dead_letters(self, address: str) -> List[Tuple[str, str]]:
+        cursor = self.connection.execute(
+            "SELECT txhash, error FROM watch_dead_letters WHERE address = ? ORDER BY id",
+            (address,),
+        )
+        return cursor.fetchall()
+
+    def get_shared_transactions(self, addresses: Iterable[str]) -> Dict[str, int]:
+        with self.connection:
+            self.connection.execute(
+                "CREATE TEMP TABLE IF NOT EXISTS tracked_addresses (address TEXT PRIMARY KEY)"
+            )
+            self.connection.execute("DELETE FROM tracked_addresses")
+            self.connection.executemany(
+                "INSERT OR IGNORE INTO tracked_addresses VALUES (?)",
+                ((address,) for address in addresses),
+            )
+        cursor = self.connection.execute(
+            """
+            SELECT txhash, COUNT(*) FROM address_transactions
+            WHERE address IN (SELECT address FROM tracked_addresses)
+            GROUP BY txhash HAVING COUNT(*) > 1
+            """
+        )
+        return dict(cursor.fetchall())
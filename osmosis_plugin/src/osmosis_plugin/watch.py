@@ -0,0 +1,301 @@
+import csv
+import logging
+import os
+import signal
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple, Union
+
+from senkalib.token_original_id_table import TokenOriginalIdTable
+
+from osmosis_plugin.caaj_writer import CAAJ_FIELDS
+from osmosis_plugin.decoder import DecodedTransaction, decode_transaction_bytes
+from osmosis_plugin.fetcher import OsmosisTransactionFetcher
+from osmosis_plugin.journal_builder import JournalBuilder
+from osmosis_plugin.osmosis_plugin import OsmosisPlugin
+from osmosis_plugin.token_resolver import TokenResolver
+from osmosis_plugin.transaction_cache import TransactionCache
+
+DEFAULT_POLL_INTERVAL = 30.0
+DEFAULT_BATCH_SIZE = 1000
+DECODED_TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+logger = logging.getLogger(__name__)
+
+
+class CsvDirectorySink:
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def write(self, address: str, builder: JournalBuilder) -> None:
+        path = os.path.join(self.directory, f"{address}.csv")
+        with open(path, "a", encoding="utf-8", newline="") as output:
+            writer = csv.writer(output, lineterminator="\n")
+            if output.tell() == 0:
+                writer.writerow(CAAJ_FIELDS)
+            writer.writerows(builder.rows())
+
+
+class WatchMetrics:
+    def __init__(self, addresses: List[str]):
+        self.lock = threading.Lock()
+        self.polls = 0
+        self.transactions = dict.fromkeys(addresses, 0)
+        self.journals = dict.fromkeys(addresses, 0)
+        self.errors = dict.fromkeys(addresses, 0)
+        self.dead_letters = dict.fromkeys(addresses, 0)
+        self.polled_at: Dict[str, float] = {}
+        self.last_transaction_at: Dict[str, float] = {}
+        self.transactions_per_second = 0.0
+        self.poll_seconds = 0.0
+
+    def record_address(
+        self,
+        address: str,
+        transactions: int,
+        journals: int,
+        last_timestamp: Optional[str],
+    ) -> None:
+        with self.lock:
+            self.transactions[address] += transactions
+            self.journals[address] += journals
+            self.polled_at[address] = time.time()
+            if last_timestamp is not None:
+                self.last_transaction_at[address] = (
+                    datetime.strptime(last_timestamp, DECODED_TIMESTAMP_FORMAT)
+                    .replace(tzinfo=timezone.utc)
+                    .timestamp()
+                )
+
+    def record_error(self, address: str) -> None:
+        with self.lock:
+            self.errors[address] += 1
+
+    def record_dead_letter(self, address: str) -> None:
+        with self.lock:
+            self.dead_letters[address] += 1
+
+    def record_poll(self, transactions: int, seconds: float) -> None:
+        with self.lock:
+            self.polls += 1
+            self.poll_seconds = seconds
+            self.transactions_per_second = transactions / seconds if seconds else 0.0
+
+    def render(self) -> str:
+        # prometheus text exposition format.
+        now = time.time()
+        with self.lock:
+            lines = [
+                "# HELP osmosis_watch_polls_total Completed poll cycles.",
+                "# TYPE osmosis_watch_polls_total counter",
+                f"osmosis_watch_polls_total {self.polls}",
+                "# HELP osmosis_watch_poll_seconds Duration of the last poll cycle.",
+                "# TYPE osmosis_watch_poll_seconds gauge",
+                f"osmosis_watch_poll_seconds {self.poll_seconds}",
+                "# HELP osmosis_watch_transactions_per_second Transactions converted "
+                "per second in the last poll cycle.",
+                "# TYPE osmosis_watch_transactions_per_second gauge",
+                "osmosis_watch_transactions_per_second "
+                f"{self.transactions_per_second}",
+            ]
+            lines += self._render_labeled(
+                "osmosis_watch_transactions_total",
+                "counter",
+                "Transactions converted.",
+                self.transactions,
+            )
+            lines += self._render_labeled(
+                "osmosis_watch_journals_total",
+                "counter",
+                "Journals appended to the sink.",
+                self.journals,
+            )
+            lines += self._render_labeled(
+                "osmosis_watch_errors_total",
+                "counter",
+                "Failed polls of an address.",
+                self.errors,
+            )
+            lines += self._render_labeled(
+                "osmosis_watch_dead_letters_total",
+                "counter",
+                "Transactions that failed to convert and were skipped.",
+                self.dead_letters,
+            )
+            lines += self._render_labeled(
+                "osmosis_watch_lag_seconds",
+                "gauge",
+                "Seconds since the address was last polled successfully.",
+                {
+                    address: now - polled_at
+                    for address, polled_at in self.polled_at.items()
+                },
+            )
+            lines += self._render_labeled(
+                "osmosis_watch_last_transaction_timestamp_seconds",
+                "gauge",
+                "Block time of the newest converted transaction.",
+                self.last_transaction_at,
+            )
+        return "\n".join(lines) + "\n"
+
+    @classmethod
+    def _render_labeled(
+        cls, name: str, metric_type: str, help_text: str, values: Mapping[str, float]
+    ) -> List[str]:
+        lines = [f"# HELP {name} {help_text}", f"# TYPE {name} {metric_type}"]
+        for address, value in sorted(values.items()):
+            lines.append(f'{name}{{address="{address}"}} {value}')
+        return lines
+
+
+class MetricsServer:
+    def __init__(self, metrics: WatchMetrics, port: int, host: str = "127.0.0.1"):
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = metrics.render().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.thread = threading.Thread(
+            target=self.server.serve_forever, name="osmosis-metrics", daemon=True
+        )
+
+    @property
+    def port(self) -> int:
+        return self.server.server_port
+
+    def __enter__(self) -> "MetricsServer":
+        self.thread.start()
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class Watcher:
+    def __init__(
+        self,
+        addresses: List[str],
+        cache: TransactionCache,
+        token_table: Union[TokenOriginalIdTable, TokenResolver],
+        fetcher: OsmosisTransactionFetcher,
+        sink: CsvDirectorySink,
+        interval: float = DEFAULT_POLL_INTERVAL,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+    ):
+        self.addresses = list(dict.fromkeys(addresses))
+        self.cache = cache
+        self.token_table = TokenResolver.of(token_table)
+        self.fetcher = fetcher
+        self.sink = sink
+        self.interval = interval
+        self.batch_size = batch_size
+        self.metrics = WatchMetrics(self.addresses)
+        self.stopped = threading.Event()
+
+    def run(self) -> None:
+        while not self.stopped.is_set():
+            self.poll()
+            self.stopped.wait(self.interval)
+
+    def stop(self, *args) -> None:
+        self.stopped.set()
+
+    def install_signal_handlers(self) -> None:
+        # the poll in progress finishes its batch, so the cursor matches the sink.
+        signal.signal(signal.SIGINT, self.stop)
+        signal.signal(signal.SIGTERM, self.stop)
+
+    def poll(self) -> int:
+        started = time.perf_counter()
+        transactions = 0
+        for address in self.addresses:
+            if self.stopped.is_set():
+                break
+            try:
+                transactions += self.poll_address(address)
+            except Exception:
+                self.metrics.record_error(address)
+                logger.exception("failed to poll %s", address)
+        self.metrics.record_poll(transactions, time.perf_counter() - started)
+        return transactions
+
+    def poll_address(self, address: str) -> int:
+        # journals are appended before the cursor moves, so a crash in between
+        # appends that batch again on restart.
+        self.cache.update(address, self.fetcher)
+        cursor = self.cache.get_watch_cursor(address) or 0
+        decode = OsmosisPlugin.get_decoder(decode_transaction_bytes)
+        count = 0
+        while not self.stopped.is_set():
+            rows = list(
+                self.cache.get_raw_transactions_after(address, cursor, self.batch_size)
+            )
+            if not rows:
+                break
+            try:
+                transactions = [decode(body) for _, _, body in rows]
+                builder = OsmosisPlugin.get_caajs_columns(
+                    address, transactions, self.token_table
+                )
+            except Exception:
+                transactions, builder = self._convert_each(address, rows, decode)
+            if len(builder):
+                self.sink.write(address, builder)
+            cursor = rows[-1][0]
+            self.cache.set_watch_cursor(address, cursor)
+            count += len(rows)
+            self.metrics.record_address(
+                address,
+                len(rows),
+                len(builder),
+                transactions[-1].timestamp if transactions else None,
+            )
+            if len(rows) < self.batch_size:
+                break
+        if count == 0:
+            self.metrics.record_address(address, 0, 0, None)
+        return count
+
+    def _convert_each(
+        self,
+        address: str,
+        rows: List[Tuple[int, str, str]],
+        decode: Callable[[Any], DecodedTransaction],
+    ) -> Tuple[List[DecodedTransaction], JournalBuilder]:
+        # a transaction that cannot be converted would hold the cursor forever, so
+        # the batch is converted one transaction at a time and the failing ones
+        # are recorded as dead letters and skipped.
+        transactions = []
+        builder = JournalBuilder()
+        for tx_id, txhash, body in rows:
+            try:
+                transaction = decode(body)
+                caajs = list(
+                    OsmosisPlugin.get_caajs_batch(
+                        address, [transaction], self.token_table
+                    )
+                )
+            except Exception as error:
+                logger.exception("skipped transaction %s of %s", txhash, address)
+                self.cache.add_watch_dead_letter(address, txhash, tx_id, repr(error))
+                self.metrics.record_dead_letter(address)
+                continue
+            transactions.append(transaction)
+            builder.extend(caajs)
+        return transactions, builder
@@ -0,0 +1,80 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List
+from urllib.parse import parse_qs, urlparse
+
+FIXTURES = [
+    "swap2",
+    "swap",
+    "join_pool",
+    "lock_tokens",
+    "exit_pool",
+    "ibc_received_effect1",
+    "ibc_received_effect0",
+    "delegate",
+    "ibc_transfer",
+]
+
+
+class StubChainApi:
+    def __init__(self, transactions: Dict[str, List[dict]]):
+        self.transactions = transactions
+        self.requests: List[dict] = []
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                url = urlparse(self.path)
+                address = url.path.rstrip("/").split("/")[-1]
+                params = {
+                    key: int(value[0]) for key, value in parse_qs(url.query).items()
+                }
+                stub.requests.append(dict(params, address=address))
+                body = json.dumps(stub.get_page(address, **params)).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server.server_port}/v1/account/new_txs"
+
+    def get_page(self, address: str, limit: int = 50, **params) -> List[dict]:
+        id_from = params.get("from", 0)
+        transactions = sorted(
+            self.transactions.get(address, []),
+            key=lambda transaction: int(transaction["header"]["id"]),
+            reverse=True,
+        )
+        if id_from:
+            transactions = [
+                transaction
+                for transaction in transactions
+                if int(transaction["header"]["id"]) < id_from
+            ]
+        return transactions[:limit]
+
+    def __enter__(self) -> "StubChainApi":
+        self.thread.start()
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+    @classmethod
+    def load_fixtures(cls, names: List[str] = FIXTURES) -> List[dict]:
+        fixtures = []
+        for name in names:
+            with open(f"tests/data/{name}.json", encoding="utf-8") as jsonfile_local:
+                fixtures.append(json.load(jsonfile_local))
+        return fixtures
@@ -0,0 +1,47 @@
+import json
+import os
+import subprocess
+import sys
+
+
+class TestBenchmarks:
+    def test_bench_osmosis_plugin(self, tmp_path):
+        baseline = tmp_path / "baseline.json"
+        TestBenchmarks._run_benchmark("--output", str(baseline))
+        results = json.loads(baseline.read_text())
+        assert results["metadata"]["repeat"] == 1
+        assert results["message_types"]["MsgSwapExactAmountIn"]["transactions"] == 2
+        assert results["message_types"]["MsgSwapExactAmountIn"]["journals"] == 4
+        assert results["mixed"]["transactions"] == 20
+        assert results["startup"]["import_seconds"] > 0
+        for metrics in results["message_types"].values():
+            assert metrics["transactions_per_second"] > 0
+            assert metrics["peak_bytes_per_transaction"] > 0
+
+        completed = TestBenchmarks._run_benchmark("--compare", str(baseline))
+        assert json.loads(completed.stdout)["mixed"]["journals"] > 0
+        assert "mixed transactions_per_second" in completed.stderr
+        assert "startup import_seconds" in completed.stderr
+
+        completed = TestBenchmarks._run_benchmark("--synthetic-seed", "1")
+        assert json.loads(completed.stdout)["metadata"]["synthetic_seed"] == 1
+
+    @classmethod
+    def _run_benchmark(cls, *argv: str) -> subprocess.CompletedProcess:
+        return subprocess.run(
+            [
+                sys.executable,
+                "benchmarks/bench_osmosis_plugin.py",
+                "--repeat",
+                "1",
+                "--min-transactions",
+                "1",
+                "--mixed-size",
+                "20",
+                *argv,
+            ],
+            check=True,
+            capture_output=True,
+            env=dict(os.environ, PYTHONPATH="src"),
+            text=True,
+        )
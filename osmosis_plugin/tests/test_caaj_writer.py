@@ -0,0 +1,48 @@
+import io
+import json
+
+import pandas as pd
+from senkalib.chain.osmosis.osmosis_transaction import OsmosisTransaction
+
+from osmosis_plugin.caaj_writer import write_caajs_csv
+from osmosis_plugin.osmosis_plugin import OsmosisPlugin
+from tests import test_osmosis_plugin
+
+
+class TestCaajWriter:
+    @classmethod
+    def get_caajs(cls):
+        transactions = [
+            OsmosisTransaction(TestCaajWriter._get_test_data(name))
+            for name in ["exit_pool", "swap", "ibc_transfer", "join_pool", "delegate"]
+        ]
+        mock = test_osmosis_plugin.TestOsmosisPlugin.get_token_table_mock()
+        return list(
+            OsmosisPlugin.get_caajs_batch(
+                "osmo14ls9rcxxd5gqwshj85dae74tcp3umypp786h3m", transactions, mock
+            )
+        )
+
+    def test_write_caajs_csv_matches_dataframe(self, tmp_path):
+        caajs = TestCaajWriter.get_caajs()
+        stream = io.StringIO()
+        count = write_caajs_csv(caajs, stream, buffer_size=2, directory=str(tmp_path))
+        assert count == len(caajs)
+
+        df = pd.DataFrame(caajs)
+        df = df.sort_values("executed_at", kind="stable")
+        assert stream.getvalue() == df.to_csv(None, index=False)
+
+    def test_write_caajs_csv_unsorted(self):
+        caajs = TestCaajWriter.get_caajs()
+        stream = io.StringIO()
+        write_caajs_csv(iter(caajs), stream, sort=False)
+        lines = stream.getvalue().splitlines()
+        assert lines[0].startswith("executed_at,chain,platform")
+        assert lines[1].startswith("2022-01-21 02:54:12,osmosis,osmosis,liquidity")
+
+    @classmethod
+    def _get_test_data(cls, filename):
+        with open(f"tests/data/{filename}.json", encoding="utf-8") as jsonfile_local:
+            test_data = json.load(jsonfile_local)
+        return test_data
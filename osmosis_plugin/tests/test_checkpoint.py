@@ -0,0 +1,96 @@
+import io
+
+import pytest
+from senkalib.chain.osmosis.osmosis_transaction import OsmosisTransaction
+
+from osmosis_plugin.caaj_writer import write_caajs_csv
+from osmosis_plugin.checkpoint import get_caajs_checkpointed, has_checkpoint
+from osmosis_plugin.osmosis_plugin import OsmosisPlugin
+from tests import test_osmosis_plugin
+from tests.stub_chain_api import StubChainApi
+
+ADDRESS = "osmo14ls9rcxxd5gqwshj85dae74tcp3umypp786h3m"
+
+
+class TestCheckpoint:
+    @classmethod
+    def get_transactions(cls):
+        return [
+            OsmosisTransaction(transaction)
+            for transaction in StubChainApi.load_fixtures()
+        ]
+
+    @classmethod
+    def fail_after(cls, transactions, count):
+        for position, transaction in enumerate(transactions):
+            if position == count:
+                raise RuntimeError("rate limited")
+            yield transaction
+
+    @classmethod
+    def to_csv(cls, caajs):
+        stream = io.StringIO()
+        write_caajs_csv(caajs, stream)
+        return stream.getvalue()
+
+    def test_resume_is_identical(self, tmp_path):
+        mock = test_osmosis_plugin.TestOsmosisPlugin.get_token_table_mock()
+        transactions = TestCheckpoint.get_transactions()
+        expected = TestCheckpoint.to_csv(
+            OsmosisPlugin.get_caajs_batch(ADDRESS, transactions, mock)
+        )
+
+        directory = str(tmp_path / "checkpoint")
+        with pytest.raises(RuntimeError):
+            list(
+                get_caajs_checkpointed(
+                    ADDRESS,
+                    TestCheckpoint.fail_after(transactions, 7),
+                    mock,
+                    directory,
+                    interval=3,
+                )
+            )
+        assert has_checkpoint(directory)
+
+        mock.reset_mock()
+        caajs = get_caajs_checkpointed(
+            ADDRESS, transactions, mock, directory, interval=3, resume=True
+        )
+        assert TestCheckpoint.to_csv(caajs) == expected
+        assert mock.get_symbol.call_count > 0
+
+    def test_resume_without_checkpoint(self, tmp_path):
+        mock = test_osmosis_plugin.TestOsmosisPlugin.get_token_table_mock()
+        transactions = TestCheckpoint.get_transactions()
+        directory = str(tmp_path / "checkpoint")
+        caajs = list(
+            get_caajs_checkpointed(ADDRESS, transactions, mock, directory, resume=True)
+        )
+        assert len(caajs) == len(
+            list(OsmosisPlugin.get_caajs_batch(ADDRESS, transactions, mock))
+        )
+
+    def test_resume_with_changed_transactions(self, tmp_path):
+        mock = test_osmosis_plugin.TestOsmosisPlugin.get_token_table_mock()
+        transactions = TestCheckpoint.get_transactions()
+        directory = str(tmp_path / "checkpoint")
+        list(get_caajs_checkpointed(ADDRESS, transactions[:4], mock, directory))
+        with pytest.raises(ValueError, match="differ from the checkpoint"):
+            list(
+                get_caajs_checkpointed(
+                    ADDRESS, transactions[1:], mock, directory, resume=True
+                )
+            )
+
+    def test_resume_other_address(self, tmp_path):
+        mock = test_osmosis_plugin.TestOsmosisPlugin.get_token_table_mock()
+        transactions = TestCheckpoint.get_transactions()
+        directory = str(tmp_path / "checkpoint")
+        list(get_caajs_checkpointed(ADDRESS, transactions[:2], mock, directory))
+        with pytest.raises(ValueError, match="another address"):
+            list(
+                get_caajs_checkpointed(
+                    "osmo1other", transactions, mock, directory, resume=True
+                )
+            )
@@ -0,0 +1,91 @@
+import random
+from decimal import Decimal, localcontext
+
+import pytest
+
+from osmosis_plugin.coin import (
+    Coin,
+    format_amount,
+    get_decimals,
+    parse_coin,
+    parse_coins,
+)
+
+
+class TestCoin:
+    def test_parse_coin(self):
+        coin = parse_coin(
+            "4900ibc/46B44899322F3CD854D2D46DEEF881958467CDD4B3B10086DA49296BBED94BED"
+        )
+        assert coin == Coin(
+            "0.0049",
+            "ibc/46B44899322F3CD854D2D46DEEF881958467CDD4B3B10086DA49296BBED94BED",
+            6,
+        )
+        assert (
+            coin.token_original_id
+            == "ibc/46B44899322F3CD854D2D46DEEF881958467CDD4B3B10086DA49296BBED94BED"
+        )
+
+    def test_parse_coin_pool(self):
+        coin = parse_coin("4323192512586978gamm/pool/497")
+        assert coin.amount == "0.004323192512586978"
+        assert coin.decimals == 18
+        assert coin.token_original_id == "gamm/pool/497"
+
+    def test_parse_coin_native(self):
+        assert parse_coin("9969uosmo").token_original_id is None
+        assert parse_coin("9969uion").token_original_id is None
+
+    def test_parse_coin_invalid(self):
+        with pytest.raises(ValueError):
+            parse_coin("uosmo")
+
+    def test_parse_coins(self):
+        coins = parse_coins(
+            "1382ibc/46B44899322F3CD854D2D46DEEF881958467CDD4B3B10086DA49296BBED94BED,2678uosmo"
+        )
+        assert [coin.amount for coin in coins] == ["0.001382", "0.002678"]
+        assert coins[1].denom == "uosmo"
+
+    def test_parse_coin_cached(self):
+        parse_coin.cache_clear()
+        parse_coin("10000uosmo")
+        parse_coin("10000uosmo")
+        assert parse_coin.cache_info().hits == 1
+
+    def test_format_amount_matches_decimal(self):
+        amounts = ["0", "000", "1", "10", "15", "100", "1000000", "0012300"]
+        generator = random.Random(0)
+        for _ in range(2000):
+            digits = generator.randint(1, 40)
+            amount = str(generator.randrange(10**digits))
+            amounts.append(amount + "0" * generator.randint(0, 20))
+        for amount in amounts:
+            for decimals in [0, 6, 8, 18]:
+                with localcontext() as context:
+                    context.prec = 100
+                    expected = str(Decimal(amount) / Decimal(10**decimals))
+                assert format_amount(amount, decimals) == expected, (amount, decimals)
+
+    def test_format_amount(self):
+        assert format_amount("15", 18) == "1.5E-17"
+        assert format_amount("1", 6) == "0.000001"
+        assert format_amount("5100000", 6) == "5.1"
+        assert format_amount("1000000000000000000", 18) == "1"
+
+    def test_get_decimals(self):
+        assert get_decimals("uosmo") == 6
+        assert get_decimals("gamm/pool/497") == 18
+        assert (
+            get_decimals(
+                "ibc/6AE98883D4D5D5FF9E50D7130F1305DA2FFA0C652D1DD9C123657C6B4EB2DF8A"
+            )
+            == 18
+        )
+        assert (
+            get_decimals(
+                "ibc/46B44899322F3CD854D2D46DEEF881958467CDD4B3B10086DA49296BBED94BED"
+            )
+            == 6
+        )
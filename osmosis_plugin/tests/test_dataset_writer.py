@@ -0,0 +1,83 @@
+import gzip
+import json
+
+import pytest
+from senkalib.chain.osmosis.osmosis_transaction import OsmosisTransaction
+
+from osmosis_plugin.dataset_writer import write_dataset
+from osmosis_plugin.osmosis_plugin import OsmosisPlugin
+from tests import test_osmosis_plugin
+
+ADDRESS = "osmo14ls9rcxxd5gqwshj85dae74tcp3umypp786h3m"
+
+
+class TestDatasetWriter:
+    def test_write_dataset_csv_gz(self, tmp_path):
+        builder = TestDatasetWriter.get_builder()
+        counts = write_dataset(builder, str(tmp_path), ADDRESS, "csv.gz")
+        assert sorted(counts.values()) == [1, 10]
+
+        path = tmp_path / f"address={ADDRESS}" / "year=2021" / "part-0.csv.gz"
+        with gzip.open(path, "rt", encoding="utf-8") as csv_file:
+            lines = csv_file.read().splitlines()
+        assert lines[0].startswith("executed_at,chain,platform")
+        assert len(lines) == 1 + 1
+        assert all(line.startswith("2021-") for line in lines[1:])
+        assert not list(tmp_path.glob("**/*.tmp"))
+
+    def test_write_dataset_parquet(self, tmp_path):
+        ds = pytest.importorskip("pyarrow.dataset")
+        pq = pytest.importorskip("pyarrow.parquet")
+        builder = TestDatasetWriter.get_builder()
+        write_dataset(builder, str(tmp_path), ADDRESS, "parquet", row_group_size=4)
+
+        path = tmp_path / f"address={ADDRESS}" / "year=2022" / "part-0.parquet"
+        metadata = pq.ParquetFile(path).metadata
+        assert metadata.num_rows == 10
+        assert metadata.num_row_groups == 3
+        executed_at = metadata.row_group(0).column(0).statistics
+        assert executed_at.has_min_max
+        assert executed_at.min <= executed_at.max
+
+        dataset = ds.dataset(str(tmp_path), format="parquet", partitioning="hive")
+        table = dataset.to_table(
+            filter=(ds.field("year") == 2022) & (ds.field("token_symbol") == "osmo")
+        )
+        assert table.num_rows == 4
+        assert set(table.column("address").to_pylist()) == {ADDRESS}
+        executed_at = table.column("executed_at").to_pylist()
+        assert executed_at == sorted(executed_at)
+
+    def test_write_dataset_arrow(self, tmp_path):
+        pa = pytest.importorskip("pyarrow")
+        builder = TestDatasetWriter.get_builder()
+        write_dataset(builder, str(tmp_path), ADDRESS, "arrow", row_group_size=4)
+
+        path = tmp_path / f"address={ADDRESS}" / "year=2022" / "part-0.arrow"
+        with pa.memory_map(str(path)) as source:
+            reader = pa.ipc.open_file(source)
+            assert reader.num_record_batches == 3
+            assert reader.read_all().num_rows == 10
+
+    def test_write_dataset_unknown_format(self, tmp_path):
+        with pytest.raises(ValueError):
+            write_dataset(
+                TestDatasetWriter.get_builder(), str(tmp_path), ADDRESS, "xlsx"
+            )
+
+    @classmethod
+    def get_builder(cls):
+        old = TestDatasetWriter._get_test_data("delegate")
+        old["header"]["timestamp"] = "2021-12-31T23:59:59Z"
+        transactions = [OsmosisTransaction(old)] + [
+            OsmosisTransaction(TestDatasetWriter._get_test_data(name))
+            for name in ["exit_pool", "swap", "ibc_transfer", "join_pool"]
+        ]
+        mock = test_osmosis_plugin.TestOsmosisPlugin.get_token_table_mock()
+        return OsmosisPlugin.get_caajs_columns(ADDRESS, transactions, mock)
+
+    @classmethod
+    def _get_test_data(cls, filename):
+        with open(f"tests/data/{filename}.json", encoding="utf-8") as jsonfile_local:
+            test_data = json.load(jsonfile_local)
+        return test_data
@@ -0,0 +1,119 @@
+import copy
+import json
+from decimal import Decimal
+
+import pytest
+from senkalib.chain.osmosis.osmosis_transaction import OsmosisTransaction
+
+from osmosis_plugin import decoder
+from osmosis_plugin.decoder import (
+    DecodedTransaction,
+    Fee,
+    decode_transaction,
+    decode_transaction_bytes,
+    format_timestamp,
+)
+from osmosis_plugin.osmosis_plugin import OsmosisPlugin
+from tests import test_osmosis_plugin
+
+ADDRESS = "osmo14ls9rcxxd5gqwshj85dae74tcp3umypp786h3m"
+
+
+class TestDecoder:
+    def test_decode_transaction(self):
+        test_data = TestDecoder._get_test_data("swap")
+        decoded = decode_transaction(test_data)
+        transaction = OsmosisTransaction(test_data)
+        assert (
+            decoded.transaction_id
+            == "97A5C4A33FA36397A342D34D576AC07BA3F5CB5B7274E2BAF7092470A681FDEB"
+        )
+        assert decoded.chain_id == "osmosis-1"
+        assert decoded.code == 0
+        assert decoded.fee == Fee("0", "uosmo")
+        assert decoded.messages == test_data["data"]["tx"]["body"]["messages"]
+        assert decoded.get_transaction_id() == transaction.get_transaction_id()
+        assert decoded.get_timestamp() == transaction.get_timestamp()
+        assert decoded.get_transaction_fee() == transaction.get_transaction_fee()
+
+    def test_decode_transaction_without_fee(self):
+        test_data = TestDecoder._get_test_data("swap")
+        test_data["data"]["tx"]["auth_info"]["fee"]["amount"] = []
+        decoded = decode_transaction(test_data)
+        assert decoded.fee is None
+        assert decoded.get_transaction_fee() == Decimal("0")
+
+    def test_decode_transaction_without_logs(self):
+        test_data = TestDecoder._get_test_data("swap")
+        test_data["data"]["code"] = 11
+        del test_data["data"]["logs"]
+        decoded = decode_transaction(test_data)
+        assert decoded.code == 11
+        assert decoded.events.get_events("transfer") == []
+
+    def test_decode_transaction_bytes(self):
+        test_data = TestDecoder._get_test_data("join_pool")
+        body = json.dumps(test_data)
+        expected = decode_transaction(copy.deepcopy(test_data))
+        for decoded in [
+            decode_transaction_bytes(body),
+            decode_transaction_bytes(body.encode()),
+        ]:
+            assert decoded[:5] == expected[:5]
+            assert decoded.fee == expected.fee
+
+    def test_decode_transaction_indexes_events_lazily(self):
+        decoded = decode_transaction(TestDecoder._get_test_data("swap"))
+        assert decoded.events.events == {}
+        assert len(decoded.events.get_events("transfer", 0)) == 1
+        assert decoded.events.logs is None
+
+    def test_format_timestamp(self):
+        assert format_timestamp("2022-03-01T09:08:07Z") == "2022-03-01 09:08:07"
+        with pytest.raises(ValueError):
+            format_timestamp("2022-03-01 09:08:07")
+
+    def test_get_caajs_batch_skips_before_decoding(self, monkeypatch):
+        failed = TestDecoder._get_test_data("swap")
+        failed["data"]["code"] = 11
+        foreign = TestDecoder._get_test_data("swap")
+        foreign["header"]["chain_id"] = "cosmoshub-4"
+        decoded = []
+        monkeypatch.setattr(
+            decoder,
+            "decode_transaction",
+            lambda raw_transaction: decoded.append(raw_transaction),
+        )
+        transactions = [OsmosisTransaction(failed), OsmosisTransaction(foreign)]
+        token_table = test_osmosis_plugin.TestOsmosisPlugin.get_token_table_mock()
+        assert (
+            list(OsmosisPlugin.get_caajs_batch(ADDRESS, transactions, token_table))
+            == []
+        )
+        assert decoded == []
+
+    def test_of(self):
+        decoded = decode_transaction(TestDecoder._get_test_data("swap"))
+        assert DecodedTransaction.of(decoded) is decoded
+        transaction = OsmosisTransaction(TestDecoder._get_test_data("swap"))
+        assert DecodedTransaction.of(transaction)[:5] == decoded[:5]
+
+    @pytest.mark.parametrize(
+        "name", ["swap", "join_pool", "exit_pool", "ibc_transfer", "delegate"]
+    )
+    def test_get_caajs(self, name):
+        test_data = TestDecoder._get_test_data(name)
+        token_table = test_osmosis_plugin.TestOsmosisPlugin.get_token_table_mock()
+        expected = OsmosisPlugin.get_caajs(
+            ADDRESS, OsmosisTransaction(copy.deepcopy(test_data)), token_table
+        )
+        caajs = OsmosisPlugin.get_caajs(
+            ADDRESS, decode_transaction(test_data), token_table
+        )
+        assert caajs == expected
+
+    @classmethod
+    def _get_test_data(cls, filename):
+        with open(f"tests/data/{filename}.json", encoding="utf-8") as jsonfile_local:
+            test_data = json.load(jsonfile_local)
+        return test_data
@@ -0,0 +1,57 @@
+import json
+
+from senkalib.chain.osmosis.osmosis_transaction import OsmosisTransaction
+
+from osmosis_plugin.event_index import EventIndex
+
+
+class TestEventIndex:
+    def test_get_events(self):
+        test_data = TestEventIndex._get_test_data("join_pool")
+        events = EventIndex.from_transaction(OsmosisTransaction(test_data))
+        transfers = events.get_events("transfer")
+        assert len(transfers) == 1
+        assert transfers[0].msg_index == 0
+        assert transfers[0].get("sender") == [
+            "osmo14ls9rcxxd5gqwshj85dae74tcp3umypp786h3m",
+            "osmo1c9y7crgg6y9pfkq0y8mqzknqz84c3etr0kpcvj",
+        ]
+        assert transfers[0].first("amount") == (
+            "5146ibc/46B44899322F3CD854D2D46DEEF881958467CDD4B3B10086DA49296BBED94BED,9969uosmo"
+        )
+        assert transfers[0].first("validator") is None
+        assert events.get_events("delegate") == []
+
+    def test_get_events_by_msg_index(self):
+        test_data = TestEventIndex._get_test_data("ibc_received_effect1")
+        events = EventIndex.from_transaction(OsmosisTransaction(test_data))
+        assert len(events.get_events("fungible_token_packet")) == 2
+        assert events.get_events("fungible_token_packet", 0) == []
+        assert len(events.get_events("fungible_token_packet", 1)) == 1
+        assert events.get_events("transfer", 2)[0].msg_index == 2
+
+    def test_get_events_same_type_in_one_log(self):
+        logs = [
+            {
+                "events": [
+                    {
+                        "type": "transfer",
+                        "attributes": [{"key": "amount", "value": "1uosmo"}],
+                    },
+                    {"type": "message", "attributes": []},
+                    {
+                        "type": "transfer",
+                        "attributes": [{"key": "amount", "value": "2uion"}],
+                    },
+                ]
+            }
+        ]
+        transfers = EventIndex(logs).get_events("transfer", 0)
+        assert [event.first("amount") for event in transfers] == ["1uosmo", "2uion"]
+        assert [event.position for event in transfers] == [0, 2]
+
+    @classmethod
+    def _get_test_data(cls, filename):
+        with open(f"tests/data/{filename}.json", encoding="utf-8") as jsonfile_local:
+            test_data = json.load(jsonfile_local)
+        return test_data
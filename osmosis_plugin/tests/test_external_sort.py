@@ -0,0 +1,21 @@
+import random
+from operator import itemgetter
+
+from osmosis_plugin.external_sort import external_sort
+
+
+class TestExternalSort:
+    def test_external_sort_in_memory(self, tmp_path):
+        records = [(3, "c"), (1, "a"), (2, "b")]
+        result = list(external_sort(records, itemgetter(0), 10, str(tmp_path)))
+        assert result == [(1, "a"), (2, "b"), (3, "c")]
+
+    def test_external_sort_spills_runs(self, tmp_path):
+        generator = random.Random(0)
+        records = [(generator.randrange(50), index) for index in range(1000)]
+        result = list(external_sort(records, itemgetter(0), 64, str(tmp_path)))
+        assert result == sorted(records, key=itemgetter(0))
+        assert list(tmp_path.iterdir()) == []
+
+    def test_external_sort_empty(self, tmp_path):
+        assert list(external_sort([], itemgetter(0), 2, str(tmp_path))) == []
@@ -0,0 +1,96 @@
+import io
+import json
+
+import pandas as pd
+import pytest
+from senkalib.chain.osmosis.osmosis_transaction import OsmosisTransaction
+
+from osmosis_plugin.caaj_writer import write_caajs_csv
+from osmosis_plugin.journal_builder import JournalBuilder
+from osmosis_plugin.osmosis_plugin import OsmosisPlugin
+from tests import test_osmosis_plugin
+
+ADDRESS = "osmo14ls9rcxxd5gqwshj85dae74tcp3umypp786h3m"
+FIXTURES = ["exit_pool", "swap", "ibc_transfer", "join_pool", "delegate", "swap2"]
+
+
+class TestJournalBuilder:
+    def test_get_caajs_columns(self):
+        transactions = TestJournalBuilder.get_transactions()
+        mock = test_osmosis_plugin.TestOsmosisPlugin.get_token_table_mock()
+        caajs = list(OsmosisPlugin.get_caajs_batch(ADDRESS, transactions, mock))
+        builder = OsmosisPlugin.get_caajs_columns(ADDRESS, transactions, mock)
+        assert len(builder) == len(caajs)
+        assert builder.to_caajs() == caajs
+
+        chain = builder.columns["chain"]
+        assert chain.values == ["osmosis"]
+        assert list(chain.codes) == [0] * len(caajs)
+        token_original_id = builder.columns["token_original_id"]
+        assert None not in token_original_id.values
+        assert -1 in token_original_id.codes
+
+    def test_write_csv(self):
+        caajs = TestJournalBuilder.get_caajs()
+        builder = JournalBuilder.from_caajs(caajs)
+        builder.sort()
+        stream = io.StringIO()
+        assert builder.write_csv(stream) == len(caajs)
+
+        expected = io.StringIO()
+        write_caajs_csv(caajs, expected)
+        assert stream.getvalue() == expected.getvalue()
+
+    def test_sort(self):
+        builder = JournalBuilder()
+        for executed_at, amount in [("b", "1"), (None, "2"), ("a", "3"), ("b", "4")]:
+            builder.append(executed_at, *([None] * 6), amount, *([None] * 6))
+        builder.sort()
+        assert [row[0] for row in builder.rows()] == [None, "a", "b", "b"]
+        assert [row[7] for row in builder.rows()] == ["2", "3", "1", "4"]
+
+        builder.sort("amount")
+        assert [row[7] for row in builder.rows()] == ["1", "2", "3", "4"]
+
+    def test_to_pandas(self):
+        caajs = TestJournalBuilder.get_caajs()
+        df = JournalBuilder.from_caajs(caajs).to_pandas()
+        assert isinstance(df["token_symbol"].dtype, pd.CategoricalDtype)
+        assert df.to_csv(None, index=False) == pd.DataFrame(caajs).to_csv(
+            None, index=False
+        )
+
+    def test_to_arrow(self, tmp_path):
+        pa = pytest.importorskip("pyarrow")
+        pq = pytest.importorskip("pyarrow.parquet")
+        caajs = TestJournalBuilder.get_caajs()
+        builder = JournalBuilder.from_caajs(caajs)
+        table = builder.to_arrow()
+        assert pa.types.is_dictionary(table.schema.field("token_symbol").type)
+        assert table.to_pylist() == [caaj.__dict__ for caaj in caajs]
+
+        path = str(tmp_path / "caajs.parquet")
+        assert builder.write_parquet(path) == len(caajs)
+        assert pq.read_table(path).to_pylist() == table.to_pylist()
+
+    @classmethod
+    def get_transactions(cls):
+        return [
+            OsmosisTransaction(TestJournalBuilder._get_test_data(name))
+            for name in FIXTURES
+        ]
+
+    @classmethod
+    def get_caajs(cls):
+        mock = test_osmosis_plugin.TestOsmosisPlugin.get_token_table_mock()
+        return list(
+            OsmosisPlugin.get_caajs_batch(
+                ADDRESS, TestJournalBuilder.get_transactions(), mock
+            )
+        )
+
+    @classmethod
+    def _get_test_data(cls, filename):
+        with open(f"tests/data/{filename}.json", encoding="utf-8") as jsonfile_local:
+            test_data = json.load(jsonfile_local)
+        return test_data
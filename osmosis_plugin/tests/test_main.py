@@ -0,0 +1,96 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+import main
+from main import parse_args
+from osmosis_plugin.fetcher import OsmosisTransactionFetcher
+from osmosis_plugin.token_table_snapshot import SNAPSHOT_FILE
+from tests.stub_chain_api import StubChainApi
+
+# the import time itself is reported by benchmarks/bench_osmosis_plugin.py.
+HEAVY_MODULES = ["pandas", "numpy", "pyarrow"]
+ADDRESS = "osmo14ls9rcxxd5gqwshj85dae74tcp3umypp786h3m"
+
+
+class TestMain:
+    def test_parse_args(self):
+        args = parse_args(["osmo1address", "--no-sort", "--stats"])
+        assert args.address == "osmo1address"
+        assert args.no_sort is True
+        assert args.stream is False
+        assert args.stats is True
+
+        with pytest.raises(SystemExit):
+            parse_args([])
+
+        argv = ["osmo1address", "--pipeline", "--profile", "profile"]
+        assert parse_args(argv + ["--profile-sampling-only"]).pipeline is True
+
+    def test_parse_args_conflicts(self):
+        addresses = ["--addresses-file", "addresses.txt"]
+        for argv in [
+            addresses + ["--workers", "2"],
+            addresses + ["--pipeline"],
+            addresses + ["--stream"],
+            addresses + ["--checkpoint", "checkpoint"],
+            addresses + ["--cache", "transactions.sqlite", "--resume"],
+            ["osmo1address", "--workers", "2", "--checkpoint", "checkpoint"],
+            ["osmo1address", "--pipeline", "--cache", "transactions.sqlite"],
+            ["osmo1address", "--pipeline", "--checkpoint", "checkpoint"],
+            ["osmo1address", "--pipeline", "--workers", "2"],
+            ["osmo1address", "--checkpoint", "checkpoint", "--resume"],
+            ["osmo1address", "--profile", "profile", "--workers", "2"],
+            ["osmo1address", "--profile", "profile", "--pipeline"],
+        ]:
+            with pytest.raises(SystemExit):
+                parse_args(argv)
+
+    def test_run_cache_workers(self, tmp_path, monkeypatch, capsys):
+        (tmp_path / SNAPSHOT_FILE).write_text(
+            "chain,original_id,symbol,symbol_uuid,description\n"
+        )
+        argv = [
+            ADDRESS,
+            "--cache",
+            str(tmp_path / "transactions.sqlite"),
+            "--token-table-dir",
+            str(tmp_path),
+            "--offline",
+        ]
+        with StubChainApi({ADDRESS: StubChainApi.load_fixtures()}) as stub:
+            monkeypatch.setattr(
+                main,
+                "OsmosisTransactionFetcher",
+                lambda: OsmosisTransactionFetcher(stub.url),
+            )
+            main.run(parse_args(argv))
+            expected = capsys.readouterr().out
+            main.run(parse_args(argv + ["--workers", "2", "--chunk-size", "2"]))
+            assert capsys.readouterr().out == expected
+        assert len(expected.splitlines()) > 10
+
+    def test_startup(self):
+        assert TestMain._get_startup_modules() == []
+
+    @classmethod
+    def _get_startup_modules(cls) -> list:
+        code = (
+            "import json, sys\n"
+            "import main\n"
+            f"heavy_modules = [name for name in {HEAVY_MODULES!r} "
+            "if name in sys.modules]\n"
+            "print(json.dumps(heavy_modules))\n"
+        )
+        env = dict(os.environ, PYTHONPATH="src")
+        output = subprocess.run(
+            [sys.executable, "-c", code],
+            check=True,
+            capture_output=True,
+            env=env,
+            text=True,
+        ).stdout
+        return json.loads(output)
@@ -0,0 +1,50 @@
+import copy
+
+from osmosis_plugin.fetcher import OsmosisTransactionFetcher
+from osmosis_plugin.multi_address import MultiAddressConverter
+from osmosis_plugin.transaction_cache import TransactionCache
+from tests import test_osmosis_plugin
+from tests.stub_chain_api import StubChainApi
+
+ADDRESS = "osmo14ls9rcxxd5gqwshj85dae74tcp3umypp786h3m"
+OTHER_ADDRESS = "osmo1h7yfu7x4qsv2urnkl4kzydgxegdfyjdry5ee4xzj98jwz0uh07rqdkmprr"
+
+
+class TestMultiAddress:
+    def test_write_csv(self, tmp_path):
+        fixtures = StubChainApi.load_fixtures()
+        shared = [copy.deepcopy(fixture) for fixture in fixtures[:3]]
+        mock = test_osmosis_plugin.TestOsmosisPlugin.get_token_table_mock()
+        converter = MultiAddressConverter(
+            [ADDRESS, OTHER_ADDRESS, ADDRESS],
+            TransactionCache(":memory:"),
+            mock,
+        )
+        with StubChainApi({ADDRESS: fixtures, OTHER_ADDRESS: shared}) as stub:
+            assert converter.update(OsmosisTransactionFetcher(stub.url)) == 12
+
+        counts = converter.write_csv(str(tmp_path))
+        assert converter.decoded == len(fixtures)
+        assert converter.shared == {}
+        assert counts[OTHER_ADDRESS] == 7
+        assert mock.get_symbol.call_count == 5
+
+        lines = (tmp_path / f"{OTHER_ADDRESS}.csv").read_text().splitlines()
+        assert len(lines) == 1 + 7
+        assert (tmp_path / f"{ADDRESS}.csv").exists()
+
+    def test_write_dataset(self, tmp_path):
+        fixtures = StubChainApi.load_fixtures()
+        mock = test_osmosis_plugin.TestOsmosisPlugin.get_token_table_mock()
+        converter = MultiAddressConverter(
+            [ADDRESS, OTHER_ADDRESS], TransactionCache(":memory:"), mock
+        )
+        with StubChainApi({ADDRESS: fixtures, OTHER_ADDRESS: fixtures[:3]}) as stub:
+            converter.update(OsmosisTransactionFetcher(stub.url))
+
+        counts = converter.write_dataset(str(tmp_path), "csv.gz")
+        assert counts[OTHER_ADDRESS] == 7
+        assert (
+            tmp_path / f"address={OTHER_ADDRESS}" / "year=2022" / "part-0.csv.gz"
+        ).exists()
+        assert (tmp_path / f"address={ADDRESS}" / "year=2022").exists()
@@ -1,3 +1,4 @@
+import copy
 import csv
 import json
 import os
@@ -5,8 +6,10 @@ from pathlib import Path
 from typing import Union
 from unittest.mock import MagicMock
 
+import pytest
 from senkalib.chain.osmosis.osmosis_transaction import OsmosisTransaction
 
+from osmosis_plugin.event_index import EventIndex
 from osmosis_plugin.osmosis_plugin import OsmosisPlugin
 
 
@@ -371,6 +374,154 @@ class TestOsmosisPlugin:
         assert caajs[0].caaj_to == "osmo14ls9rcxxd5gqwshj85dae74tcp3umypp786h3m"
         assert caajs[0].comment == ""
 
+    def test_get_caajs_multiple_messages(self):
+        test_data = TestOsmosisPlugin._get_test_data("swap")
+        lock_tokens = TestOsmosisPlugin._get_test_data("lock_tokens")
+        test_data["data"]["tx"]["body"]["messages"].extend(
+            lock_tokens["data"]["tx"]["body"]["messages"]
+        )
+        lock_tokens_log = lock_tokens["data"]["logs"][0]
+        lock_tokens_log["msg_index"] = 1
+        test_data["data"]["logs"].append(lock_tokens_log)
+        transaction = OsmosisTransaction(test_data)
+        mock = TestOsmosisPlugin.get_token_table_mock()
+        caajs = OsmosisPlugin.get_caajs(
+            "osmo14ls9rcxxd5gqwshj85dae74tcp3umypp786h3m", transaction, mock
+        )
+        assert [caaj.application for caaj in caajs] == ["swap", "swap", "staking"]
+        assert caajs[1].amount == "0.005147"
+        assert caajs[2].amount == "0.002"
+        assert caajs[2].token_original_id == "gamm/pool/497"
+
+    def test_get_caajs_multiple_delegates(self):
+        test_data = TestOsmosisPlugin._get_test_data("delegate")
+        message = copy.deepcopy(test_data["data"]["tx"]["body"]["messages"][0])
+        message["validator_address"] = "osmovaloper1second"
+        test_data["data"]["tx"]["body"]["messages"].append(message)
+        log = copy.deepcopy(test_data["data"]["logs"][0])
+        log["msg_index"] = 1
+        log["events"][2]["attributes"][0]["value"] = "osmovaloper1second"
+        log["events"][2]["attributes"][1]["value"] = "200000uosmo"
+        test_data["data"]["logs"].append(log)
+        transaction = OsmosisTransaction(test_data)
+        mock = TestOsmosisPlugin.get_token_table_mock()
+        caajs = OsmosisPlugin.get_caajs(
+            "osmo14ls9rcxxd5gqwshj85dae74tcp3umypp786h3m", transaction, mock
+        )
+        assert len(caajs) == 2
+        assert caajs[0].caaj_to == "osmovaloper1clpqr4nrk4khgkxj78fcwwh6dl3uw4ep88n0y4"
+        assert caajs[0].amount == "0.1"
+        assert caajs[1].caaj_to == "osmovaloper1second"
+        assert caajs[1].amount == "0.2"
+
+    def test_get_caajs_undefined_type(self):
+        test_data = TestOsmosisPlugin._get_test_data("swap")
+        test_data["data"]["tx"]["body"]["messages"][0]["@type"] = "/MsgTransfer"
+        transaction = OsmosisTransaction(test_data)
+        mock = TestOsmosisPlugin.get_token_table_mock()
+        with pytest.raises(Exception, match="This type of transaction is not defined"):
+            OsmosisPlugin.get_caajs(
+                "osmo14ls9rcxxd5gqwshj85dae74tcp3umypp786h3m", transaction, mock
+            )
+
+    def test_get_caajs_relayer_messages(self, caplog):
+        mock = TestOsmosisPlugin.get_token_table_mock()
+        address = "osmo14ls9rcxxd5gqwshj85dae74tcp3umypp786h3m"
+        test_data = TestOsmosisPlugin._get_test_data("ibc_received_effect1")
+        expected = OsmosisPlugin.get_caajs(
+            address, OsmosisTransaction(copy.deepcopy(test_data)), mock
+        )
+        messages = test_data["data"]["tx"]["body"]["messages"]
+        for type_url in [
+            "/ibc.core.channel.v1.MsgAcknowledgement",
+            "/ibc.core.channel.v1.MsgTimeout",
+            "/osmosis.example.MsgExample",
+        ]:
+            messages.append({"@type": type_url})
+            test_data["data"]["logs"].append(
+                {"msg_index": len(messages) - 1, "log": "", "events": []}
+            )
+        caajs = OsmosisPlugin.get_caajs(address, OsmosisTransaction(test_data), mock)
+        assert caajs == expected
+        # only the message without a handler is reported.
+        assert [record.message for record in caplog.records] == [
+            "skipped a message of an undefined type. transaction_id: "
+            "727E12088812C7458061EB5B2284A9DBBBFBED15E3B4E174055912B8FE2F69D3, "
+            "type: /osmosis.example.MsgExample"
+        ]
+
+    def test_get_caajs_no_messages(self):
+        test_data = TestOsmosisPlugin._get_test_data("ibc_transfer")
+        test_data["data"]["tx"]["body"]["messages"] = []
+        test_data["data"]["logs"] = []
+        transaction = OsmosisTransaction(test_data)
+        mock = TestOsmosisPlugin.get_token_table_mock()
+        caajs = OsmosisPlugin.get_caajs(
+            "osmo14ls9rcxxd5gqwshj85dae74tcp3umypp786h3m", transaction, mock
+        )
+        assert [caaj.caaj_to for caaj in caajs] == ["fee"]
+
+    def test_get_uuid(self):
+        mock = TestOsmosisPlugin.get_token_table_mock()
+        trade_uuids = []
+        for _ in range(2):
+            transaction = OsmosisTransaction(
+                TestOsmosisPlugin._get_test_data("join_pool")
+            )
+            caajs = OsmosisPlugin.get_caajs(
+                "osmo14ls9rcxxd5gqwshj85dae74tcp3umypp786h3m", transaction, mock
+            )
+            trade_uuids.append([caaj.trade_uuid for caaj in caajs])
+        assert trade_uuids[0] == trade_uuids[1]
+        assert trade_uuids[0] == ["85dfd151-13ff-572f-a43b-c56118148011"] * 3
+
+        swap = OsmosisTransaction(TestOsmosisPlugin._get_test_data("swap"))
+        events = EventIndex.from_transaction(swap)
+        transfer, swapped = (
+            events.get_events("transfer")[0],
+            events.get_events("token_swapped")[0],
+        )
+        assert OsmosisPlugin._get_uuid(swap, transfer) != OsmosisPlugin._get_uuid(
+            swap, swapped
+        )
+
+    def test_register_handler(self, mocker):
+        mocker.patch.dict(OsmosisPlugin.message_handlers)
+        OsmosisPlugin.register_handler(
+            "/osmosis.example.MsgExample",
+            # handlers receive the emit callable last.
+            lambda *args: args[-1](*(["example"] * 14)),
+        )
+        test_data = TestOsmosisPlugin._get_test_data("swap")
+        test_data["data"]["tx"]["body"]["messages"][0][
+            "@type"
+        ] = "/osmosis.example.MsgExample"
+        transaction = OsmosisTransaction(test_data)
+        mock = TestOsmosisPlugin.get_token_table_mock()
+        caajs = OsmosisPlugin.get_caajs(
+            "osmo14ls9rcxxd5gqwshj85dae74tcp3umypp786h3m", transaction, mock
+        )
+        assert len(caajs) == 1
+        assert caajs[0].type == "example"
+
+    def test_get_caajs_batch(self):
+        failed = TestOsmosisPlugin._get_test_data("swap2")
+        failed["data"]["code"] = 5
+        transactions = [
+            OsmosisTransaction(TestOsmosisPlugin._get_test_data("swap")),
+            OsmosisTransaction(TestOsmosisPlugin._get_test_data("cosmos_transfer")),
+            OsmosisTransaction(failed),
+            OsmosisTransaction(TestOsmosisPlugin._get_test_data("ibc_transfer")),
+        ]
+        mock = TestOsmosisPlugin.get_token_table_mock()
+        caajs = OsmosisPlugin.get_caajs_batch(
+            "osmo14ls9rcxxd5gqwshj85dae74tcp3umypp786h3m", iter(transactions), mock
+        )
+        assert not isinstance(caajs, list)
+        caajs = list(caajs)
+        assert [caaj.type for caaj in caajs] == ["lose", "get", "send", "lose"]
+        assert mock.get_symbol.call_count == 2
+
     def test_get_token_amount(self):
         token_amount = OsmosisPlugin._get_token_amount(
             "4900ibc/46B44899322F3CD854D2D46DEEF881958467CDD4B3B10086DA49296BBED94BED"
@@ -0,0 +1,66 @@
+import json
+
+from senkalib.chain.osmosis.osmosis_transaction import OsmosisTransaction
+
+from osmosis_plugin.decoder import decode_transaction_bytes
+from osmosis_plugin.osmosis_plugin import OsmosisPlugin
+from osmosis_plugin.parallel import get_caajs_parallel
+from tests import test_token_resolver
+
+
+class TestParallel:
+    def test_get_caajs_parallel_keeps_order(self):
+        names = [
+            "swap",
+            "join_pool",
+            "lock_tokens",
+            "exit_pool",
+            "delegate",
+            "ibc_transfer",
+            "ibc_received_effect1",
+            "swap2",
+        ]
+        transactions = [
+            OsmosisTransaction(TestParallel._get_test_data(name)) for name in names * 3
+        ]
+        address = "osmo14ls9rcxxd5gqwshj85dae74tcp3umypp786h3m"
+        token_table = test_token_resolver.TestTokenResolver.get_token_table()
+
+        expected = list(
+            OsmosisPlugin.get_caajs_batch(address, transactions, token_table)
+        )
+        result = list(
+            get_caajs_parallel(address, transactions, token_table, 2, chunk_size=5)
+        )
+        assert result == expected
+
+    def test_get_caajs_parallel_payloads(self):
+        names = ["swap", "join_pool", "delegate", "ibc_transfer"]
+        bodies = [json.dumps(TestParallel._get_test_data(name)) for name in names]
+        address = "osmo14ls9rcxxd5gqwshj85dae74tcp3umypp786h3m"
+        token_table = test_token_resolver.TestTokenResolver.get_token_table()
+
+        expected = list(
+            OsmosisPlugin.get_caajs_batch(
+                address,
+                [OsmosisTransaction(json.loads(body)) for body in bodies],
+                token_table,
+            )
+        )
+        # cached bodies as str and bytes, and transactions decoded in the parent.
+        payloads = [
+            bodies[0],
+            bodies[1].encode(),
+            decode_transaction_bytes(bodies[2]),
+            OsmosisTransaction(json.loads(bodies[3])),
+        ]
+        result = list(
+            get_caajs_parallel(address, payloads, token_table, 2, chunk_size=1)
+        )
+        assert result == expected
+
+    @classmethod
+    def _get_test_data(cls, filename):
+        with open(f"tests/data/{filename}.json", encoding="utf-8") as jsonfile_local:
+            test_data = json.load(jsonfile_local)
+        return test_data
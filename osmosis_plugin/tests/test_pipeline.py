@@ -0,0 +1,57 @@
+import pytest
+from senkalib.chain.osmosis.osmosis_transaction import OsmosisTransaction
+
+from osmosis_plugin.fetcher import OsmosisTransactionFetcher
+from osmosis_plugin.osmosis_plugin import OsmosisPlugin
+from osmosis_plugin.pipeline import get_caajs_pipelined
+from tests import test_osmosis_plugin
+from tests.stub_chain_api import StubChainApi
+
+ADDRESS = "osmo14ls9rcxxd5gqwshj85dae74tcp3umypp786h3m"
+
+
+class TestPipeline:
+    def test_get_pages(self):
+        fixtures = StubChainApi.load_fixtures()
+        with StubChainApi({ADDRESS: fixtures}) as stub:
+            fetcher = OsmosisTransactionFetcher(stub.url, page_size=4)
+            pages = list(fetcher.get_pages(ADDRESS))
+        assert [len(page) for page in pages] == [4, 4, 1]
+        assert pages[0][0]["data"]["txhash"] == fixtures[-1]["data"]["txhash"]
+        assert [request["from"] for request in stub.requests] == [
+            0,
+            16668469,
+            16428704,
+        ]
+
+    def test_get_caajs_pipelined(self):
+        fixtures = StubChainApi.load_fixtures()
+        mock = test_osmosis_plugin.TestOsmosisPlugin.get_token_table_mock()
+        with StubChainApi({ADDRESS: fixtures}) as stub:
+            fetcher = OsmosisTransactionFetcher(stub.url, page_size=2)
+            caajs = list(
+                get_caajs_pipelined(ADDRESS, fetcher, mock, prefetch=1, queue_size=1)
+            )
+
+        newest_first = sorted(
+            fixtures, key=lambda transaction: transaction["header"]["id"], reverse=True
+        )
+        transactions = [OsmosisTransaction(transaction) for transaction in newest_first]
+        expected = list(OsmosisPlugin.get_caajs_batch(ADDRESS, transactions, mock))
+        assert caajs == expected
+
+    def test_get_caajs_pipelined_stops_early(self):
+        fixtures = StubChainApi.load_fixtures()
+        mock = test_osmosis_plugin.TestOsmosisPlugin.get_token_table_mock()
+        with StubChainApi({ADDRESS: fixtures}) as stub:
+            fetcher = OsmosisTransactionFetcher(stub.url, page_size=1)
+            caajs = get_caajs_pipelined(ADDRESS, fetcher, mock, prefetch=1)
+            assert next(caajs).type == "send"
+            caajs.close()
+        assert len(stub.requests) < len(fixtures)
+
+    def test_get_caajs_pipelined_raises_fetch_error(self):
+        mock = test_osmosis_plugin.TestOsmosisPlugin.get_token_table_mock()
+        fetcher = OsmosisTransactionFetcher("http://127.0.0.1:1/new_txs", timeout=1)
+        with pytest.raises(Exception):
+            list(get_caajs_pipelined(ADDRESS, fetcher, mock))
@@ -0,0 +1,136 @@
+import os
+import pstats
+import sys
+
+from senkalib.chain.osmosis.osmosis_transaction import OsmosisTransaction
+
+from osmosis_plugin.coin import format_amount
+from osmosis_plugin.osmosis_plugin import OsmosisPlugin
+from osmosis_plugin.profiler import (
+    COLLAPSED_FILENAME,
+    PSTATS_FILENAME,
+    RunProfiler,
+    StackSampler,
+)
+from osmosis_plugin.synthetic import SyntheticTransactionGenerator, load_templates
+from tests import test_osmosis_plugin
+
+ADDRESS = "osmo14ls9rcxxd5gqwshj85dae74tcp3umypp786h3m"
+DELEGATE_TYPE = "/cosmos.staking.v1beta1.MsgDelegate"
+
+
+class TestProfiler:
+    def test_get_stack_tags_message_type(self, monkeypatch):
+        sampler = StackSampler()
+
+        def sampling_handler(*args):
+            sampler.sample()
+
+        monkeypatch.setitem(
+            OsmosisPlugin.message_handlers, DELEGATE_TYPE, sampling_handler
+        )
+        transaction = OsmosisTransaction(
+            test_osmosis_plugin.TestOsmosisPlugin._get_test_data("delegate")
+        )
+        OsmosisPlugin.get_caajs(
+            ADDRESS,
+            transaction,
+            test_osmosis_plugin.TestOsmosisPlugin.get_token_table_mock(),
+        )
+
+        stacks = [stack for stack in sampler.stacks if "sampling_handler" in stack]
+        assert len(stacks) == 1
+        frames = stacks[0].split(";")
+        assert frames[0] == "MainThread"
+        handler_index = next(
+            index for index, frame in enumerate(frames) if "sampling_handler" in frame
+        )
+        assert frames[handler_index - 1] == f"[{DELEGATE_TYPE}]"
+        assert frames[handler_index - 2].startswith("OsmosisPlugin.emit_caajs ")
+
+    def test_get_stack_tags_fee(self, monkeypatch):
+        sampler = StackSampler()
+
+        def sampling_format_amount(amount, decimals):
+            sampler.sample()
+            return format_amount(amount, decimals)
+
+        monkeypatch.setattr(
+            "osmosis_plugin.osmosis_plugin.format_amount", sampling_format_amount
+        )
+        transaction = OsmosisTransaction(
+            test_osmosis_plugin.TestOsmosisPlugin._get_test_data("ibc_transfer")
+        )
+        OsmosisPlugin.get_caajs(
+            ADDRESS,
+            transaction,
+            test_osmosis_plugin.TestOsmosisPlugin.get_token_table_mock(),
+        )
+
+        stacks = [
+            stack for stack in sampler.stacks if "sampling_format_amount" in stack
+        ]
+        assert len(stacks) == 2
+        assert any(
+            "[/ibc.applications.transfer.v1.MsgTransfer];OsmosisPlugin._get_caaj_transfer "
+            in stack
+            for stack in stacks
+        )
+        assert any("[fee];OsmosisPlugin._get_caaj_fee " in stack for stack in stacks)
+
+    def test_get_qualname(self):
+        class Base:
+            @classmethod
+            def get_class_frame(cls):
+                return sys._getframe()
+
+            def get_frame(self):
+                return sys._getframe()
+
+        class Derived(Base):
+            pass
+
+        assert (
+            StackSampler._get_qualname(Derived.get_class_frame())
+            == "Base.get_class_frame"
+        )
+        assert StackSampler._get_qualname(Derived().get_frame()) == "Base.get_frame"
+        assert (
+            StackSampler._get_qualname(sys._getframe())
+            == "TestProfiler.test_get_qualname"
+        )
+
+    def test_run_profiler(self, tmp_path):
+        transactions = TestProfiler._get_transactions(300)
+        directory = tmp_path / "profile"
+        with RunProfiler(str(directory), interval=0.0005) as profiler:
+            OsmosisPlugin.get_caajs_columns(
+                ADDRESS,
+                transactions,
+                test_osmosis_plugin.TestOsmosisPlugin.get_token_table_mock(),
+            )
+            profiler.sampler.sample()
+
+        stats = pstats.Stats(str(directory / PSTATS_FILENAME))
+        assert any(
+            function_name == "_get_caaj_swap" for _, _, function_name in stats.stats
+        )
+        lines = (directory / COLLAPSED_FILENAME).read_text().splitlines()
+        assert lines
+        for line in lines:
+            stack, count = line.rsplit(" ", 1)
+            assert int(count) > 0
+            assert "osmosis-profiler" not in stack
+
+    def test_run_profiler_sampling_only(self, tmp_path):
+        with RunProfiler(str(tmp_path), deterministic=False) as profiler:
+            profiler.sampler.sample()
+        assert not os.path.exists(tmp_path / PSTATS_FILENAME)
+        assert (tmp_path / COLLAPSED_FILENAME).read_text()
+
+    @classmethod
+    def _get_transactions(cls, count: int) -> list:
+        generator = SyntheticTransactionGenerator(load_templates("tests/data"), seed=1)
+        return [
+            OsmosisTransaction(transaction) for transaction in generator.generate(count)
+        ]
@@ -0,0 +1,129 @@
+import json
+import time
+
+import pytest
+from senkalib.chain.osmosis.osmosis_transaction import OsmosisTransaction
+
+from osmosis_plugin import decoder
+from osmosis_plugin.osmosis_plugin import OsmosisPlugin
+from osmosis_plugin.parallel import get_caajs_parallel
+from osmosis_plugin.stats import LATENCY_BOUNDS, LatencyHistogram, PluginStats
+from osmosis_plugin.token_resolver import TokenResolver
+from tests import test_parallel, test_token_resolver
+
+ADDRESS = "osmo14ls9rcxxd5gqwshj85dae74tcp3umypp786h3m"
+NAMES = ["swap", "join_pool", "delegate", "ibc_transfer", "ibc_received_effect1"]
+
+
+class TestStats:
+    @pytest.fixture(autouse=True)
+    def disable_stats(self):
+        yield
+        OsmosisPlugin.disable_stats()
+
+    def test_latency_histogram(self):
+        histogram = LatencyHistogram()
+        assert histogram.get_quantile(0.5) == 0.0
+        for _ in range(98):
+            histogram.record(3e-6)
+        histogram.record(1e-3)
+        histogram.record(5.0)
+        assert histogram.count == 100
+        assert histogram.get_quantile(0.5) == LATENCY_BOUNDS[2]
+        assert histogram.get_quantile(0.99) == LATENCY_BOUNDS[10]
+        assert histogram.get_quantile(1.0) == 5.0
+        assert histogram.max == 5.0
+
+    def test_stats_disabled(self):
+        assert OsmosisPlugin.stats is None
+        transactions = TestStats._get_transactions()
+        builder = OsmosisPlugin.get_caajs_columns(
+            ADDRESS,
+            transactions,
+            test_token_resolver.TestTokenResolver.get_token_table(),
+        )
+        assert len(builder) > 0
+        assert OsmosisPlugin.stats is None
+
+    def test_get_caajs_columns(self):
+        transactions = TestStats._get_transactions()
+        transactions[0].get_transaction()["data"]["code"] = 5
+        token_table = TokenResolver(
+            test_token_resolver.TestTokenResolver.get_token_table()
+        )
+        expected = OsmosisPlugin.get_caajs_columns(ADDRESS, transactions, token_table)
+
+        stats = OsmosisPlugin.enable_stats()
+        builder = OsmosisPlugin.get_caajs_columns(ADDRESS, transactions, token_table)
+        assert builder.to_caajs() == expected.to_caajs()
+        assert stats.transactions == len(NAMES) - 1
+        assert stats.skipped_transactions == 1
+        assert stats.journals == len(builder)
+        assert sum(stats.message_journals.values()) <= stats.journals
+        assert stats.messages["/osmosis.gamm.v1beta1.MsgJoinPool"] == 1
+        assert "/osmosis.gamm.v1beta1.MsgSwapExactAmountIn" not in stats.messages
+        assert stats.handlers["_get_caaj_join_pool"].count == 1
+        assert stats.handlers["_get_caaj_fee"].count >= 1
+        # the resolver was warmed by the first conversion.
+        assert stats.resolver_misses == 0
+        assert stats.get_resolver_hit_rate() == 1.0
+        assert stats.parse_seconds > 0
+        assert stats.convert_seconds > 0
+
+        summary = stats.format_summary()
+        assert "_get_caaj_join_pool: 1 calls" in summary
+        assert json.loads(json.dumps(stats.to_dict()))["journals"] == len(builder)
+
+    def test_get_caajs(self, monkeypatch):
+        decode_transaction = decoder.decode_transaction
+
+        def slow_decode_transaction(raw_transaction: dict):
+            time.sleep(0.05)
+            return decode_transaction(raw_transaction)
+
+        monkeypatch.setattr(decoder, "decode_transaction", slow_decode_transaction)
+        stats = OsmosisPlugin.enable_stats()
+        caajs = OsmosisPlugin.get_caajs(
+            ADDRESS,
+            TestStats._get_transactions()[0],
+            test_token_resolver.TestTokenResolver.get_token_table(),
+        )
+        assert stats.journals == len(caajs) > 0
+        assert stats.parse_seconds >= 0.05
+        assert stats.convert_seconds < 0.05
+
+    def test_get_caajs_parallel(self):
+        transactions = TestStats._get_transactions() * 3
+        stats = OsmosisPlugin.enable_stats()
+        caajs = list(
+            get_caajs_parallel(
+                ADDRESS,
+                transactions,
+                test_token_resolver.TestTokenResolver.get_token_table(),
+                2,
+                chunk_size=4,
+            )
+        )
+        assert stats.transactions == len(transactions)
+        assert stats.journals == len(caajs)
+        assert stats.handlers["_get_caaj_delegate"].count == 3
+
+    def test_merge(self):
+        stats = PluginStats()
+        other = PluginStats()
+        other.record_message("/cosmos.staking.v1beta1.MsgDelegate", 1)
+        other.record_handler("_get_caaj_delegate", 2e-6)
+        other.resolver_hits = 3
+        stats.merge(other)
+        stats.merge(other)
+        assert stats.messages == {"/cosmos.staking.v1beta1.MsgDelegate": 2}
+        assert stats.message_journals == {"/cosmos.staking.v1beta1.MsgDelegate": 2}
+        assert stats.handlers["_get_caaj_delegate"].count == 2
+        assert stats.resolver_hits == 6
+
+    @classmethod
+    def _get_transactions(cls) -> list:
+        return [
+            OsmosisTransaction(test_parallel.TestParallel._get_test_data(name))
+            for name in NAMES
+        ]
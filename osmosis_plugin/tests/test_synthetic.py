@@ -0,0 +1,109 @@
+import io
+
+from senkalib.chain.osmosis.osmosis_transaction import OsmosisTransaction
+
+from osmosis_plugin.osmosis_plugin import OsmosisPlugin
+from osmosis_plugin.synthetic import (
+    TEMPLATE_ADDRESS,
+    SyntheticTransactionGenerator,
+    load_templates,
+    read_ndjson,
+    write_ndjson,
+)
+from osmosis_plugin.token_table_snapshot import SnapshotTokenOriginalIdTable
+
+
+class TestSynthetic:
+    def test_generate_is_deterministic(self):
+        templates = load_templates("tests/data")
+        first = list(SyntheticTransactionGenerator(templates, seed=7).generate(50))
+        second = list(SyntheticTransactionGenerator(templates, seed=7).generate(50))
+        other = list(SyntheticTransactionGenerator(templates, seed=8).generate(50))
+        assert first == second
+        assert first != other
+
+    def test_generate(self):
+        generator = SyntheticTransactionGenerator(
+            load_templates("tests/data"),
+            failure_rate=0.2,
+            multi_message_rate=0.5,
+        )
+        transactions = list(generator.generate(300))
+        ids = [transaction["header"]["id"] for transaction in transactions]
+        assert ids == sorted(set(ids))
+        assert (
+            len({transaction["data"]["txhash"] for transaction in transactions}) == 300
+        )
+
+        failed = [t for t in transactions if t["data"]["code"] != 0]
+        assert 0 < len(failed) < 300
+        assert all(transaction["data"]["logs"] == [] for transaction in failed)
+        assert any(
+            len(transaction["data"]["tx"]["body"]["messages"]) > 1
+            and len(transaction["data"]["logs"]) > 1
+            for transaction in transactions
+        )
+        assert any(
+            len(message.get("routes", [])) > 1
+            for transaction in transactions
+            for message in transaction["data"]["tx"]["body"]["messages"]
+        )
+
+        token_table = SnapshotTokenOriginalIdTable([])
+        caajs = list(
+            OsmosisPlugin.get_caajs_batch(
+                TEMPLATE_ADDRESS,
+                (OsmosisTransaction(transaction) for transaction in transactions),
+                token_table,
+            )
+        )
+        assert len(caajs) > 300
+        assert len({caaj.amount for caaj in caajs}) > 100
+
+    def test_generate_swap_routes(self):
+        generator = SyntheticTransactionGenerator(
+            load_templates("tests/data", ["swap", "swap2"]),
+            failure_rate=0,
+            multi_message_rate=0,
+        )
+        route_lengths = set()
+        for transaction in generator.generate(50):
+            message = transaction["data"]["tx"]["body"]["messages"][0]
+            events = {
+                event["type"]: event["attributes"]
+                for event in transaction["data"]["logs"][0]["events"]
+            }
+            pool_ids = [
+                attribute["value"]
+                for attribute in events["token_swapped"]
+                if attribute["key"] == "pool_id"
+            ]
+            amounts = [
+                attribute["value"]
+                for attribute in events["transfer"]
+                if attribute["key"] == "amount"
+            ]
+            assert pool_ids == [route["poolId"] for route in message["routes"]]
+            assert len(amounts) == 2 * len(message["routes"])
+            assert (
+                amounts[0] == message["tokenIn"]["amount"] + message["tokenIn"]["denom"]
+            )
+            route_lengths.add(len(message["routes"]))
+        assert route_lengths == {1, 2, 3}
+
+    def test_generate_for_address(self):
+        address = "osmo1h7yfu7x4qsv2urnkl4kzydgxegdfyjdry5ee4xzj98jwz0uh07rqdkmprr"
+        generator = SyntheticTransactionGenerator(
+            load_templates("tests/data", ["delegate"]), address=address
+        )
+        message = next(generator.generate(1))["data"]["tx"]["body"]["messages"][0]
+        assert message["delegator_address"] == address
+
+    def test_ndjson(self):
+        generator = SyntheticTransactionGenerator(load_templates("tests/data"))
+        transactions = list(generator.generate(20))
+        stream = io.StringIO()
+        assert write_ndjson(transactions, stream) == 20
+        assert len(stream.getvalue().splitlines()) == 20
+        stream.seek(0)
+        assert list(read_ndjson(stream)) == transactions
@@ -0,0 +1,60 @@
+from unittest.mock import MagicMock
+
+from senkalib.token_original_id_table import TokenOriginalIdTable
+
+from osmosis_plugin.token_resolver import TokenResolver
+
+
+class TestTokenResolver:
+    @classmethod
+    def get_token_table(cls):
+        token_table = TokenOriginalIdTable.__new__(TokenOriginalIdTable)
+        token_table.token_original_id_table = [
+            {
+                "chain": "osmosis",
+                "original_id": "ibc/46B44899322F3CD854D2D46DEEF881958467CDD4B3B10086DA49296BBED94BED",
+                "symbol": "juno",
+                "symbol_uuid": "3a2570c5-15c4-2860-52a8-bff14f27a236",
+            },
+        ]
+        return token_table
+
+    def test_resolve(self):
+        resolver = TokenResolver(TestTokenResolver.get_token_table())
+        symbol, symbol_uuid = resolver.resolve(
+            "osmosis",
+            "ibc/46B44899322F3CD854D2D46DEEF881958467CDD4B3B10086DA49296BBED94BED",
+        )
+        assert symbol == "juno"
+        assert symbol_uuid == "3a2570c5-15c4-2860-52a8-bff14f27a236"
+        assert resolver.resolve("osmosis", "gamm/pool/497") == (None, None)
+
+    def test_resolve_cached(self):
+        token_table = MagicMock()
+        token_table.get_symbol.return_value = "osmo"
+        token_table.get_symbol_uuid.return_value = (
+            "c0c8e177-53c3-c408-d8bd-067a2ef41ea7"
+        )
+        resolver = TokenResolver(token_table)
+        assert resolver.get_symbol("osmosis", None) == "osmo"
+        assert (
+            resolver.get_symbol_uuid("osmosis", None)
+            == "c0c8e177-53c3-c408-d8bd-067a2ef41ea7"
+        )
+        assert token_table.get_symbol.call_count == 1
+        assert resolver.hits == 1
+        assert resolver.misses == 1
+
+    def test_resolve_evicts_least_recently_used(self):
+        token_table = MagicMock()
+        resolver = TokenResolver(token_table, maxsize=2)
+        resolver.resolve("osmosis", "a")
+        resolver.resolve("osmosis", "b")
+        resolver.resolve("osmosis", "a")
+        resolver.resolve("osmosis", "c")
+        assert list(resolver.cache) == [("osmosis", "a"), ("osmosis", "c")]
+
+    def test_of(self):
+        resolver = TokenResolver(MagicMock())
+        assert TokenResolver.of(resolver) is resolver
+        assert isinstance(TokenResolver.of(MagicMock()), TokenResolver)
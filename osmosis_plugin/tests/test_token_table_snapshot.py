@@ -0,0 +1,141 @@
+import os
+import pickle
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+from osmosis_plugin.token_table_snapshot import (
+    INDEX_FILE,
+    SNAPSHOT_FILE,
+    SnapshotTokenOriginalIdTable,
+    load_token_table,
+)
+
+TOKEN_ORIGINAL_ID_CSV = """chain,original_id,symbol,symbol_uuid,description
+osmosis,ibc/46B44899322F3CD854D2D46DEEF881958467CDD4B3B10086DA49296BBED94BED,juno,3a2570c5-15c4-2860-52a8-bff14f27a236,juno
+osmosis,gamm/pool/1,,,pool
+"""
+
+
+class StubCsvServer:
+    def __init__(self, body: str, etag: str = '"v1"'):
+        self.body = body
+        self.etag = etag
+        self.statuses = []
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.headers.get("If-None-Match") == stub.etag:
+                    stub.statuses.append(304)
+                    self.send_response(304)
+                    self.end_headers()
+                    return
+                body = stub.body.encode()
+                stub.statuses.append(200)
+                self.send_response(200)
+                self.send_header("ETag", stub.etag)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}/token_original_id.csv"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class TestTokenTableSnapshot:
+    def test_load_token_table(self, tmp_path):
+        stub = StubCsvServer(TOKEN_ORIGINAL_ID_CSV)
+        try:
+            token_table = load_token_table(stub.url, str(tmp_path))
+            assert token_table.get_symbol(
+                "osmosis",
+                "ibc/46B44899322F3CD854D2D46DEEF881958467CDD4B3B10086DA49296BBED94BED",
+            ) == ("juno")
+            assert token_table.get_symbol("osmosis", None) is None
+            assert (tmp_path / INDEX_FILE).exists()
+
+            load_token_table(stub.url, str(tmp_path))
+            assert stub.statuses == [200]
+
+            load_token_table(stub.url, str(tmp_path), max_age=0)
+            assert stub.statuses == [200, 304]
+
+            stub.body = TOKEN_ORIGINAL_ID_CSV.replace("juno,3a25", "JUNO,3a25")
+            stub.etag = '"v2"'
+            token_table = load_token_table(stub.url, str(tmp_path), max_age=0)
+            assert stub.statuses == [200, 304, 200]
+            assert (
+                token_table.get_symbol(
+                    "osmosis",
+                    "ibc/46B44899322F3CD854D2D46DEEF881958467CDD4B3B10086DA49296BBED94BED",
+                )
+                == "JUNO"
+            )
+        finally:
+            stub.close()
+
+    def test_load_token_table_offline(self, tmp_path):
+        with pytest.raises(FileNotFoundError):
+            load_token_table("http://127.0.0.1:1/unused.csv", str(tmp_path), True)
+
+        stub = StubCsvServer(TOKEN_ORIGINAL_ID_CSV)
+        try:
+            load_token_table(stub.url, str(tmp_path))
+        finally:
+            stub.close()
+        token_table = load_token_table(stub.url, str(tmp_path), offline=True)
+        assert token_table.get_symbol_uuid("osmosis", "gamm/pool/1") == ""
+
+    def test_load_token_table_falls_back_to_snapshot(self, tmp_path):
+        stub = StubCsvServer(TOKEN_ORIGINAL_ID_CSV)
+        try:
+            load_token_table(stub.url, str(tmp_path))
+        finally:
+            stub.close()
+        token_table = load_token_table(stub.url, str(tmp_path), max_age=0, timeout=1)
+        assert len(token_table.token_original_id_table) == 2
+
+        with pytest.raises(requests.RequestException):
+            load_token_table(stub.url, str(tmp_path / "empty"), timeout=1)
+
+    def test_load_token_table_index(self, tmp_path):
+        stub = StubCsvServer(TOKEN_ORIGINAL_ID_CSV)
+        try:
+            load_token_table(stub.url, str(tmp_path))
+        finally:
+            stub.close()
+        with open(tmp_path / INDEX_FILE, "rb") as index_file:
+            cached = pickle.load(index_file)
+        assert cached["index"][("osmosis", "gamm/pool/1")]["description"] == "pool"
+
+        # edits to the snapshot invalidate the index, whether or not its size
+        # changes and even when its mtime is older than the index.
+        snapshot_path = tmp_path / SNAPSHOT_FILE
+        snapshot_path.write_text(TOKEN_ORIGINAL_ID_CSV + "osmosis,uion,ion,,ion\n")
+        token_table = load_token_table(stub.url, str(tmp_path), offline=True)
+        assert token_table.get_symbol("osmosis", "uion") == "ion"
+
+        stat = os.stat(snapshot_path)
+        snapshot_path.write_text(
+            snapshot_path.read_text().replace("uion,ion", "uion,ION")
+        )
+        os.utime(snapshot_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+        token_table = load_token_table(stub.url, str(tmp_path), offline=True)
+        assert token_table.get_symbol("osmosis", "uion") == "ION"
+
+    def test_duplicated_definition(self):
+        row = {"chain": "osmosis", "original_id": "uion", "symbol": "ion"}
+        token_table = SnapshotTokenOriginalIdTable([row, dict(row)])
+        with pytest.raises(ValueError):
+            token_table.get_symbol("osmosis", "uion")
@@ -0,0 +1,61 @@
+import copy
+
+from osmosis_plugin.fetcher import OsmosisTransactionFetcher
+from osmosis_plugin.transaction_cache import TransactionCache
+from tests.stub_chain_api import StubChainApi
+
+ADDRESS = "osmo14ls9rcxxd5gqwshj85dae74tcp3umypp786h3m"
+
+
+class TestTransactionCache:
+    def test_update(self, tmp_path):
+        fixtures = StubChainApi.load_fixtures()
+        cache = TransactionCache(str(tmp_path / "transactions.sqlite"))
+        with StubChainApi({ADDRESS: fixtures}) as stub:
+            fetcher = OsmosisTransactionFetcher(stub.url, page_size=4)
+            assert cache.update(ADDRESS, fetcher) == len(fixtures)
+            assert cache.get_high_water_mark(ADDRESS) == 21311986
+
+            stub.requests.clear()
+            assert cache.update(ADDRESS, fetcher) == 0
+            assert len(stub.requests) == 1
+
+        transactions = list(cache.get_transactions(ADDRESS))
+        assert [transaction["header"]["id"] for transaction in transactions] == sorted(
+            [fixture["header"]["id"] for fixture in fixtures], reverse=True
+        )
+        assert transactions[0] == fixtures[-1]
+
+    def test_update_incremental(self, tmp_path):
+        fixtures = StubChainApi.load_fixtures()
+        path = str(tmp_path / "transactions.sqlite")
+        with StubChainApi({ADDRESS: fixtures[:5]}) as stub:
+            fetcher = OsmosisTransactionFetcher(stub.url, page_size=2)
+            TransactionCache(path).update(ADDRESS, fetcher)
+
+            newer = copy.deepcopy(fixtures[-1])
+            newer["header"]["id"] = 30000000
+            newer["data"]["txhash"] = "NEWER"
+            stub.transactions[ADDRESS] = fixtures + [newer]
+            stub.requests.clear()
+
+            cache = TransactionCache(path)
+            assert cache.update(ADDRESS, fetcher) == 3
+            assert cache.get_high_water_mark(ADDRESS) == 30000000
+            assert len(stub.requests) == 2
+
+        hashes = [
+            transaction["data"]["txhash"]
+            for transaction in cache.get_transactions(ADDRESS)
+        ]
+        assert hashes[0] == "NEWER"
+        assert len(hashes) == len(set(hashes)) == 5 + 3
+
+    def test_get_transactions_shared_between_addresses(self, tmp_path):
+        fixtures = StubChainApi.load_fixtures(["swap", "delegate"])
+        cache = TransactionCache(str(tmp_path / "transactions.sqlite"))
+        cache.add(ADDRESS, fixtures)
+        cache.add("osmo1other", fixtures[:1])
+        assert len(list(cache.get_transactions("osmo1other"))) == 1
+        count = cache.connection.execute("SELECT COUNT(*) FROM transactions")
+        assert count.fetchone()[0] == 2
@@ -0,0 +1,169 @@
+import copy
+import os
+import signal
+import threading
+import urllib.request
+
+from senkalib.chain.osmosis.osmosis_transaction import OsmosisTransaction
+
+from osmosis_plugin.fetcher import OsmosisTransactionFetcher
+from osmosis_plugin.osmosis_plugin import OsmosisPlugin
+from osmosis_plugin.transaction_cache import TransactionCache
+from osmosis_plugin.watch import CsvDirectorySink, MetricsServer, Watcher
+from tests import test_osmosis_plugin
+from tests.stub_chain_api import StubChainApi
+
+ADDRESS = "osmo14ls9rcxxd5gqwshj85dae74tcp3umypp786h3m"
+OTHER_ADDRESS = "osmo1h7yfu7x4qsv2urnkl4kzydgxegdfyjdry5ee4xzj98jwz0uh07rqdkmprr"
+
+
+class TestWatch:
+    def test_poll_appends_new_journals(self, tmp_path):
+        fixtures = sorted(
+            StubChainApi.load_fixtures(), key=lambda fixture: fixture["header"]["id"]
+        )
+        mock = test_osmosis_plugin.TestOsmosisPlugin.get_token_table_mock()
+        expected = list(
+            OsmosisPlugin.get_caajs_batch(
+                ADDRESS, TestWatch._get_transactions(fixtures), mock
+            )
+        )
+        cache_path = str(tmp_path / "transactions.sqlite")
+        output = tmp_path / "caaj"
+
+        with StubChainApi({ADDRESS: fixtures[:4]}) as stub:
+            watcher = TestWatch._get_watcher(stub, cache_path, output, batch_size=3)
+            assert watcher.poll() == 4
+            first_lines = (output / f"{ADDRESS}.csv").read_text().splitlines()
+            assert first_lines[0].startswith("executed_at,")
+
+            # a restarted watcher continues from the stored cursor.
+            watcher.cache.close()
+            stub.transactions[ADDRESS] = fixtures
+            watcher = TestWatch._get_watcher(stub, cache_path, output, batch_size=3)
+            assert watcher.poll() == len(fixtures) - 4
+            assert watcher.poll() == 0
+
+        lines = (output / f"{ADDRESS}.csv").read_text().splitlines()
+        assert lines[: len(first_lines)] == first_lines
+        assert len(lines) == 1 + len(expected)
+        assert [line.split(",")[4] for line in lines[1:]] == [
+            caaj.transaction_id for caaj in expected
+        ]
+        assert watcher.metrics.transactions[ADDRESS] == len(fixtures) - 4
+        assert watcher.metrics.errors[ADDRESS] == 0
+
+    def test_poll_skips_dead_letters(self, tmp_path):
+        fixtures = sorted(
+            StubChainApi.load_fixtures(), key=lambda fixture: fixture["header"]["id"]
+        )
+        failing = copy.deepcopy(fixtures[1])
+        failing["data"]["tx"]["body"]["messages"][0]["@type"] = "/osmosis.MsgUnknown"
+        fixtures[1] = failing
+        mock = test_osmosis_plugin.TestOsmosisPlugin.get_token_table_mock()
+        expected = list(
+            OsmosisPlugin.get_caajs_batch(
+                ADDRESS,
+                TestWatch._get_transactions(fixtures[:1] + fixtures[2:]),
+                mock,
+            )
+        )
+        output = tmp_path / "caaj"
+
+        with StubChainApi({ADDRESS: fixtures}) as stub:
+            watcher = TestWatch._get_watcher(
+                stub, str(tmp_path / "transactions.sqlite"), output, batch_size=3
+            )
+            assert watcher.poll() == len(fixtures)
+            # the cursor moved past the failing transaction.
+            assert watcher.poll() == 0
+
+        lines = (output / f"{ADDRESS}.csv").read_text().splitlines()
+        assert [line.split(",")[4] for line in lines[1:]] == [
+            caaj.transaction_id for caaj in expected
+        ]
+        dead_letters = watcher.cache.get_watch_dead_letters(ADDRESS)
+        assert [txhash for txhash, _ in dead_letters] == [failing["data"]["txhash"]]
+        assert "This type of transaction is not defined" in dead_letters[0][1]
+        assert watcher.metrics.dead_letters[ADDRESS] == 1
+        assert watcher.metrics.errors[ADDRESS] == 0
+        assert (
+            f'osmosis_watch_dead_letters_total{{address="{ADDRESS}"}} 1'
+            in watcher.metrics.render()
+        )
+
+    def test_poll_counts_errors(self, tmp_path):
+        with StubChainApi({}) as stub:
+            url = stub.url
+        watcher = Watcher(
+            [ADDRESS],
+            TransactionCache(":memory:"),
+            test_osmosis_plugin.TestOsmosisPlugin.get_token_table_mock(),
+            OsmosisTransactionFetcher(url, timeout=1),
+            CsvDirectorySink(str(tmp_path)),
+        )
+        assert watcher.poll() == 0
+        assert watcher.metrics.errors[ADDRESS] == 1
+        assert watcher.metrics.polls == 1
+
+    def test_run_and_metrics(self, tmp_path):
+        fixtures = StubChainApi.load_fixtures()
+        with StubChainApi({ADDRESS: fixtures, OTHER_ADDRESS: fixtures[:2]}) as stub:
+            watcher = Watcher(
+                [ADDRESS, OTHER_ADDRESS],
+                TransactionCache(":memory:"),
+                test_osmosis_plugin.TestOsmosisPlugin.get_token_table_mock(),
+                OsmosisTransactionFetcher(stub.url),
+                CsvDirectorySink(str(tmp_path)),
+                interval=0.01,
+            )
+            scraped = []
+
+            def scrape_and_stop():
+                # the watcher runs in this test's thread, which owns the cache.
+                while watcher.metrics.polls < 2:
+                    watcher.stopped.wait(0.01)
+                with urllib.request.urlopen(
+                    f"http://127.0.0.1:{server.port}/metrics"
+                ) as response:
+                    scraped.append(response.read().decode())
+                os.kill(os.getpid(), signal.SIGTERM)
+
+            with MetricsServer(watcher.metrics, 0) as server:
+                handlers = [
+                    signal.getsignal(signal.SIGINT),
+                    signal.getsignal(signal.SIGTERM),
+                ]
+                watcher.install_signal_handlers()
+                thread = threading.Thread(target=scrape_and_stop)
+                thread.start()
+                try:
+                    watcher.run()
+                finally:
+                    signal.signal(signal.SIGINT, handlers[0])
+                    signal.signal(signal.SIGTERM, handlers[1])
+                    thread.join(5)
+        metrics = scraped[0]
+        assert f'osmosis_watch_transactions_total{{address="{ADDRESS}"}} 9' in metrics
+        assert (
+            f'osmosis_watch_transactions_total{{address="{OTHER_ADDRESS}"}} 2'
+            in metrics
+        )
+        assert f'osmosis_watch_errors_total{{address="{ADDRESS}"}} 0' in metrics
+        assert f'osmosis_watch_lag_seconds{{address="{ADDRESS}"}} ' in metrics
+        assert "# TYPE osmosis_watch_journals_total counter" in metrics
+
+    @classmethod
+    def _get_watcher(cls, stub, cache_path, output, batch_size) -> Watcher:
+        return Watcher(
+            [ADDRESS],
+            TransactionCache(cache_path),
+            test_osmosis_plugin.TestOsmosisPlugin.get_token_table_mock(),
+            OsmosisTransactionFetcher(stub.url, page_size=2),
+            CsvDirectorySink(str(output)),
+            batch_size=batch_size,
+        )
+
+    @classmethod
+    def _get_transactions(cls, fixtures):
+        return [OsmosisTransaction(fixture) for fixture in fixtures]